@@ -0,0 +1,48 @@
+"""Rebuild the school leaderboard rank index from the database.
+
+    python -m app.commands.rebuild_leaderboard [--school-id ID ...] [--reconcile]
+
+With --reconcile the leaderboard rows are first recomputed from lessons,
+exam attempts and rewards, as ReportService.precompute_leaderboard does.
+Only useful with the Redis rank backend; in-memory indexes belong to the
+server processes and reload on their own.
+"""
+import argparse
+import logging
+
+from app.core.database import SessionLocal
+from app.crud.school import school as crud_school
+from app.services.leaderboard import leaderboard_service
+from app.services.leaderboard_rank import leaderboard_rank_service
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild(school_ids=None, reconcile: bool = False) -> int:
+    db = SessionLocal()
+    try:
+        school_ids = school_ids or crud_school.get_active_ids(db)
+        for school_id in school_ids:
+            if reconcile:
+                leaderboard_service.reconcile_school(db, school_id)
+                db.commit()
+            ranked = leaderboard_rank_service.rebuild(db, school_id)
+            logger.info(f"Rebuilt leaderboard ranks for school {school_id}: {ranked} students")
+        return len(school_ids)
+    finally:
+        db.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the school leaderboard rank index.")
+    parser.add_argument("--school-id", type=int, action="append", dest="school_ids", help="Only this school; repeatable.")
+    parser.add_argument("--reconcile", action="store_true", help="Recompute leaderboard rows from the source tables first.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    rebuilt = rebuild(args.school_ids, reconcile=args.reconcile)
+    print(f"Rebuilt leaderboard ranks for {rebuilt} school(s)")
+
+
+if __name__ == "__main__":
+    main()
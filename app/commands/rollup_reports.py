@@ -0,0 +1,41 @@
+"""Roll up the daily report totals that the dashboards sum.
+
+    python -m app.commands.rollup_reports [--through YYYY-MM-DD] [--full]
+
+Runs the same rollup as the nightly job, through yesterday (UTC) unless
+--through is given. A run rewrites the school rollups of the recompute
+window and of any day not rolled up before; --full rewrites every day up
+to --through, which is the way to backfill or repair them.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date
+
+from app.core.database import SessionLocal
+from app.services.report_rollup import report_rollup_service
+
+logger = logging.getLogger(__name__)
+
+
+async def rollup(through=None, full: bool = False) -> int:
+    db = SessionLocal()
+    try:
+        return await report_rollup_service.rollup(db, through=through, full=full)
+    finally:
+        db.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Roll up the daily report totals.")
+    parser.add_argument("--through", type=date.fromisoformat, help="Last day to roll up (default: yesterday, UTC).")
+    parser.add_argument("--full", action="store_true", help="Rewrite every day, not just the recompute window.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    rows = asyncio.run(rollup(args.through, args.full))
+    print(f"Wrote {rows} school-day rollup row(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import json
 import asyncio
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Optional, Dict
+from collections import OrderedDict
+from typing import Any, Optional, Dict, Tuple
 import time
 import logging
 
@@ -227,3 +229,44 @@ class CacheManager:
         return count
 
 cache = CacheManager(cache_backend)
+
+
+class VersionedLRU:
+    """Thread-safe in-process LRU for immutable snapshots of versioned rows.
+
+    An entry only counts as a hit for the version it was stored under, so a
+    writer never has to reach every worker: bumping the row's version is
+    enough to make the old snapshot unreachable, and it ages out of the LRU.
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries: "OrderedDict[Any, Tuple[Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Any, version: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key: Any, version: Any, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses}
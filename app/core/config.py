@@ -8,6 +8,7 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 2
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    PASSWORD_HASH_WORKERS: int = 4
 
     ALLOWED_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -25,6 +26,17 @@ class Settings(BaseSettings):
     DATABASE_NAME: str
 
     DATABASE_URL: str = ""
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_SECONDS: float = 10.0
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_CONNECTION_LEAK_SECONDS: float = 30.0
+    DB_CONNECTION_LEAK_TRACE: bool = False
+    DB_THREADPOOL_SIZE: int = 30
     VERIFICATION_CODE_EXPIRE_MINUTES: int = 10
     PASSWORD_RESET_TOKEN_EXPIRE_MINUTES: int = 10
 
@@ -66,6 +78,34 @@ class Settings(BaseSettings):
     REDIS_URL: Optional[str] = None
     TEST_DATABASE_URL: Optional[str] = None
 
+    TOKEN_DENYLIST_SYNC_SECONDS: int = 5
+    TOKEN_DENYLIST_SYNC_OVERLAP_SECONDS: int = 60
+    TOKEN_DENYLIST_PURGE_MINUTES: int = 60
+
+    LOOP_LAG_SAMPLE_SECONDS: float = 0.5
+    LOOP_LAG_WARN_MS: int = 100
+    DB_QUERY_HEADERS: bool = False
+    N_PLUS_ONE_THRESHOLD: int = 10
+
+    LESSON_HEARTBEAT_FLUSH_SECONDS: int = 15
+    LESSON_HEARTBEAT_MAX_SECONDS: int = 300
+
+    COURSE_TREE_CACHE_SIZE: int = 1024
+    EXAM_CONTENT_CACHE_SIZE: int = 1024
+    EXAM_ELIGIBILITY_TTL_SECONDS: int = 30
+    EXAM_GRADING_VECTORIZE_MIN_QUESTIONS: int = 200
+
+    LEADERBOARD_RANK_BACKEND: str = "memory"
+    LEADERBOARD_RANK_TTL_SECONDS: int = 60
+    TRADING_LEADERBOARD_DEBOUNCE_SECONDS: float = 2.0
+    TRADING_LEADERBOARD_REFRESH_BATCH_SIZE: int = 500
+
+    ROLE_REGISTRY_REFRESH_SECONDS: int = 60
+
+    EXPORT_BATCH_SIZE: int = 5000
+
+    REPORT_ROLLUP_RECOMPUTE_DAYS: int = 7
+
     class Config:
         env_file = ".env"
 
@@ -86,3 +86,7 @@ class TimePeriod(str, Enum):
     YEAR = "year"
     MONTH = "month"
     WEEK = "week"
+
+class ExportFormatEnum(str, Enum):
+    CSV = "csv"
+    XLSX = "xlsx"
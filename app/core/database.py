@@ -1,19 +1,134 @@
-from sqlalchemy import create_engine
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .metrics import PoolMonitor, TimedQueuePool
 
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_size=10,
-    max_overflow=20,
-    pool_timeout=30,
-    pool_recycle=1800,
-    pool_pre_ping=True,
+    poolclass=TimedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
     echo=False
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+pool_monitor = PoolMonitor(
+    engine, name="primary", leak_seconds=settings.DB_CONNECTION_LEAK_SECONDS, trace_stacks=settings.DB_CONNECTION_LEAK_TRACE
+)
+
+logger = logging.getLogger(__name__)
+
+replica_engine = None
+ReplicaSessionLocal = None
+replica_pool_monitor = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        echo=False,
+        execution_options={"postgresql_readonly": True}
+    )
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    replica_pool_monitor = PoolMonitor(
+        replica_engine, name="replica", leak_seconds=settings.DB_CONNECTION_LEAK_SECONDS, trace_stacks=settings.DB_CONNECTION_LEAK_TRACE
+    )
+
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_is_in_recovery() "
+    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "ELSE 0 END"
+)
+
+
+class ReadSessionRouter:
+    """Hands out sessions for read-only work, preferring the replica.
+
+    Replication lag is probed at most once per check interval; while the replica
+    is behind by more than the allowed lag (or can't be reached) reads go to the
+    primary instead.
+    """
+
+    def __init__(self, primary_factory, replica_factory=None, max_lag_seconds: float = 5.0, check_interval: float = 10.0):
+        self.primary_factory = primary_factory
+        self.replica_factory = replica_factory
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._use_replica = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def replica_lag(self) -> Optional[float]:
+        db = self.replica_factory()
+        try:
+            lag = db.execute(REPLICA_LAG_QUERY).scalar()
+            return float(lag or 0)
+        except Exception as e:
+            logger.warning(f"Replica lag check failed: {e}")
+            return None
+        finally:
+            db.close()
+
+    def replica_available(self) -> bool:
+        if self.replica_factory is None:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._use_replica
+            self._checked_at = now
+        lag = self.replica_lag()
+        use_replica = lag is not None and lag <= self.max_lag_seconds
+        if not use_replica and lag is not None:
+            logger.warning(f"Replica lag {lag:.1f}s exceeds {self.max_lag_seconds}s, reading from primary")
+        self._use_replica = use_replica
+        return use_replica
+
+    def __call__(self):
+        if self.replica_available():
+            return self.replica_factory()
+        return self.primary_factory()
+
+
+read_session_router = ReadSessionRouter(
+    SessionLocal,
+    ReplicaSessionLocal,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_SECONDS
+)
+
+# Blocking Session work from async code runs here instead of on the event loop.
+# Sized to the connection pool so queued calls wait for a thread, not a connection.
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.DB_THREADPOOL_SIZE,
+    thread_name_prefix="db"
+)
+
+async def run_in_db_thread(func, *args, **kwargs):
+    """Run a synchronous database call on the DB executor and await its result.
+
+    The Session passed in must not be used concurrently by the caller while the
+    call is in flight; awaiting each call in turn keeps that guarantee.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(db_executor, functools.partial(ctx.run, func, *args, **kwargs))
 
 # Database dependency
 def get_db():
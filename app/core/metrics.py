@@ -0,0 +1,305 @@
+import asyncio
+import logging
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopLagMonitor:
+    """Samples how late the event loop wakes up from a fixed sleep.
+
+    Anything that blocks the loop (sync DB calls, hashing, heavy serialization)
+    shows up directly as lag here, so this is the number to watch when moving
+    work off the loop.
+    """
+
+    def __init__(self, interval: float = 0.5, window: int = 240):
+        self.interval = interval
+        self._samples: deque = deque(maxlen=window)
+        self._max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(loop.time() - start - self.interval)
+
+    def record(self, lag: float):
+        lag = max(0.0, lag)
+        self._samples.append(lag)
+        self._max_lag = max(self._max_lag, lag)
+        if lag * 1000 >= settings.LOOP_LAG_WARN_MS:
+            logger.warning(f"Event loop lag {lag * 1000:.1f}ms")
+
+    def snapshot(self) -> dict:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"samples": 0, "current_ms": 0.0, "avg_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        return {
+            "samples": len(samples),
+            "current_ms": round(self._samples[-1] * 1000, 2),
+            "avg_ms": round(sum(samples) / len(samples) * 1000, 2),
+            "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 2),
+            "max_ms": round(self._max_lag * 1000, 2),
+        }
+
+
+loop_lag_monitor = EventLoopLagMonitor(interval=settings.LOOP_LAG_SAMPLE_SECONDS)
+
+
+# ASGI scope of the request being served; routing fills in scope["route"] later,
+# so the label is resolved lazily when a connection is checked out.
+request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+
+def current_route() -> str:
+    scope = request_scope.get()
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', scope.get('path', ''))}".strip()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection."""
+
+    monitor: Optional["PoolMonitor"] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.monitor:
+                self.monitor.record_timeout()
+            raise
+        finally:
+            if self.monitor:
+                self.monitor.record_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+
+class PoolMonitor:
+    """Checkout/checkin telemetry and leak detection for one engine's pool.
+
+    Each checkout remembers the route that took it; connections held longer
+    than the leak threshold are logged, either when they come back or when
+    find_leaks() runs. Capturing where each connection was checked out from
+    is too costly for every checkout, so the stack is only recorded and
+    logged with trace_stacks (DB_CONNECTION_LEAK_TRACE) on.
+    """
+
+    def __init__(self, engine, name: str = "primary", leak_seconds: float = 30.0, trace_stacks: bool = False):
+        self.engine = engine
+        self.name = name
+        self.leak_seconds = leak_seconds
+        self.trace_stacks = trace_stacks
+        self._lock = threading.Lock()
+        self._held: Dict[int, dict] = {}
+        self._routes: Dict[str, dict] = {}
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._leaks = 0
+
+        if isinstance(engine.pool, TimedQueuePool):
+            engine.pool.monitor = self
+        event.listen(engine, "checkout", self.on_checkout)
+        event.listen(engine, "checkin", self.on_checkin)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self._wait_total += seconds
+            self._wait_max = max(self._wait_max, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self._timeouts += 1
+        logger.warning(f"[{self.name}] connection pool checkout timed out; held by: {self._held_routes()}")
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        entry = {
+            "route": current_route(),
+            "started": time.perf_counter(),
+            "stack": [f for f in traceback.extract_stack(limit=40) if "sqlalchemy" not in f.filename][-15:] if self.trace_stacks else None,
+            "reported": False,
+        }
+        with self._lock:
+            self._checkouts += 1
+            self._held[id(connection_record)] = entry
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            entry = self._held.pop(id(connection_record), None)
+            if entry is None:
+                return
+            held = time.perf_counter() - entry["started"]
+            stats = self._routes.setdefault(entry["route"], {"count": 0, "total": 0.0, "max": 0.0})
+            stats["count"] += 1
+            stats["total"] += held
+            stats["max"] = max(stats["max"], held)
+        if held >= self.leak_seconds and not entry["reported"]:
+            self._report_leak(entry, held)
+
+    def find_leaks(self) -> int:
+        now = time.perf_counter()
+        with self._lock:
+            leaked = [e for e in self._held.values() if not e["reported"] and now - e["started"] >= self.leak_seconds]
+        for entry in leaked:
+            self._report_leak(entry, now - entry["started"])
+        return len(leaked)
+
+    def _report_leak(self, entry: dict, held: float):
+        entry["reported"] = True
+        with self._lock:
+            self._leaks += 1
+        message = f"[{self.name}] connection held for {held:.1f}s by {entry['route']}"
+        if entry["stack"]:
+            message += ", checked out at:\n" + "".join(traceback.format_list(entry["stack"]))
+        logger.warning(message)
+
+    def _held_routes(self) -> List[str]:
+        with self._lock:
+            return [e["route"] for e in self._held.values()]
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool
+        with self._lock:
+            routes = {
+                route: {
+                    "count": s["count"],
+                    "avg_hold_ms": round(s["total"] / s["count"] * 1000, 2),
+                    "max_hold_ms": round(s["max"] * 1000, 2),
+                }
+                for route, s in self._routes.items()
+            }
+            return {
+                "size": pool.size() if hasattr(pool, "size") else None,
+                "checked_out": len(self._held),
+                "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "leaks": self._leaks,
+                "avg_wait_ms": round(self._wait_total / self._checkouts * 1000, 2) if self._checkouts else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 2),
+                "routes": routes,
+            }
+
+
+class RequestQueryStats:
+    """SQL statements issued while serving one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.duration += seconds
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        with self._lock:
+            return [(stmt, n) for stmt, n in self.statements.most_common() if n >= threshold]
+
+
+query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if query_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = query_stats.get()
+    started = conn.info.get("query_started")
+    if stats is not None and started:
+        stats.record(statement, time.perf_counter() - started.pop())
+
+
+class QueryMetrics:
+    """Per-route query counts and DB time, with N+1 detection.
+
+    Statements are compared on their SQL text, which SQLAlchemy already renders
+    with bound parameters, so the same query run for each row of a loop shows up
+    as one statement repeated many times.
+    """
+
+    def __init__(self, n_plus_one_threshold: int = 10):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._lock = threading.Lock()
+        self._routes: Dict[str, dict] = {}
+        self._listeners: List[Callable[[str, RequestQueryStats], None]] = []
+
+    def add_listener(self, listener: Callable[[str, RequestQueryStats], None]):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, RequestQueryStats], None]):
+        self._listeners.remove(listener)
+
+    def record(self, route: str, stats: RequestQueryStats):
+        suspects = stats.repeated(self.n_plus_one_threshold)
+        for statement, times in suspects:
+            logger.warning(f"Possible N+1 on {route}: statement ran {times}x: {' '.join(statement.split())[:300]}")
+
+        with self._lock:
+            entry = self._routes.setdefault(
+                route, {"requests": 0, "queries": 0, "max_queries": 0, "db_time": 0.0, "n_plus_one": 0}
+            )
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["max_queries"] = max(entry["max_queries"], stats.count)
+            entry["db_time"] += stats.duration
+            entry["n_plus_one"] += 1 if suspects else 0
+
+        for listener in list(self._listeners):
+            listener(route, stats)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                route: {
+                    "requests": e["requests"],
+                    "avg_queries": round(e["queries"] / e["requests"], 2),
+                    "max_queries": e["max_queries"],
+                    "avg_db_ms": round(e["db_time"] / e["requests"] * 1000, 2),
+                    "n_plus_one_requests": e["n_plus_one"],
+                }
+                for route, e in self._routes.items()
+            }
+
+
+query_metrics = QueryMetrics(n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD)
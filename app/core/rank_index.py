@@ -0,0 +1,250 @@
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (member id, score) pairs, best score first.
+Ranking = List[Tuple[int, int]]
+
+
+class RankIndexBackend(ABC):
+    """Per-board sorted sets of integer scores, ordered best first.
+
+    Ranks are competition ranks (1 + members with a strictly higher score),
+    so tied members share a rank. Within a tie, members are ordered by id,
+    highest first, on every backend; the database leaderboard pages use the
+    same order, so a page reads the same from either.
+    """
+
+    @abstractmethod
+    def is_loaded(self, board: int) -> bool:
+        pass
+
+    @abstractmethod
+    def replace(self, board: int, scores: Dict[int, int]) -> None:
+        """Swap in the complete membership of a board and mark it loaded."""
+
+    @abstractmethod
+    def set_scores(self, board: int, scores: Dict[int, int]) -> None:
+        """Upsert members of a loaded board; boards that are not loaded are left alone."""
+
+    @abstractmethod
+    def remove(self, board: int, members: Iterable[int]) -> None:
+        pass
+
+    @abstractmethod
+    def drop(self, board: int) -> None:
+        """Forget a board, so the next read loads it again."""
+
+    @abstractmethod
+    def size(self, board: int) -> int:
+        pass
+
+    @abstractmethod
+    def page(self, board: int, start: int, stop: int) -> Ranking:
+        pass
+
+    @abstractmethod
+    def position(self, board: int, member: int) -> Optional[int]:
+        """Zero-based position of the member in board order, or None if absent."""
+
+    @abstractmethod
+    def score(self, board: int, member: int) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    def rank_of_score(self, board: int, score: int) -> int:
+        pass
+
+
+class _Board:
+    __slots__ = ("scores", "order", "expires_at")
+
+    def __init__(self, scores: Dict[int, int], expires_at: float):
+        self.scores = dict(scores)
+        # (-score, -member): best score first, then the highest member id.
+        self.order = SortedList((-score, -member) for member, score in scores.items())
+        self.expires_at = expires_at
+
+
+class MemoryRankIndex(RankIndexBackend):
+    """Sorted sets held by this process.
+
+    Boards expire after ``ttl_seconds`` so changes committed by other
+    processes show up on the next load.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self._ttl = ttl_seconds
+        self._boards: Dict[int, _Board] = {}
+        self._lock = threading.Lock()
+
+    def _board(self, board: int) -> Optional[_Board]:
+        entry = self._boards.get(board)
+        if entry is None or entry.expires_at < time.monotonic():
+            return None
+        return entry
+
+    def is_loaded(self, board: int) -> bool:
+        with self._lock:
+            return self._board(board) is not None
+
+    def replace(self, board: int, scores: Dict[int, int]) -> None:
+        entry = _Board(scores, time.monotonic() + self._ttl)
+        with self._lock:
+            self._boards[board] = entry
+
+    def set_scores(self, board: int, scores: Dict[int, int]) -> None:
+        with self._lock:
+            entry = self._board(board)
+            if entry is None:
+                return
+            for member, score in scores.items():
+                old = entry.scores.get(member)
+                if old is not None:
+                    entry.order.remove((-old, -member))
+                entry.scores[member] = score
+                entry.order.add((-score, -member))
+
+    def remove(self, board: int, members: Iterable[int]) -> None:
+        with self._lock:
+            entry = self._board(board)
+            if entry is None:
+                return
+            for member in members:
+                old = entry.scores.pop(member, None)
+                if old is not None:
+                    entry.order.remove((-old, -member))
+
+    def drop(self, board: int) -> None:
+        with self._lock:
+            self._boards.pop(board, None)
+
+    def size(self, board: int) -> int:
+        with self._lock:
+            entry = self._board(board)
+            return len(entry.scores) if entry else 0
+
+    def page(self, board: int, start: int, stop: int) -> Ranking:
+        with self._lock:
+            entry = self._board(board)
+            if entry is None:
+                return []
+            return [(-negated_member, -negated_score) for negated_score, negated_member in entry.order[start:stop]]
+
+    def position(self, board: int, member: int) -> Optional[int]:
+        with self._lock:
+            entry = self._board(board)
+            if entry is None or member not in entry.scores:
+                return None
+            return entry.order.index((-entry.scores[member], -member))
+
+    def score(self, board: int, member: int) -> Optional[int]:
+        with self._lock:
+            entry = self._board(board)
+            return entry.scores.get(member) if entry else None
+
+    def rank_of_score(self, board: int, score: int) -> int:
+        with self._lock:
+            entry = self._board(board)
+            if entry is None:
+                return 1
+            # (-score,) sorts before every (-score, -member), so this counts strictly higher scores.
+            return entry.order.bisect_left((-score,)) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"boards": len(self._boards), "members": sum(len(entry.scores) for entry in self._boards.values())}
+
+
+class RedisRankIndex(RankIndexBackend):
+    """One ZSET per board, shared by every process.
+
+    Redis orders equal scores by member string, so members are stored
+    zero-padded to make that the numeric order. As in MemoryRankIndex,
+    boards expire after ``ttl_seconds``, so drift from a lost update heals
+    on the next load.
+    """
+
+    def __init__(self, redis_url: str, ttl_seconds: int, prefix: str = "rank"):
+        import redis
+        self.redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self._ttl = ttl_seconds
+        self._prefix = prefix
+
+    # Bumped with the member encoding, so sets written the old way are ignored.
+    KEY_VERSION = 2
+
+    def _key(self, board: int) -> str:
+        return f"{self._prefix}:v{self.KEY_VERSION}:{board}"
+
+    def _loaded_key(self, board: int) -> str:
+        return f"{self._key(board)}:loaded"
+
+    @staticmethod
+    def _member(member: int) -> str:
+        return f"{member:012d}"
+
+    def is_loaded(self, board: int) -> bool:
+        return bool(self.redis.exists(self._loaded_key(board)))
+
+    def replace(self, board: int, scores: Dict[int, int]) -> None:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(self._key(board))
+        if scores:
+            pipe.zadd(self._key(board), {self._member(member): score for member, score in scores.items()})
+            pipe.expire(self._key(board), self._ttl)
+        pipe.set(self._loaded_key(board), 1, ex=self._ttl)
+        pipe.execute()
+
+    def set_scores(self, board: int, scores: Dict[int, int]) -> None:
+        # Writing into a board nobody has loaded would make a partial set look complete.
+        if scores and self.is_loaded(board):
+            self.redis.zadd(self._key(board), {self._member(member): score for member, score in scores.items()})
+
+    def remove(self, board: int, members: Iterable[int]) -> None:
+        members = [self._member(member) for member in members]
+        if members:
+            self.redis.zrem(self._key(board), *members)
+
+    def drop(self, board: int) -> None:
+        self.redis.delete(self._key(board), self._loaded_key(board))
+
+    def size(self, board: int) -> int:
+        return self.redis.zcard(self._key(board))
+
+    def page(self, board: int, start: int, stop: int) -> Ranking:
+        if stop <= start:
+            return []
+        rows = self.redis.zrevrange(self._key(board), start, stop - 1, withscores=True)
+        return [(int(member), int(score)) for member, score in rows]
+
+    def position(self, board: int, member: int) -> Optional[int]:
+        return self.redis.zrevrank(self._key(board), self._member(member))
+
+    def score(self, board: int, member: int) -> Optional[int]:
+        score = self.redis.zscore(self._key(board), self._member(member))
+        return None if score is None else int(score)
+
+    def rank_of_score(self, board: int, score: int) -> int:
+        return self.redis.zcount(self._key(board), f"({score}", "+inf") + 1
+
+
+def create_rank_index_backend(prefix: str) -> RankIndexBackend:
+    if settings.LEADERBOARD_RANK_BACKEND == "redis" and settings.REDIS_URL:
+        try:
+            logger.info("Initializing Redis rank index backend")
+            return RedisRankIndex(settings.REDIS_URL, settings.LEADERBOARD_RANK_TTL_SECONDS, prefix=prefix)
+        except ImportError:
+            logger.warning("Redis not available, falling back to in-memory rank index")
+        except Exception as e:
+            logger.error(f"Redis connection failed: {e}, falling back to in-memory rank index")
+
+    return MemoryRankIndex(settings.LEADERBOARD_RANK_TTL_SECONDS)
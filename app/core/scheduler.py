@@ -1,8 +1,14 @@
 import logging
 import os
+from datetime import datetime
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, pool_monitor
+from app.core.config import settings
 from app.services.trading import trading_service
+from app.services.token_denylist import token_denylist_service
+from app.services.lesson_heartbeat import lesson_heartbeat_service
+from app.services.report_rollup import report_rollup_service
+from app.crud.role import role_registry
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +26,54 @@ async def generate_daily_snapshots():
         db.close()
 
 
+async def rollup_reports(full: bool = False):
+    db = SessionLocal()
+    try:
+        await report_rollup_service.rollup(db, full=full)
+    except Exception as e:
+        logger.error(f"Error rolling up reports: {e}")
+    finally:
+        db.close()
+
+
+def purge_revoked_tokens():
+    db = SessionLocal()
+    try:
+        purged = token_denylist_service.purge_expired(db)
+        token_denylist_service.load(db)
+        logger.info(f"Token denylist purge removed {purged} expired entries")
+    except Exception as e:
+        logger.error(f"Error purging token denylist: {e}")
+    finally:
+        db.close()
+
+
+def check_connection_leaks():
+    leaked = pool_monitor.find_leaks()
+    if leaked:
+        logger.warning(f"{leaked} database connection(s) held past {pool_monitor.leak_seconds}s")
+
+
+def flush_lesson_heartbeats():
+    db = SessionLocal()
+    try:
+        lesson_heartbeat_service.flush(db)
+    except Exception as e:
+        logger.error(f"Error flushing lesson heartbeats: {e}")
+    finally:
+        db.close()
+
+
+def refresh_role_registry():
+    db = SessionLocal()
+    try:
+        role_registry.load(db)
+    except Exception as e:
+        logger.error(f"Error refreshing role registry: {e}")
+    finally:
+        db.close()
+
+
 def start_scheduler():
     if os.getenv("TESTING") == "true":
         logger.info("Scheduler disabled in test environment")
@@ -35,11 +89,67 @@ def start_scheduler():
             name='Generate Daily Portfolio Snapshots',
             replace_existing=True
         )
+        scheduler.add_job(
+            rollup_reports,
+            'cron',
+            hour=0,
+            minute=15,
+            id='daily_report_rollups',
+            name='Roll Up Daily Report Totals',
+            replace_existing=True
+        )
+        scheduler.add_job(
+            rollup_reports,
+            'cron',
+            day_of_week='sun',
+            hour=1,
+            minute=0,
+            kwargs={'full': True},
+            id='weekly_report_rollup_rebuild',
+            name='Rebuild All Report Rollups',
+            replace_existing=True
+        )
+        scheduler.add_job(
+            purge_revoked_tokens,
+            'interval',
+            minutes=settings.TOKEN_DENYLIST_PURGE_MINUTES,
+            next_run_time=datetime.now(),
+            id='purge_revoked_tokens',
+            name='Purge Expired Revoked Tokens',
+            replace_existing=True
+        )
+        scheduler.add_job(
+            check_connection_leaks,
+            'interval',
+            seconds=max(1, int(settings.DB_CONNECTION_LEAK_SECONDS)),
+            id='check_connection_leaks',
+            name='Check Database Connection Leaks',
+            replace_existing=True
+        )
+        scheduler.add_job(
+            flush_lesson_heartbeats,
+            'interval',
+            seconds=settings.LESSON_HEARTBEAT_FLUSH_SECONDS,
+            id='flush_lesson_heartbeats',
+            name='Flush Buffered Lesson Heartbeats',
+            replace_existing=True
+        )
+        scheduler.add_job(
+            refresh_role_registry,
+            'interval',
+            seconds=settings.ROLE_REGISTRY_REFRESH_SECONDS,
+            next_run_time=datetime.now(),
+            id='refresh_role_registry',
+            name='Refresh Role Registry',
+            replace_existing=True
+        )
         scheduler.start()
-        logger.info("Scheduler started with daily portfolio snapshot job")
+        logger.info("Scheduler started with daily portfolio snapshot, report rollup and rebuild, token denylist purge, connection leak, lesson heartbeat and role registry jobs")
 
 
 def stop_scheduler():
     if scheduler.running:
         scheduler.shutdown()
         logger.info("Scheduler stopped")
+    # Write out whatever the last interval buffered before the process exits.
+    flush_lesson_heartbeats()
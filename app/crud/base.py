@@ -1,15 +1,26 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import base64
+import binascii
+import json
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
+from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import literal, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Query, Session
 from app.core.database import Base
 from datetime import datetime
+from decimal import Decimal
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 T = TypeVar('T')
 
+# Dialects whose INSERT supports ON CONFLICT ... DO UPDATE ... RETURNING.
+UPSERT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
     total: int
@@ -18,6 +29,73 @@ class PaginatedResponse(BaseModel, Generic[T]):
     pages: int
     has_next: bool
     has_previous: bool
+    next_cursor: Optional[str] = None
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    has_next: bool = False
+    total: Optional[int] = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else str(v) if isinstance(v, Decimal) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_keys: Sequence[Any]) -> List[Any]:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(sort_keys):
+            raise ValueError("cursor does not match sort keys")
+        values = []
+        for key, value in zip(sort_keys, raw):
+            python_type = key.type.python_type
+            if value is None or isinstance(value, python_type):
+                values.append(value)
+            elif python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            else:
+                values.append(python_type(value))
+        return values
+    except (ValueError, TypeError, binascii.Error, NotImplementedError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
+
+
+def keyset_paginate(
+    query: Query, sort_keys: Sequence[Any], *, cursor: Optional[str] = None, limit: int = 100, descending: bool = True
+) -> Tuple[List[Any], Optional[str]]:
+    """Page through query by a stable, unique sort key instead of OFFSET.
+
+    sort_keys must end in a unique, non-null column (normally the primary key)
+    so that every row has exactly one position. Returns the page and an opaque
+    cursor for the next one, or None on the last page.
+    """
+    limit = max(limit, 1)
+    if cursor:
+        values = decode_cursor(cursor, sort_keys)
+        row = tuple_(*sort_keys)
+        bound = tuple_(*[literal(value, type_=key.type) for key, value in zip(sort_keys, values)])
+        query = query.filter(row < bound if descending else row > bound)
+
+    ordering = [key.desc() if descending else key.asc() for key in sort_keys]
+    rows = query.order_by(*ordering).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], key.key) for key in sort_keys])
+
+
+def approximate_count(db: Session, model: Type[Any]) -> int:
+    """Planner row estimate for a whole table on Postgres; exact count elsewhere."""
+    if db.get_bind().dialect.name == "postgresql":
+        estimate = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": model.__table__.name}
+        ).scalar()
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+    return db.query(model).count()
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
@@ -37,6 +115,14 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             query = query.filter(self.model.deleted_at == None)
         return query.offset(skip).limit(limit).all()
 
+    def get_multi_keyset(
+        self, db: Session, *, cursor: Optional[str] = None, limit: int = 100, descending: bool = False
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        query = db.query(self.model)
+        if hasattr(self.model, 'deleted_at'):
+            query = query.filter(self.model.deleted_at == None)
+        return keyset_paginate(query, [self.model.id], cursor=cursor, limit=limit, descending=descending)
+
     def get_by_email(self, db: Session, email: str) -> Optional[ModelType]:
         query = db.query(self.model).filter(self.model.email == email)
         if hasattr(self.model, 'deleted_at'):
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import or_
-from typing import List, Optional
+from sqlalchemy import and_, case, event, exists, func, inspect, or_, select, update
+from typing import Dict, List, Optional
 from datetime import datetime
 
 from app.crud.base import CRUDBase
@@ -8,24 +8,39 @@ from app.models.course import Course, course_teachers_association, course_studen
 from app.models.course_enrollment import CourseEnrollment
 from app.models.curriculum import Curriculum
 from app.models.exam import Exam
+from app.models.lesson import Lesson
+from app.models.lesson_progress import LessonProgress
 from app.models.user import User
 from app.schemas.course import CourseCreate, CourseUpdate
 
 
 class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
 
-    def _query_with_relationships(self, db: Session):
-        return db.query(Course).options(
+    # Named eager-load sets, built lazily so mappers are configured first. Pick
+    # the lightest one that covers what the caller touches; anything not listed
+    # still lazy-loads, so a lighter profile is never wrong, only chattier.
+    LOAD_PROFILES = {
+        # Membership is checked with EXISTS queries, so permission checks
+        # need no rosters either.
+        "minimal": lambda: (),
+        "detail": lambda: (
             selectinload(Course.teachers),
             selectinload(Course.students),
             selectinload(Course.school),
+            selectinload(Course.curriculums).selectinload(Curriculum.lessons),
+            selectinload(Course.ratings),
+        ),
+        "progress": lambda: (
             selectinload(Course.curriculums).selectinload(Curriculum.lessons),
             selectinload(Course.enrollments).selectinload(CourseEnrollment.lesson_progress),
-            selectinload(Course.ratings)
-        )
+        ),
+    }
 
-    def _query_active(self, db: Session):
-        return self._query_with_relationships(db).filter(Course.deleted_at.is_(None))
+    def _query_with_relationships(self, db: Session, profile: str = "detail"):
+        return db.query(Course).options(*self.LOAD_PROFILES[profile]())
+
+    def _query_active(self, db: Session, profile: str = "detail"):
+        return self._query_with_relationships(db, profile).filter(Course.deleted_at.is_(None))
 
     def create(self, db: Session, obj_in: dict):
         db_obj = Course(**obj_in)
@@ -33,10 +48,30 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
         db.commit()
         return self.get(db, id=db_obj.id)
 
-    def get(self, db: Session, id: int):
-        return self._query_active(db).filter(Course.id == id).first()
+    def get(self, db: Session, id: int, profile: str = "detail"):
+        return self._query_active(db, profile).filter(Course.id == id).first()
+
+    def _membership(self, db: Session, table, course_id: int, user_id: int) -> bool:
+        # Memoized on the session, which lives for one request.
+        memo = db.info.setdefault("course_membership", {})
+        key = (table.name, course_id, user_id)
+        if key not in memo:
+            memo[key] = db.query(
+                exists().where(table.c.course_id == course_id, table.c.user_id == user_id)
+            ).scalar()
+        return memo[key]
+
+    def _forget_membership(self, db: Session, table, course_id: int, user_id: int):
+        db.info.get("course_membership", {}).pop((table.name, course_id, user_id), None)
+
+    def has_teacher(self, db: Session, *, course_id: int, user_id: int) -> bool:
+        return self._membership(db, course_teachers_association, course_id, user_id)
+
+    def has_student(self, db: Session, *, course_id: int, user_id: int) -> bool:
+        return self._membership(db, course_students_association, course_id, user_id)
 
     def add_teacher_to_course(self, db: Session, *, course: Course, user: User) -> Course:
+         self._forget_membership(db, course_teachers_association, course.id, user.id)
          if user not in course.teachers:
              course.teachers.append(user)
              db.add(course)
@@ -46,6 +81,7 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
          return course
 
     def remove_teacher_from_course(self, db: Session, *, course: Course, user: User) -> Course:
+         self._forget_membership(db, course_teachers_association, course.id, user.id)
          if user in course.teachers:
              course.teachers.remove(user)
              db.add(course)
@@ -55,20 +91,22 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
          return course
 
     def enroll_student_in_course(self, db: Session, *, course: Course, user: User) -> Course:
+        self._forget_membership(db, course_students_association, course.id, user.id)
         if user not in course.students:
             course.students.append(user)
             db.add(course)
         return course
 
     def unenroll_student_from_course(self, db: Session, *, course: Course, user: User) -> Course:
+        self._forget_membership(db, course_students_association, course.id, user.id)
         if user in course.students:
             course.students.remove(user)
             db.add(course)
         return course
 
-    def get_courses_by_user_id(self, db: Session, user_id: int) -> List[Course]:
+    def get_courses_by_user_id(self, db: Session, user_id: int, profile: str = "detail") -> List[Course]:
         return (
-            self._query_active(db)
+            self._query_active(db, profile)
             .join(course_teachers_association, Course.id == course_teachers_association.c.course_id, isouter=True)
             .join(course_students_association, Course.id == course_students_association.c.course_id, isouter=True)
             .join(User, or_(
@@ -86,9 +124,9 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
             .all()
         )
 
-    def get_teacher_courses(self, db: Session, user_id: int) -> List[Course]:
+    def get_teacher_courses(self, db: Session, user_id: int, profile: str = "detail") -> List[Course]:
         return (
-            self._query_active(db)
+            self._query_active(db, profile)
             .join(course_teachers_association)
             .join(User, course_teachers_association.c.user_id == User.id)
             .filter(course_teachers_association.c.user_id == user_id)
@@ -96,9 +134,9 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
             .all()
         )
 
-    def get_student_courses(self, db: Session, user_id: int) -> List[Course]:
+    def get_student_courses(self, db: Session, user_id: int, profile: str = "detail") -> List[Course]:
         return (
-            self._query_active(db)
+            self._query_active(db, profile)
             .join(course_students_association)
             .join(User, course_students_association.c.user_id == User.id)
             .filter(course_students_association.c.user_id == user_id)
@@ -106,37 +144,29 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
             .all()
         )
 
-    def get_courses_by_school(self, db: Session, school_id: int, skip: int = 0, limit: int = 100) -> List[Course]:
+    def get_courses_by_school(self, db: Session, school_id: int, skip: int = 0, limit: int = 100, profile: str = "detail") -> List[Course]:
         return (
-            self._query_active(db)
+            self._query_active(db, profile)
             .filter(Course.school_id == school_id)
             .offset(skip)
             .limit(limit)
             .all()
         )
 
-    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[Course]:
+    def get_multi(self, db: Session, skip: int = 0, limit: int = 100, profile: str = "detail") -> List[Course]:
         return (
-            self._query_active(db)
+            self._query_active(db, profile)
             .offset(skip)
             .limit(limit)
             .all()
         )
 
     def is_user_enrolled(self, db: Session, *, course_id: int, user_id: int) -> bool:
-        course = self.get(db, id=course_id)
-        if not course:
-            return False
-
-        user = db.get(User, user_id)
-        if not user:
-            return False
+        return self.has_student(db, course_id=course_id, user_id=user_id) or self.has_teacher(db, course_id=course_id, user_id=user_id)
 
-        return user in course.students or user in course.teachers
-
-    def get_active_courses(self, db: Session, skip: int = 0, limit: int = 100) -> List[Course]:
+    def get_active_courses(self, db: Session, skip: int = 0, limit: int = 100, profile: str = "detail") -> List[Course]:
         return (
-            self._query_active(db)
+            self._query_active(db, profile)
             .filter(Course.is_active == True)
             .offset(skip)
             .limit(limit)
@@ -144,7 +174,7 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
         )
 
     def get_courses_by_school_count(self, db: Session, school_id: int, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> int:
-        query = self._query_active(db).filter(Course.school_id == school_id)
+        query = self._query_active(db, "minimal").filter(Course.school_id == school_id)
         if start_date:
             query = query.filter(Course.created_at >= start_date)
         if end_date:
@@ -152,22 +182,54 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
         return query.count()
 
     def get_all_courses_count(self, db: Session, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> int:
-        query = self._query_active(db)
+        query = self._query_active(db, "minimal")
         if start_date:
             query = query.filter(Course.created_at >= start_date)
         if end_date:
             query = query.filter(Course.created_at <= end_date)
         return query.count()
 
-    def get_batch_with_relationships(self, db: Session, course_ids: List[int]) -> List[Course]:
+    def get_batch_with_relationships(self, db: Session, course_ids: List[int], profile: str = "detail") -> List[Course]:
         if not course_ids:
             return []
 
-        return db.query(Course).options(
-            selectinload(Course.enrollments),
-            selectinload(Course.enrollments).selectinload(CourseEnrollment.lesson_progress),
-            selectinload(Course.curriculums).selectinload(Curriculum.lessons)
-        ).filter(Course.id.in_(course_ids)).filter(Course.deleted_at.is_(None)).all()
+        return self._query_active(db, profile).filter(Course.id.in_(course_ids)).all()
+
+    def get_content_trees(self, db: Session, course_ids: List[int]):
+        """(Curriculum, Lesson | None) rows for the live content of the given courses, in display order."""
+        if not course_ids:
+            return []
+        return (
+            db.query(Curriculum, Lesson)
+            .outerjoin(Lesson, and_(Lesson.curriculum_id == Curriculum.id, Lesson.deleted_at.is_(None)))
+            .filter(Curriculum.course_id.in_(course_ids), Curriculum.deleted_at.is_(None))
+            .order_by(Curriculum.course_id, Curriculum.order, Curriculum.id, Lesson.order, Lesson.id)
+            .all()
+        )
+
+    def get_school_and_student_ids(self, db: Session, course_id: int) -> Optional[tuple]:
+        """(school_id, frozenset of student ids) for a live course, or None."""
+        school_id = db.query(Course.school_id).filter(Course.id == course_id, Course.deleted_at.is_(None)).scalar()
+        if school_id is None:
+            return None
+        rows = db.query(course_students_association.c.user_id).filter(course_students_association.c.course_id == course_id)
+        return school_id, frozenset(row.user_id for row in rows)
+
+    def get_student_counts(self, db: Session, course_ids: List[int]) -> Dict[int, int]:
+        if not course_ids:
+            return {}
+        rows = (
+            db.query(course_students_association.c.course_id, func.count())
+            .filter(course_students_association.c.course_id.in_(course_ids))
+            .group_by(course_students_association.c.course_id)
+            .all()
+        )
+        return dict(rows)
+
+    def refresh_progress_counters(self, db: Session, course_id: int) -> None:
+        """Recount total_lessons and each enrollment's completed_lessons; callers commit."""
+        for statement in _progress_counter_statements(course_id):
+            db.execute(statement, execution_options={"synchronize_session": "fetch"})
 
     def bulk_soft_delete_related_entities(self, db: Session, course_id: int) -> None:
         now = datetime.utcnow()
@@ -180,3 +242,94 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
 
 
 course = CRUDCourse(Course)
+
+
+def _progress_counter_statements(course_id) -> list:
+    """UPDATEs restating a course's lesson count and its enrollments' completions.
+
+    Completions only count lessons still live in the course, so a lesson
+    that is deleted or moves away stops counting towards progress.
+    """
+    live_lessons = (
+        select(func.count(Lesson.id))
+        .join(Curriculum, Lesson.curriculum_id == Curriculum.id)
+        .where(Curriculum.course_id == course_id, Curriculum.deleted_at.is_(None), Lesson.deleted_at.is_(None))
+        .scalar_subquery()
+    )
+    completed_lessons = (
+        select(func.count(LessonProgress.id))
+        .join(Lesson, LessonProgress.lesson_id == Lesson.id)
+        .join(Curriculum, Lesson.curriculum_id == Curriculum.id)
+        .where(
+            LessonProgress.enrollment_id == CourseEnrollment.id,
+            LessonProgress.is_completed.is_(True),
+            LessonProgress.deleted_at.is_(None),
+            Lesson.deleted_at.is_(None),
+            Curriculum.deleted_at.is_(None),
+            Curriculum.course_id == course_id,
+        )
+        .scalar_subquery()
+    )
+    total_lessons = select(Course.total_lessons).where(Course.id == course_id).scalar_subquery()
+    return [
+        update(Course).where(Course.id == course_id).values(total_lessons=live_lessons),
+        update(CourseEnrollment).where(CourseEnrollment.course_id == course_id).values(completed_lessons=completed_lessons),
+        update(CourseEnrollment).where(CourseEnrollment.course_id == course_id).values(progress_percentage=case(
+            (total_lessons > 0, func.least(100, CourseEnrollment.completed_lessons * 100 // total_lessons)),
+            else_=0,
+        )),
+    ]
+
+
+def _moved_from(obj, attribute: str):
+    """The previous value of ``attribute`` if this flush changed it, else None."""
+    history = inspect(obj).attrs[attribute].history
+    previous = history.deleted[0] if history.deleted and history.has_changes() else None
+    return previous if previous != getattr(obj, attribute) else None
+
+
+# Content versions and progress counters are restated once per flush, so that
+# every write path, not only the CRUD methods above, invalidates cached course
+# trees; lessons and curricula moved to another parent restate the counters
+# of both courses.
+@event.listens_for(Session, "after_flush")
+def _course_content_written(session, flush_context) -> None:
+    course_ids, curriculum_ids = set(), set()
+    moved_course_ids, moved_curriculum_ids = set(), set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if isinstance(obj, Curriculum):
+            course_ids.add(obj.course_id)
+            previous = _moved_from(obj, "course_id")
+            if previous is not None:
+                course_ids.add(previous)
+                moved_course_ids.update((previous, obj.course_id))
+        elif isinstance(obj, Lesson):
+            curriculum_ids.add(obj.curriculum_id)
+            previous = _moved_from(obj, "curriculum_id")
+            if previous is not None:
+                curriculum_ids.add(previous)
+                moved_curriculum_ids.update((previous, obj.curriculum_id))
+    curriculum_ids.discard(None)
+    if not course_ids and not curriculum_ids:
+        return
+
+    connection = session.connection()
+    if curriculum_ids:
+        course_of = dict(connection.execute(
+            select(Curriculum.id, Curriculum.course_id).where(Curriculum.id.in_(sorted(curriculum_ids)))
+        ).all())
+        course_ids.update(course_of.values())
+        moved_course_ids.update(course_of[c] for c in moved_curriculum_ids if c in course_of)
+    course_ids.discard(None)
+    if course_ids:
+        courses = Course.__table__
+        connection.execute(
+            courses.update()
+            .where(courses.c.id.in_(sorted(course_ids)))
+            .values(content_version=courses.c.content_version + 1)
+        )
+    for course_id in sorted(moved_course_ids - {None}):
+        for statement in _progress_counter_statements(course_id):
+            connection.execute(statement)
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session, selectinload
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from app.crud.base import CRUDBase
@@ -12,18 +12,26 @@ from app.schemas.course_enrollment import CourseEnrollmentCreate, CourseEnrollme
 
 class CRUDCourseEnrollment(CRUDBase[CourseEnrollment, CourseEnrollmentCreate, CourseEnrollmentUpdate]):
 
-    def _query_with_relationships(self, db: Session):
-        return db.query(CourseEnrollment).options(
+    LOAD_PROFILES = {
+        "minimal": lambda: (),
+        "detail": lambda: (
             selectinload(CourseEnrollment.user),
             selectinload(CourseEnrollment.course).selectinload(Course.curriculums).selectinload(Curriculum.lessons),
-            selectinload(CourseEnrollment.lesson_progress)
-        )
+            selectinload(CourseEnrollment.lesson_progress),
+        ),
+        "progress": lambda: (
+            selectinload(CourseEnrollment.lesson_progress),
+        ),
+    }
+
+    def _query_with_relationships(self, db: Session, profile: str = "detail"):
+        return db.query(CourseEnrollment).options(*self.LOAD_PROFILES[profile]())
 
-    def _query_active(self, db: Session):
-        return self._query_with_relationships(db).filter(CourseEnrollment.deleted_at.is_(None))
+    def _query_active(self, db: Session, profile: str = "detail"):
+        return self._query_with_relationships(db, profile).filter(CourseEnrollment.deleted_at.is_(None))
 
-    def get(self, db: Session, id: int):
-        return self._query_active(db).filter(CourseEnrollment.id == id).first()
+    def get(self, db: Session, id: int, profile: str = "detail"):
+        return self._query_active(db, profile).filter(CourseEnrollment.id == id).first()
 
     def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[CourseEnrollment]:
         return (
@@ -33,26 +41,26 @@ class CRUDCourseEnrollment(CRUDBase[CourseEnrollment, CourseEnrollmentCreate, Co
             .all()
         )
 
-    def get_by_user_and_course(self, db: Session, user_id: int, course_id: int) -> Optional[CourseEnrollment]:
+    def get_by_user_and_course(self, db: Session, user_id: int, course_id: int, profile: str = "detail") -> Optional[CourseEnrollment]:
         return (
-            self._query_active(db)
+            self._query_active(db, profile)
             .filter(CourseEnrollment.user_id == user_id)
             .filter(CourseEnrollment.course_id == course_id)
             .first()
         )
 
-    def get_by_user(self, db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[CourseEnrollment]:
+    def get_by_user(self, db: Session, user_id: int, skip: int = 0, limit: int = 100, profile: str = "detail") -> List[CourseEnrollment]:
         return (
-            self._query_active(db)
+            self._query_active(db, profile)
             .filter(CourseEnrollment.user_id == user_id)
             .offset(skip)
             .limit(limit)
             .all()
         )
 
-    def get_by_course(self, db: Session, course_id: int, skip: int = 0, limit: int = 100) -> List[CourseEnrollment]:
+    def get_by_course(self, db: Session, course_id: int, skip: int = 0, limit: int = 100, profile: str = "detail") -> List[CourseEnrollment]:
         return (
-            self._query_active(db)
+            self._query_active(db, profile)
             .filter(CourseEnrollment.course_id == course_id)
             .offset(skip)
             .limit(limit)
@@ -75,9 +83,39 @@ class CRUDCourseEnrollment(CRUDBase[CourseEnrollment, CourseEnrollmentCreate, Co
             .all()
         )
 
+    def get_by_user_for_courses(self, db: Session, user_id: int, course_ids: List[int], profile: str = "progress") -> Dict[int, CourseEnrollment]:
+        if not course_ids:
+            return {}
+
+        enrollments = (
+            self._query_active(db, profile)
+            .filter(CourseEnrollment.user_id == user_id)
+            .filter(CourseEnrollment.course_id.in_(course_ids))
+            .all()
+        )
+        return {enrollment.course_id: enrollment for enrollment in enrollments}
+
+    def increment_completed_lessons(self, db: Session, enrollment: CourseEnrollment, count: int = 1) -> None:
+        # Evaluated in the UPDATE, so concurrent completions can't lose a count.
+        enrollment.completed_lessons = CourseEnrollment.completed_lessons + count
+        db.add(enrollment)
+
+    def get_progress_counters_for_user(self, db: Session, user_id: int) -> List[Tuple[Any, int, int]]:
+        """(course level, total lessons, completed lessons) for each live enrollment."""
+        return (
+            db.query(Course.level, Course.total_lessons, CourseEnrollment.completed_lessons)
+            .join(Course, CourseEnrollment.course_id == Course.id)
+            .filter(
+                CourseEnrollment.user_id == user_id,
+                CourseEnrollment.deleted_at.is_(None),
+                Course.deleted_at.is_(None),
+            )
+            .all()
+        )
+
     def get_student_count_for_course(self, db: Session, course_id: int) -> int:
         return (
-            self._query_active(db)
+            self._query_active(db, "minimal")
             .filter(CourseEnrollment.course_id == course_id)
             .count()
         )
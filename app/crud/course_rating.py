@@ -47,6 +47,20 @@ class CRUDCourseRating(CRUDBase[CourseRating, CourseRatingCreate, CourseRatingUp
             .all()
         )
 
+    def get_by_courses(self, db: Session, course_ids: List[int]) -> Dict[int, List[CourseRating]]:
+        if not course_ids:
+            return {}
+        ratings = (
+            db.query(CourseRating)
+            .filter(CourseRating.course_id.in_(course_ids), CourseRating.deleted_at.is_(None))
+            .order_by(CourseRating.created_at.desc())
+            .all()
+        )
+        by_course: Dict[int, List[CourseRating]] = {}
+        for rating in ratings:
+            by_course.setdefault(rating.course_id, []).append(rating)
+        return by_course
+
     def get_by_user(self, db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[CourseRating]:
         return (
             self._query_active(db)
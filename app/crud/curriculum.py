@@ -1,7 +1,9 @@
 from sqlalchemy.orm import Session, selectinload
 from typing import Any, List, Optional
+from datetime import datetime
 
 from app.crud.base import CRUDBase
+from app.crud.course import course as crud_course
 from app.models.curriculum import Curriculum
 from app.schemas.curriculum import CurriculumCreate, CurriculumUpdate
 
@@ -18,4 +20,16 @@ class CRUDCurriculum(CRUDBase[Curriculum, CurriculumCreate, CurriculumUpdate]):
     def get_curriculums_by_course(self, db: Session, *, course_ids: List[int]) -> List[Curriculum]:
         return db.query(self.model).options(selectinload(self.model.lessons)).filter(self.model.course_id.in_(course_ids), self.model.deleted_at == None).order_by(self.model.course_id, self.model.order).all()
 
+    def delete(self, db: Session, *, id: int) -> Optional[Curriculum]:
+        obj = db.query(self.model).get(id)
+        if not obj:
+            return None
+
+        obj.deleted_at = datetime.utcnow()
+        db.flush()
+        crud_course.refresh_progress_counters(db, obj.course_id)
+        db.commit()
+        db.refresh(obj)
+        return obj
+
 curriculum = CRUDCurriculum(Curriculum)
@@ -25,6 +25,20 @@ class CRUDExam(CRUDBase[Exam, ExamCreate, ExamUpdate]):
     def get(self, db: Session, id: int):
         return self._query_active(db).filter(Exam.id == id).first()
 
+    def get_course_id(self, db: Session, exam: Exam) -> Optional[int]:
+        if exam.course_id:
+            return exam.course_id
+        if exam.curriculum_id:
+            return db.query(Curriculum.course_id).filter(
+                Curriculum.id == exam.curriculum_id,
+                Curriculum.deleted_at.is_(None)
+            ).scalar()
+        return None
+
+    def get_minimal(self, db: Session, id: int):
+        """The exam row alone; questions come from the exam content cache."""
+        return db.query(Exam).filter(Exam.id == id, Exam.deleted_at.is_(None)).first()
+
     def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[Exam]:
         return (
             self._query_active(db)
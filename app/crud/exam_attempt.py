@@ -1,10 +1,11 @@
+from datetime import datetime
 from sqlalchemy.orm import Session, selectinload
-from typing import List
-from sqlalchemy import func
+from typing import Iterable, List, Optional, Set
+from sqlalchemy import case, func, insert
 
 from app.core.constants import ExamAttemptStatusEnum
-from app.crud.base import CRUDBase
-from app.models.exam_attempt import ExamAttempt
+from app.crud.base import CRUDBase, UPSERT_INSERTS
+from app.models.exam_attempt import ExamAttempt, IN_PROGRESS_ONLY
 from app.schemas.exam_attempt import ExamAttemptCreate, ExamAttemptUpdate
 
 class CRUDExamAttempt(CRUDBase[ExamAttempt, ExamAttemptCreate, ExamAttemptUpdate]):
@@ -19,6 +20,10 @@ class CRUDExamAttempt(CRUDBase[ExamAttempt, ExamAttemptCreate, ExamAttemptUpdate
     def get(self, db: Session, id: int):
         return self._query_with_relationships(db).filter(ExamAttempt.id == id).first()
 
+    def get_minimal(self, db: Session, id: int):
+        """The attempt row alone, for checks that don't need the exam, user or answers."""
+        return db.query(ExamAttempt).filter(ExamAttempt.id == id).first()
+
     def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[ExamAttempt]:
         return (
             self._query_with_relationships(db)
@@ -27,6 +32,45 @@ class CRUDExamAttempt(CRUDBase[ExamAttempt, ExamAttemptCreate, ExamAttemptUpdate
             .all()
         )
 
+    def get_start_state(self, db: Session, user_id: int, exam_id: int) -> Optional[tuple]:
+        """(id, status) of the user's open attempt at the exam, else of their latest one; None if they have none."""
+        return (
+            db.query(ExamAttempt.id, ExamAttempt.status)
+            .filter(ExamAttempt.user_id == user_id, ExamAttempt.exam_id == exam_id)
+            .order_by(case((ExamAttempt.status == ExamAttemptStatusEnum.IN_PROGRESS, 0), else_=1), ExamAttempt.id.desc())
+            .first()
+        )
+
+    def get_user_ids_with_attempts(self, db: Session, exam_id: int, in_progress_only: bool = False) -> Set[int]:
+        query = db.query(ExamAttempt.user_id).filter(ExamAttempt.exam_id == exam_id)
+        if in_progress_only:
+            query = query.filter(ExamAttempt.status == ExamAttemptStatusEnum.IN_PROGRESS)
+        return {row.user_id for row in query.distinct()}
+
+    def create_many_for_users(self, db: Session, *, exam_id: int, user_ids: Iterable[int], start_time: datetime) -> int:
+        """Insert one in-progress attempt per user in a single executemany. Does not commit."""
+        rows = [{"user_id": user_id, "exam_id": exam_id, "start_time": start_time} for user_id in user_ids]
+        return len(self._insert_in_progress(db, rows))
+
+    def start_for_user(self, db: Session, *, user_id: int, exam_id: int, start_time: datetime) -> Optional[int]:
+        """Id of a new in-progress attempt, or None if the user already has one open. Does not commit."""
+        ids = self._insert_in_progress(db, [{"user_id": user_id, "exam_id": exam_id, "start_time": start_time}])
+        return ids[0] if ids else None
+
+    def _insert_in_progress(self, db: Session, rows: List[dict]) -> List[int]:
+        # Users with an open attempt are skipped rather than failing the whole
+        # insert on uq_exam_attempts_user_exam_in_progress.
+        if not rows:
+            return []
+        upsert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if upsert is None:
+            stmt = insert(ExamAttempt)
+        else:
+            stmt = upsert(ExamAttempt).on_conflict_do_nothing(
+                index_elements=[ExamAttempt.user_id, ExamAttempt.exam_id], index_where=IN_PROGRESS_ONLY
+            )
+        return list(db.execute(stmt.returning(ExamAttempt.id), rows).scalars())
+
     def get_by_user_and_exam(self, db: Session, user_id: int, exam_id: int) -> List[ExamAttempt]:
         return (
             self._query_with_relationships(db)
@@ -1,7 +1,10 @@
 from sqlalchemy.orm import Session, selectinload
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
+from datetime import datetime
 
 from app.crud.base import CRUDBase
+from app.crud.course import course as crud_course
+from app.models.curriculum import Curriculum
 from app.models.lesson import Lesson
 from app.schemas.lesson import LessonCreate, LessonUpdate
 
@@ -15,4 +18,40 @@ class CRUDLesson(CRUDBase[Lesson, LessonCreate, LessonUpdate]):
     def get_by_curriculum(self, db: Session, *, curriculum_id: int) -> List[Lesson]:
         return db.query(self.model).filter(self.model.curriculum_id == curriculum_id, self.model.deleted_at == None).order_by(self.model.order).all()
 
+    def get_course_ids(self, db: Session, lesson_ids: List[int]) -> Dict[int, int]:
+        """Map each live lesson in lesson_ids to its course."""
+        if not lesson_ids:
+            return {}
+        rows = (
+            db.query(self.model.id, Curriculum.course_id)
+            .join(Curriculum, self.model.curriculum_id == Curriculum.id)
+            .filter(self.model.id.in_(lesson_ids), self.model.deleted_at == None, Curriculum.deleted_at == None)
+            .all()
+        )
+        return dict(rows)
+
+    def _refresh_course_lesson_count(self, db: Session, curriculum_id: int) -> None:
+        course_id = db.query(Curriculum.course_id).filter(Curriculum.id == curriculum_id).scalar()
+        if course_id is not None:
+            crud_course.refresh_progress_counters(db, course_id)
+
+    def create(self, db: Session, *, obj_in: LessonCreate, commit: bool = True) -> Lesson:
+        db_obj = super().create(db, obj_in=obj_in, commit=False)
+        self._refresh_course_lesson_count(db, db_obj.curriculum_id)
+        if commit:
+            db.commit()
+        return db_obj
+
+    def delete(self, db: Session, *, id: int) -> Optional[Lesson]:
+        obj = db.query(self.model).get(id)
+        if not obj:
+            return None
+
+        obj.deleted_at = datetime.utcnow()
+        db.flush()
+        self._refresh_course_lesson_count(db, obj.curriculum_id)
+        db.commit()
+        db.refresh(obj)
+        return obj
+
 lesson = CRUDLesson(Lesson)
@@ -1,9 +1,11 @@
+from sqlalchemy import bindparam, func
 from sqlalchemy.orm import Session, selectinload
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from app.crud.base import CRUDBase
 from app.models.lesson_progress import LessonProgress
 from app.models.lesson import Lesson
+from app.models.course_enrollment import CourseEnrollment
 from app.schemas.lesson_progress import LessonProgressCreate, LessonProgressUpdate
 
 class CRUDLessonProgress(CRUDBase[LessonProgress, LessonProgressCreate, LessonProgressUpdate]):
@@ -72,6 +74,48 @@ class CRUDLessonProgress(CRUDBase[LessonProgress, LessonProgressCreate, LessonPr
             .all()
         )
 
+    def get_for_enrollments_and_lessons(self, db: Session, enrollment_ids: List[int], lesson_ids: List[int]) -> List[LessonProgress]:
+        if not enrollment_ids or not lesson_ids:
+            return []
+        return (
+            db.query(LessonProgress)
+            .filter(LessonProgress.deleted_at.is_(None))
+            .filter(LessonProgress.enrollment_id.in_(enrollment_ids))
+            .filter(LessonProgress.lesson_id.in_(lesson_ids))
+            .all()
+        )
+
+    def get_id_for_user_and_lesson(self, db: Session, user_id: int, lesson_id: int) -> Optional[int]:
+        # Nothing stops a user having duplicate progress rows for a lesson; take the oldest.
+        row = (
+            db.query(LessonProgress.id)
+            .join(CourseEnrollment, LessonProgress.enrollment_id == CourseEnrollment.id)
+            .filter(
+                CourseEnrollment.user_id == user_id,
+                CourseEnrollment.deleted_at.is_(None),
+                LessonProgress.lesson_id == lesson_id,
+                LessonProgress.deleted_at.is_(None),
+            )
+            .order_by(LessonProgress.id)
+            .first()
+        )
+        return row.id if row else None
+
+    def add_time_spent(self, db: Session, increments: List[Dict[str, Any]]) -> None:
+        """Bulk-apply {"progress_id", "seconds", "accessed_at"} increments in one executemany UPDATE."""
+        if not increments:
+            return
+        table = LessonProgress.__table__
+        db.execute(
+            table.update()
+            .where(table.c.id == bindparam("progress_id"))
+            .values(
+                time_spent_seconds=func.coalesce(table.c.time_spent_seconds, 0) + bindparam("seconds"),
+                last_accessed_at=bindparam("accessed_at"),
+            ),
+            increments,
+        )
+
     def count_completed_by_enrollment(self, db: Session, enrollment_id: int) -> int:
         return (
             self._query_active(db)
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 
-from app.crud.base import CRUDBase
+from app.crud.base import CRUDBase, keyset_paginate
 from app.models.notification import Notification
 from app.schemas.notification import NotificationCreate, NotificationUpdate
 
@@ -11,6 +11,13 @@ class CRUDNotification(CRUDBase[Notification, NotificationCreate, NotificationUp
     def get_for_user(self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100) -> List[Notification]:
         return db.query(self.model).filter(self.model.user_id == user_id).offset(skip).limit(limit).all()
 
+    def get_page_for_user(
+        self, db: Session, *, user_id: int, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[Notification], Optional[str]]:
+        """Newest first; ids are assigned in creation order."""
+        query = db.query(self.model).filter(self.model.user_id == user_id)
+        return keyset_paginate(query, [self.model.id], cursor=cursor, limit=limit)
+
     def get_unread_for_user(self, db: Session, *, user_id: int) -> List[Notification]:
         return db.query(self.model).filter(self.model.user_id == user_id, self.model.is_read == False).all()
 
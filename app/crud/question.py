@@ -1,7 +1,9 @@
-from typing import List
+from typing import Iterable, List, Set
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
+from app.models.exam import Exam
 from app.models.question import Question
 from app.schemas.question import QuestionCreate, QuestionUpdate
 
@@ -9,4 +11,32 @@ class CRUDQuestion(CRUDBase[Question, QuestionCreate, QuestionUpdate]):
     def get_by_exam(self, db: Session, *, exam_id: int) -> List[Question]:
         return db.query(self.model).filter(self.model.exam_id == exam_id, self.model.deleted_at == None).all()
 
+    def get_ids_in_exam(self, db: Session, *, exam_id: int, question_ids: Iterable[int]) -> Set[int]:
+        """The subset of ``question_ids`` that are live questions of the exam."""
+        rows = db.query(self.model.id).filter(
+            self.model.exam_id == exam_id,
+            self.model.id.in_(list(question_ids)),
+            self.model.deleted_at == None
+        )
+        return {row.id for row in rows}
+
 question = CRUDQuestion(Question)
+
+
+# Bumped once per flush rather than per row, since questions are usually
+# written in batches; covers every ORM write path, not only this CRUD.
+@event.listens_for(Session, "after_flush")
+def _bump_exam_content_versions(session, flush_context) -> None:
+    exam_ids = {
+        obj.exam_id
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, Question) and (obj not in session.dirty or session.is_modified(obj))
+    }
+    exam_ids.discard(None)
+    if exam_ids:
+        exams = Exam.__table__
+        session.connection().execute(
+            exams.update()
+            .where(exams.c.id.in_(sorted(exam_ids)))
+            .values(content_version=exams.c.content_version + 1)
+        )
@@ -1,9 +1,16 @@
+from sqlalchemy import Select, case, delete, func, select, tuple_, update
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import date, datetime, timedelta
 
-from app.crud.base import CRUDBase
+from app.crud.base import CRUDBase, UPSERT_INSERTS, keyset_paginate
+from app.models.portfolio_snapshot import PortfolioSnapshot
 from app.models.report import TradingLeaderboardSnapshot, LeaderboardSnapshot
+from app.models.role import Role
+from app.models.trading import AccountBalance, PortfolioPosition
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.models.user_school_association import user_school_association
 from app.schemas.report import TradingLeaderboardEntrySchema, LeaderboardEntrySchema
 
 class CRUDTradingLeaderboardSnapshot(CRUDBase[TradingLeaderboardSnapshot, TradingLeaderboardEntrySchema, TradingLeaderboardEntrySchema]):
@@ -16,6 +23,27 @@ class CRUDTradingLeaderboardSnapshot(CRUDBase[TradingLeaderboardSnapshot, Tradin
     def get_all_snapshots_for_school(self, db: Session, school_id: int, skip: int = 0, limit: int = 100) -> List[TradingLeaderboardSnapshot]:
         return db.query(self.model).filter(self.model.school_id == school_id).order_by(self.model.trading_profit.desc(), self.model.timestamp.desc()).offset(skip).limit(limit).all()
 
+    def get_page_for_school(self, db: Session, school_id: int, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[TradingLeaderboardSnapshot], Optional[str]]:
+        query = db.query(self.model).filter(self.model.school_id == school_id)
+        return keyset_paginate(query, self._page_keys(), cursor=cursor, limit=limit)
+
+    def select_export_for_school(self, school_id: int) -> Select:
+        """The whole school leaderboard in page order, with competition ranks, as rows for an export."""
+        profit = self.model.trading_profit
+        return (
+            select(
+                func.rank().over(order_by=profit.desc()).label("rank"),
+                self.model.student_id, self.model.student_full_name, self.model.student_email,
+                self.model.starting_capital, self.model.current_balance, profit,
+            )
+            .where(self.model.school_id == school_id)
+            .order_by(*[key.desc() for key in self._page_keys()])
+        )
+
+    def _page_keys(self):
+        # Pages and exports sort on these, descending, so both list rows in the same order.
+        return [self.model.trading_profit, self.model.timestamp, self.model.id]
+
     def delete_old_snapshots(self, db: Session, older_than_minutes: int = 60):
         threshold = datetime.utcnow() - timedelta(minutes=older_than_minutes)
         db.query(self.model).filter(self.model.timestamp < threshold).delete()
@@ -58,6 +86,133 @@ class CRUDTradingLeaderboardSnapshot(CRUDBase[TradingLeaderboardSnapshot, Tradin
             db.commit()
             return new_snapshot
 
+    def get_account_totals_for_school(self, db: Session, school_id: int, snapshot_date: date) -> List[Any]:
+        return self.get_account_totals(db, self._school_student_ids(school_id), snapshot_date)
+
+    def get_account_totals(self, db: Session, students: Select, snapshot_date: date) -> List[Any]:
+        """One row per user selected by ``students``, in a single query.
+
+        Columns: student_id, student_full_name, student_email, starting_capital
+        (the first fund addition), total_invested (all fund additions) and
+        cash_balance (the snapshot_date portfolio snapshot, else the account balance).
+        """
+        ranked_funds = (
+            select(
+                Transaction.user_id,
+                Transaction.amount,
+                func.row_number().over(partition_by=Transaction.user_id, order_by=(Transaction.created_at, Transaction.id)).label("position")
+            )
+            .where(Transaction.transaction_type == "fund_addition", Transaction.user_id.in_(students))
+            .subquery()
+        )
+        funds = (
+            select(
+                ranked_funds.c.user_id,
+                func.max(case((ranked_funds.c.position == 1, ranked_funds.c.amount))).label("starting_capital"),
+                func.sum(ranked_funds.c.amount).label("total_invested")
+            )
+            .group_by(ranked_funds.c.user_id)
+            .subquery()
+        )
+        snapshot_cash = (
+            select(PortfolioSnapshot.cash_balance)
+            .where(PortfolioSnapshot.user_id == User.id, PortfolioSnapshot.snapshot_date == snapshot_date)
+            .limit(1)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                User.id.label("student_id"),
+                User.full_name.label("student_full_name"),
+                User.email.label("student_email"),
+                func.coalesce(funds.c.starting_capital, 0.0).label("starting_capital"),
+                func.coalesce(funds.c.total_invested, 0.0).label("total_invested"),
+                func.coalesce(snapshot_cash, AccountBalance.balance, 0.0).label("cash_balance")
+            )
+            .outerjoin(funds, funds.c.user_id == User.id)
+            .outerjoin(AccountBalance, AccountBalance.user_id == User.id)
+            .where(User.id.in_(students), User.deleted_at == None)
+            .order_by(User.id)
+        )
+        return db.execute(query).all()
+
+    def get_positions_for_school(self, db: Session, school_id: int) -> List[Any]:
+        return self.get_positions(db, self._school_student_ids(school_id))
+
+    def get_positions(self, db: Session, students: Select) -> List[Any]:
+        """(user_id, symbol, quantity, average_price) for every open position of the users selected by ``students``."""
+        query = (
+            select(PortfolioPosition.user_id, PortfolioPosition.symbol, PortfolioPosition.quantity, PortfolioPosition.average_price)
+            .where(PortfolioPosition.user_id.in_(students), PortfolioPosition.quantity != 0)
+        )
+        return db.execute(query).all()
+
+    def get_student_schools(self, db: Session, student_ids: List[int]) -> List[Tuple[int, int]]:
+        """(student_id, school_id) for each school the given users currently study at."""
+        query = (
+            select(user_school_association.c.user_id, user_school_association.c.school_id)
+            .join(Role, Role.id == user_school_association.c.role_id)
+            .where(
+                user_school_association.c.user_id.in_(student_ids),
+                user_school_association.c.deleted_at == None,
+                Role.name == "student"
+            )
+        )
+        return [tuple(row) for row in db.execute(query).all()]
+
+    def replace_for_school(self, db: Session, school_id: int, snapshots_data: List[dict]) -> None:
+        """Make ``snapshots_data`` the school's rows. Does not commit, so readers never see an empty board."""
+        self._upsert_many(db, snapshots_data)
+        db.query(self.model).filter(
+            self.model.school_id == school_id,
+            self.model.student_id.not_in([row["student_id"] for row in snapshots_data])
+        ).delete(synchronize_session=False)
+
+    def replace_for_students(self, db: Session, student_ids: List[int], snapshots_data: List[dict]) -> None:
+        """Make ``snapshots_data`` every school's rows for the given students. Does not commit."""
+        self._upsert_many(db, snapshots_data)
+        db.query(self.model).filter(
+            self.model.student_id.in_(student_ids),
+            tuple_(self.model.school_id, self.model.student_id).not_in([(row["school_id"], row["student_id"]) for row in snapshots_data])
+        ).delete(synchronize_session=False)
+
+    def _upsert_many(self, db: Session, rows: List[dict]) -> None:
+        """Write rows keyed by (school_id, student_id), so concurrent refreshes of a student update one row."""
+        if not rows:
+            return
+        # A fixed key order keeps concurrent refreshes from deadlocking on each other's rows.
+        rows = sorted(rows, key=lambda row: (row["school_id"], row["student_id"]))
+        insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if insert is None:
+            for row in rows:
+                existing = self.get_snapshot_for_student_and_school(db, row["student_id"], row["school_id"])
+                if existing is None:
+                    db.add(self.model(**row))
+                else:
+                    for field, value in row.items():
+                        setattr(existing, field, value)
+            db.flush()
+            return
+
+        stmt = insert(self.model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.school_id, self.model.student_id],
+            set_={column: getattr(stmt.excluded, column) for column in rows[0] if column not in ("school_id", "student_id")},
+        )
+        db.execute(stmt, rows)
+
+    @staticmethod
+    def _school_student_ids(school_id: int) -> Select:
+        return (
+            select(user_school_association.c.user_id)
+            .join(Role, Role.id == user_school_association.c.role_id)
+            .where(
+                user_school_association.c.school_id == school_id,
+                user_school_association.c.deleted_at == None,
+                Role.name == "student"
+            )
+        )
+
 trading_leaderboard_snapshot = CRUDTradingLeaderboardSnapshot(TradingLeaderboardSnapshot)
 
 class CRUDLeaderboardSnapshot(CRUDBase[LeaderboardSnapshot, LeaderboardEntrySchema, LeaderboardEntrySchema]):
@@ -68,7 +223,25 @@ class CRUDLeaderboardSnapshot(CRUDBase[LeaderboardSnapshot, LeaderboardEntrySche
         return db.query(self.model).order_by(self.model.timestamp.desc()).offset(skip).limit(limit).all()
 
     def get_all_snapshots_for_school(self, db: Session, school_id: int, skip: int = 0, limit: int = 100) -> List[LeaderboardSnapshot]:
-        return db.query(self.model).filter(self.model.school_id == school_id).order_by(self.model.total_rewards.desc(), self.model.timestamp.desc()).offset(skip).limit(limit).all()
+        return db.query(self.model).filter(self.model.school_id == school_id).order_by(self.model.total_rewards.desc(), self.model.student_id.desc()).offset(skip).limit(limit).all()
+
+    def get_page_for_school(self, db: Session, school_id: int, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[LeaderboardSnapshot], Optional[str]]:
+        # Ties go to the higher student id, as in the rank index; student_id is unique within a school.
+        query = db.query(self.model).filter(self.model.school_id == school_id)
+        return keyset_paginate(query, [self.model.total_rewards, self.model.student_id], cursor=cursor, limit=limit)
+
+    def select_export_for_school(self, school_id: int) -> Select:
+        """The whole school leaderboard in page order, ranked as LeaderboardRankService ranks it, as rows for an export."""
+        rewards = self.model.total_rewards
+        return (
+            select(
+                func.rank().over(order_by=rewards.desc()).label("rank"),
+                self.model.student_id, self.model.student_full_name, self.model.student_email,
+                self.model.lessons_completed, self.model.accumulated_exam_score, rewards,
+            )
+            .where(self.model.school_id == school_id)
+            .order_by(rewards.desc(), self.model.student_id.desc())
+        )
 
     def delete_old_snapshots(self, db: Session, older_than_minutes: int = 60):
         threshold = datetime.utcnow() - timedelta(minutes=older_than_minutes)
@@ -112,4 +285,106 @@ class CRUDLeaderboardSnapshot(CRUDBase[LeaderboardSnapshot, LeaderboardEntrySche
             db.commit()
             return new_snapshot
 
+    def increment_for_student(self, db: Session, student_id: int, *, lessons_completed: int = 0,
+                              accumulated_exam_score: float = 0.0, total_rewards: int = 0,
+                              except_schools: Sequence[int] = ()) -> Tuple[List[Tuple[int, int, int]], int]:
+        """Add score deltas to the student's row in every school (but ``except_schools``) in one UPDATE.
+
+        Does not commit. Returns (school_id, student_id, total_rewards) per changed
+        row, and how many of the schools the student studies at have no row yet.
+        No changed rows means the count is unknown: the student may have no rows at all.
+        """
+        stmt = update(self.model).where(self.model.student_id == student_id)
+        if except_schools:
+            stmt = stmt.where(self.model.school_id.not_in(except_schools))
+        result = db.execute(
+            stmt
+            .values(
+                lessons_completed=self.model.lessons_completed + lessons_completed,
+                accumulated_exam_score=self.model.accumulated_exam_score + accumulated_exam_score,
+                total_rewards=self.model.total_rewards + total_rewards,
+                timestamp=datetime.utcnow(),
+            )
+            .returning(*self._score_columns(), self._unseeded_school_count(student_id))
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        return [tuple(row[:3]) for row in rows], rows[0][3] if rows else 0
+
+    def upsert_from(self, db: Session, rows: Select, *, overwrite: bool) -> List[Tuple[int, int, int]]:
+        """Write the score rows selected by ``rows`` in one INSERT ... SELECT keyed by (school_id, student_id).
+
+        ``rows`` must select columns named like the model's. Existing rows are
+        overwritten when ``overwrite`` is set and left alone otherwise. Does not
+        commit. Returns (school_id, student_id, total_rewards) per written row.
+        """
+        insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if insert is None:
+            return self._upsert_from_fallback(db, rows, overwrite)
+
+        columns = [column.name for column in rows.selected_columns]
+        stmt = insert(self.model).from_select(columns, rows)
+        conflict_target = [self.model.school_id, self.model.student_id]
+        if overwrite:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_target,
+                set_={column: getattr(stmt.excluded, column) for column in columns if column not in ("school_id", "student_id")},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=conflict_target)
+        return [tuple(row) for row in db.execute(stmt.returning(*self._score_columns()))]
+
+    def _upsert_from_fallback(self, db: Session, rows: Select, overwrite: bool) -> List[Tuple[int, int, int]]:
+        written = []
+        for row in db.execute(rows).mappings().all():
+            existing = self.get_snapshot_for_student_and_school(db, row["student_id"], row["school_id"])
+            if existing is None:
+                db.add(self.model(**row))
+            elif overwrite:
+                for field, value in row.items():
+                    setattr(existing, field, value)
+            else:
+                continue
+            written.append((row["school_id"], row["student_id"], row["total_rewards"]))
+        db.flush()
+        return written
+
+    def delete_for_school_except(self, db: Session, school_id: int, student_ids: Select) -> List[int]:
+        """Drop the school's rows for students not selected by ``student_ids``. Does not commit. Returns the dropped student ids."""
+        result = db.execute(
+            delete(self.model)
+            .where(self.model.school_id == school_id, self.model.student_id.not_in(student_ids))
+            .returning(self.model.student_id)
+            .execution_options(synchronize_session=False)
+        )
+        return list(result.scalars())
+
+    def get_scores_for_school(self, db: Session, school_id: int) -> Dict[int, int]:
+        """{student_id: total_rewards} for every row of the school."""
+        rows = db.query(self.model.student_id, self.model.total_rewards).filter(self.model.school_id == school_id)
+        return {student_id: total_rewards or 0 for student_id, total_rewards in rows}
+
+    def get_for_students(self, db: Session, school_id: int, student_ids: List[int]) -> Dict[int, LeaderboardSnapshot]:
+        if not student_ids:
+            return {}
+        rows = db.query(self.model).filter(self.model.school_id == school_id, self.model.student_id.in_(student_ids))
+        return {row.student_id: row for row in rows}
+
+    def _score_columns(self):
+        return self.model.school_id, self.model.student_id, self.model.total_rewards
+
+    def _unseeded_school_count(self, student_id: int):
+        """Schools the student studies at with no score row for them, as a scalar subquery."""
+        school_id = user_school_association.c.school_id
+        return (
+            select(func.count(func.distinct(school_id)))
+            .join(Role, Role.id == user_school_association.c.role_id)
+            .where(
+                user_school_association.c.user_id == student_id,
+                Role.name == "student",
+                ~select(self.model.id).where(self.model.school_id == school_id, self.model.student_id == student_id).exists(),
+            )
+            .scalar_subquery()
+        )
+
 leaderboard_snapshot = CRUDLeaderboardSnapshot(LeaderboardSnapshot)
\ No newline at end of file
@@ -0,0 +1,127 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import Date, Float, cast, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.models.billing import Invoice
+from app.models.course import Course
+from app.models.course_enrollment import CourseEnrollment
+from app.models.exam_attempt import ExamAttempt
+from app.models.lesson_progress import LessonProgress
+from app.models.report import PlatformDailyRollup, SchoolDailyRollup
+from app.models.role import Role
+from app.models.user import User
+from app.models.user_school_association import user_school_association
+
+ROLLUP_METRICS = ("courses", "students", "teachers", "staff", "lessons_completed", "exam_score", "revenue")
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    return value if value is None or value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class CRUDSchoolDailyRollup(CRUDBase[SchoolDailyRollup, BaseModel, BaseModel]):
+    def aggregate(self, db: Session, *, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                  school_id: Optional[int] = None, metrics: Sequence[str] = ROLLUP_METRICS) -> Dict[Tuple[int, date], Dict[str, float]]:
+        """Per (school_id, day) metrics straight from the fact tables, in one query.
+
+        Uses the same filters as the dashboard counts. ``since`` and ``until``
+        bound the timestamp each metric is counted by, both inclusive; naive
+        values are taken as UTC, and days are UTC days whatever the session's
+        time zone.
+        """
+        queries = [
+            query.add_columns(literal(metric).label("metric"))
+            for metric, query in self._metric_queries(since, until, school_id) if metric in metrics
+        ]
+        totals: Dict[Tuple[int, date], Dict[str, float]] = defaultdict(lambda: dict.fromkeys(ROLLUP_METRICS, 0))
+        for row_school_id, day, value, metric in db.execute(union_all(*queries)).all():
+            totals[(row_school_id, day)][metric] += value or 0
+        return dict(totals)
+
+    def sum_days(self, db: Session, first_day: date, last_day: date, school_id: Optional[int] = None) -> Dict[str, float]:
+        query = select(*[func.coalesce(func.sum(getattr(self.model, metric)), 0) for metric in ROLLUP_METRICS]).where(
+            self.model.day >= first_day, self.model.day <= last_day
+        )
+        if school_id is not None:
+            query = query.where(self.model.school_id == school_id)
+        return dict(zip(ROLLUP_METRICS, db.execute(query).one()))
+
+    def replace_days(self, db: Session, first_day: Optional[date], last_day: date, rows: List[dict]) -> None:
+        """Swap the rollup rows from ``first_day`` (None: the beginning) through ``last_day`` for ``rows``. Does not commit."""
+        query = db.query(self.model).filter(self.model.day <= last_day)
+        if first_day is not None:
+            query = query.filter(self.model.day >= first_day)
+        query.delete(synchronize_session=False)
+        if rows:
+            db.execute(self.model.__table__.insert(), rows)
+
+    def _metric_queries(self, since: Optional[datetime], until: Optional[datetime], school_id: Optional[int]):
+        school = user_school_association.c.school_id
+        # The timestamps are timestamptz: compare and bucket them in UTC, not the session's zone.
+        since, until = _as_utc(since), _as_utc(until)
+
+        def bounded(query, school_column, timestamp):
+            day = cast(func.timezone("UTC", timestamp), Date)
+            query = query.add_columns(day).group_by(school_column, day)
+            if since is not None:
+                query = query.where(timestamp >= since)
+            if until is not None:
+                query = query.where(timestamp <= until)
+            if school_id is not None:
+                query = query.where(school_column == school_id)
+            return query
+
+        def members(value, timestamp, *criteria):
+            query = (
+                select(school)
+                .join(User, User.id == user_school_association.c.user_id)
+                .join(Role, Role.id == user_school_association.c.role_id)
+                .where(User.deleted_at == None, *criteria)
+            )
+            return bounded(query, school, timestamp).add_columns(cast(value, Float))
+
+        # Columns come out as (school_id, day, value).
+        yield "courses", bounded(
+            select(Course.school_id).where(Course.deleted_at.is_(None)), Course.school_id, Course.created_at
+        ).add_columns(cast(func.count(), Float))
+        yield "students", members(func.count(), User.created_at, Role.name == "student")
+        yield "teachers", members(func.count(), User.created_at, Role.name == "teacher")
+        yield "staff", members(func.count(), User.created_at, Role.name != "student")
+        yield "lessons_completed", members(
+            func.count(LessonProgress.id), LessonProgress.created_at, Role.name == "student", LessonProgress.is_completed == True
+        ).join(CourseEnrollment, CourseEnrollment.user_id == User.id).join(LessonProgress, LessonProgress.enrollment_id == CourseEnrollment.id)
+        yield "exam_score", members(
+            func.sum(ExamAttempt.score), ExamAttempt.created_at, Role.name == "student", ExamAttempt.status == "completed"
+        ).join(ExamAttempt, ExamAttempt.user_id == User.id)
+        yield "revenue", bounded(
+            select(Invoice.school_id).where(Invoice.status == "paid", Invoice.deleted_at.is_(None)), Invoice.school_id, Invoice.created_at
+        ).add_columns(cast(func.sum(Invoice.amount), Float))
+
+
+class CRUDPlatformDailyRollup(CRUDBase[PlatformDailyRollup, BaseModel, BaseModel]):
+    def get_rolled_through(self, db: Session) -> Optional[date]:
+        """The last day whose rollups are complete; every earlier day is covered too."""
+        return db.execute(select(func.max(self.model.day))).scalar()
+
+    def sum_revenue(self, db: Session, first_day: date, last_day: date) -> float:
+        query = select(func.coalesce(func.sum(self.model.revenue), 0.0)).where(self.model.day >= first_day, self.model.day <= last_day)
+        return float(db.execute(query).scalar())
+
+    def replace_days(self, db: Session, revenue_by_day: Dict[date, float]) -> None:
+        """Write one row per given day, replacing any already there. Does not commit."""
+        if not revenue_by_day:
+            return
+        db.query(self.model).filter(self.model.day.in_(list(revenue_by_day))).delete(synchronize_session=False)
+        computed_at = datetime.utcnow()
+        db.execute(self.model.__table__.insert(), [
+            {"day": day, "revenue": revenue, "computed_at": computed_at} for day, revenue in revenue_by_day.items()
+        ])
+
+
+school_daily_rollup = CRUDSchoolDailyRollup(SchoolDailyRollup)
+platform_daily_rollup = CRUDPlatformDailyRollup(PlatformDailyRollup)
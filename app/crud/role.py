@@ -1,14 +1,30 @@
+import logging
+import threading
+import time
+from typing import Dict, FrozenSet, List, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, selectinload
+
 from app.crud.base import CRUDBase
-from app.models.role import Role
-from app.schemas.role import RoleCreate, RoleUpdate
-from sqlalchemy.orm import Session
-from typing import List
 from app.models.permission import Permission
+from app.models.role import Role
+from app.schemas.role import Role as RoleSchema, RoleCreate, RoleUpdate
+
+logger = logging.getLogger(__name__)
+
+_ROLES_CHANGED = "roles_changed"
+# An unknown name or id reloads the registry at most this often, so lookups of
+# roles that really do not exist cannot turn into a query per call.
+MISS_RELOAD_SECONDS = 1.0
 
 class CRUDRole(CRUDBase[Role, RoleCreate, RoleUpdate]):
     def get_by_name(self, db: Session, *, name: str) -> Role | None:
         return db.query(Role).filter(Role.name == name).first()
 
+    def get_all_with_permissions(self, db: Session) -> List[Role]:
+        return db.execute(select(Role).options(selectinload(Role.permissions))).scalars().all()
+
     def update_permissions(self, db: Session, *, role: Role, permissions: List[Permission]) -> Role:
         role.permissions = permissions
         db.add(role)
@@ -24,3 +40,81 @@ class CRUDRole(CRUDBase[Role, RoleCreate, RoleUpdate]):
         return role
 
 role = CRUDRole(Role)
+
+
+class RoleRegistry:
+    """Process-wide, read-only snapshot of the roles and their permissions.
+
+    Roles change rarely, so lookups by name or id are served from memory as
+    RoleSchema objects instead of querying per call. The snapshot loads on
+    first use. A commit that writes a Role or Permission through the ORM
+    makes the next lookup in this process reload it, and the scheduler reloads it every
+    ROLE_REGISTRY_REFRESH_SECONDS to pick up other processes' changes.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[int, RoleSchema] = {}
+        self._by_name: Dict[str, RoleSchema] = {}
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._loads = 0
+
+    def load(self, db: Session) -> int:
+        roles = [RoleSchema.model_validate(row) for row in role.get_all_with_permissions(db)]
+        with self._lock:
+            self._by_id = {item.id: item for item in roles}
+            self._by_name = {item.name: item for item in roles}
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+            self._loads += 1
+        return len(roles)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded = False
+
+    def get(self, db: Session, role_id: int) -> Optional[RoleSchema]:
+        return self._lookup(db, lambda: self._by_id.get(role_id))
+
+    def get_by_name(self, db: Session, name: str) -> Optional[RoleSchema]:
+        name = getattr(name, "value", name)
+        return self._lookup(db, lambda: self._by_name.get(name))
+
+    def get_permissions(self, db: Session, role_id: int) -> FrozenSet[str]:
+        found = self.get(db, role_id)
+        return frozenset(permission.name for permission in found.permissions) if found else frozenset()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"roles": len(self._by_id), "loaded": self._loaded, "loads": self._loads}
+
+    def _lookup(self, db: Session, find):
+        if not self._loaded:
+            self.load(db)
+            return find()
+        found = find()
+        if found is None and time.monotonic() - self._loaded_at >= MISS_RELOAD_SECONDS:
+            self.load(db)
+            found = find()
+        return found
+
+
+role_registry = RoleRegistry()
+
+
+@event.listens_for(Session, "after_flush")
+def _note_role_writes(session: Session, flush_context) -> None:
+    if any(isinstance(obj, (Role, Permission)) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_ROLES_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _reload_roles_after_commit(session: Session) -> None:
+    if session.info.pop(_ROLES_CHANGED, False):
+        role_registry.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_role_writes(session: Session) -> None:
+    session.info.pop(_ROLES_CHANGED, None)
@@ -16,6 +16,9 @@ class CRUDSchool(CRUDBase[School, SchoolCreate, SchoolUpdate]):
     def get_by_name(self, db: Session, *, name: str) -> Optional[School]:
         return db.query(School).filter(School.name == name).first()
 
+    def get_active_ids(self, db: Session) -> List[int]:
+        return [school_id for (school_id,) in db.query(School.id).filter(School.deleted_at == None).order_by(School.id)]
+
     def get_all_schools_count(self, db: Session, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> int:
         query = db.query(School)
         if start_date:
@@ -2,10 +2,22 @@ from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
 from app.models.token_denylist import TokenDenylist
 from app.schemas.token_denylist import TokenDenylistCreate
-from typing import Optional
+from typing import List, Optional
+from datetime import datetime, timezone
 
 class CRUDTokenDenylist(CRUDBase[TokenDenylist, TokenDenylistCreate, None]):
     def get_by_jti(self, db: Session, *, jti: str) -> Optional[TokenDenylist]:
         return db.query(self.model).filter(self.model.jti == jti).first()
 
+    def get_unexpired_since(self, db: Session, *, since: Optional[datetime] = None) -> List[TokenDenylist]:
+        query = db.query(self.model).filter(self.model.exp > datetime.now(timezone.utc))
+        if since is not None:
+            query = query.filter(self.model.created_at >= since)
+        return query.order_by(self.model.created_at).all()
+
+    def delete_expired(self, db: Session) -> int:
+        deleted = db.query(self.model).filter(self.model.exp <= datetime.now(timezone.utc)).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
 token_denylist = CRUDTokenDenylist(TokenDenylist)
@@ -1,6 +1,7 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy import Select, select
 from sqlalchemy.orm import Session
-from app.crud.base import CRUDBase
+from app.crud.base import CRUDBase, keyset_paginate
 from app.models.trading import UserWatchlist, WatchlistStock, AccountBalance, PortfolioPosition, TradeOrder
 from app.schemas.trading import (
     UserWatchlistCreate,
@@ -60,6 +61,24 @@ portfolio_position = CRUDPortfolioPosition(PortfolioPosition)
 class CRUDTradeOrder(CRUDBase[TradeOrder, TradeOrderCreate, TradeOrderUpdate]):
     def get_multi_by_user(self, db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[TradeOrder]:
         return db.query(self.model).filter(self.model.user_id == user_id).offset(skip).limit(limit).all()
+
+    def get_page_by_user(
+        self, db: Session, user_id: int, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[TradeOrder], Optional[str]]:
+        query = db.query(self.model).filter(self.model.user_id == user_id)
+        return keyset_paginate(query, [self.model.id], cursor=cursor, limit=limit)
+
+    def select_export_by_user(self, user_id: int) -> Select:
+        """Every trade of the user, oldest first, as rows for an export."""
+        return (
+            select(
+                self.model.id, self.model.symbol, self.model.order_type, self.model.status, self.model.quantity,
+                self.model.price, self.model.executed_price, self.model.total_amount, self.model.realized_pnl,
+                self.model.created_at, self.model.executed_at,
+            )
+            .where(self.model.user_id == user_id)
+            .order_by(self.model.id)
+        )
     
     def get_by_user_and_id(self, db: Session, user_id: int, trade_id: int) -> Optional[TradeOrder]:
         return db.query(self.model).filter(
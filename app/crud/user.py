@@ -1,9 +1,10 @@
 from typing import Any, Optional, List
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, desc
+from sqlalchemy.orm import Query, Session, joinedload
+from sqlalchemy import Select, func, desc, select
 from datetime import datetime, timezone
 from app.core.constants import CourseLevelEnum
 from app.crud.base import CRUDBase
+from app.crud.role import role_registry
 from app.models.course_enrollment import CourseEnrollment
 from app.models.user import User
 from app.models.school import School
@@ -85,7 +86,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         )
 
     def get_non_student_users_by_school(self, db: Session, *, school_id: int, skip: int = 0, limit: int = 100) -> List[User]:
-        student_role = db.query(Role).filter(Role.name == "student").first()
+        student_role = role_registry.get_by_name(db, "student")
         if not student_role:
             return []
 
@@ -149,7 +150,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         return query.count()
 
     def get_non_student_users_by_school_count(self, db: Session, *, school_id: int, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> int:
-        student_role = db.query(Role).filter(Role.name == "student").first()
+        student_role = role_registry.get_by_name(db, "student")
         if not student_role:
             return 0
 
@@ -169,12 +170,16 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         return query.count()
 
     def get_leaderboard_data_for_school(
-        self, db: Session, school_id: int, skip: int = 0, limit: int = 100, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+        self, db: Session, school_id: int, skip: int = 0, limit: Optional[int] = 100, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
     ) -> List[dict]:
-        student_role = db.query(Role).filter(Role.name == "student").first()
-        if not student_role:
-            return []
-
+        query = self.get_leaderboard_query(db, school_id=school_id, start_date=start_date, end_date=end_date)
+        return query.order_by(desc("total_rewards")).offset(skip).limit(limit).all()
+
+    def get_leaderboard_query(
+        self, db: Session, *, school_id: Optional[int] = None, student_id: Optional[int] = None,
+        start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+    ) -> Query:
+        """Per-(school, student) leaderboard totals, optionally narrowed to one school and/or one student."""
         lessons_completed_sq_query = (
             db.query(
                 CourseEnrollment.user_id,
@@ -187,6 +192,8 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             lessons_completed_sq_query = lessons_completed_sq_query.filter(LessonProgress.created_at >= start_date)
         if end_date:
             lessons_completed_sq_query = lessons_completed_sq_query.filter(LessonProgress.created_at <= end_date)
+        if student_id is not None:
+            lessons_completed_sq_query = lessons_completed_sq_query.filter(CourseEnrollment.user_id == student_id)
         lessons_completed_sq = lessons_completed_sq_query.group_by(CourseEnrollment.user_id).subquery()
 
         accumulated_exam_score_sq_query = (
@@ -200,6 +207,8 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             accumulated_exam_score_sq_query = accumulated_exam_score_sq_query.filter(ExamAttempt.created_at >= start_date)
         if end_date:
             accumulated_exam_score_sq_query = accumulated_exam_score_sq_query.filter(ExamAttempt.created_at <= end_date)
+        if student_id is not None:
+            accumulated_exam_score_sq_query = accumulated_exam_score_sq_query.filter(ExamAttempt.user_id == student_id)
         accumulated_exam_score_sq = accumulated_exam_score_sq_query.group_by(ExamAttempt.user_id).subquery()
 
         total_rewards_sq_query = (
@@ -213,6 +222,8 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             total_rewards_sq_query = total_rewards_sq_query.filter(CourseReward.awarded_at >= start_date)
         if end_date:
             total_rewards_sq_query = total_rewards_sq_query.filter(CourseReward.awarded_at <= end_date)
+        if student_id is not None:
+            total_rewards_sq_query = total_rewards_sq_query.filter(CourseEnrollment.user_id == student_id)
         total_rewards_sq = total_rewards_sq_query.group_by(CourseEnrollment.user_id).subquery()
 
         query = (
@@ -222,26 +233,24 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
                 User.email.label("student_email"),
                 func.coalesce(lessons_completed_sq.c.lessons_completed_count, 0).label("lessons_completed"),
                 func.coalesce(accumulated_exam_score_sq.c.accumulated_exam_score_sum, 0.0).label("accumulated_exam_score"),
-                func.coalesce(total_rewards_sq.c.total_rewards_sum, 0).label("total_rewards")
+                func.coalesce(total_rewards_sq.c.total_rewards_sum, 0).label("total_rewards"),
+                user_school_association.c.school_id.label("school_id")
             )
             .join(user_school_association, User.id == user_school_association.c.user_id)
-            .filter(
-                user_school_association.c.school_id == school_id,
-                user_school_association.c.role_id == student_role.id,
-                User.deleted_at == None
-            )
+            .join(Role, Role.id == user_school_association.c.role_id)
+            .filter(Role.name == "student", User.deleted_at == None)
             .outerjoin(lessons_completed_sq, User.id == lessons_completed_sq.c.user_id)
             .outerjoin(accumulated_exam_score_sq, User.id == accumulated_exam_score_sq.c.user_id)
             .outerjoin(total_rewards_sq, User.id == total_rewards_sq.c.user_id)
-            .order_by(desc("total_rewards"))
-            .offset(skip)
-            .limit(limit)
         )
-
-        return query.all()
+        if school_id is not None:
+            query = query.filter(user_school_association.c.school_id == school_id)
+        if student_id is not None:
+            query = query.filter(User.id == student_id)
+        return query
 
     def get_top_performer_by_exam_score(self, db: Session, school_id: int, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Optional[dict]:
-        student_role = db.query(Role).filter(Role.name == "student").first()
+        student_role = role_registry.get_by_name(db, "student")
         if not student_role:
             return None
 
@@ -271,7 +280,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         return query._asdict() if query else None
 
     def get_most_active_user_by_lessons_completed(self, db: Session, school_id: int, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Optional[dict]:
-        student_role = db.query(Role).filter(Role.name == "student").first()
+        student_role = role_registry.get_by_name(db, "student")
         if not student_role:
             return None
 
@@ -302,7 +311,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         return query._asdict() if query else None
 
     def get_all_students_count(self, db: Session, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> int:
-        student_role = db.query(Role).filter(Role.name == "student").first()
+        student_role = role_registry.get_by_name(db, "student")
         if not student_role:
             return 0
 
@@ -316,7 +325,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         return query.count()
 
     def get_all_teachers_count(self, db: Session, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> int:
-        teacher_role = db.query(Role).filter(Role.name == "teacher").first()
+        teacher_role = role_registry.get_by_name(db, "teacher")
         if not teacher_role:
             return 0
 
@@ -331,7 +340,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
     def get_school_admin_count(self, db: Session, *, school_id: int) -> int:
         """Get the count of active school administrators for a school."""
-        school_admin_role = db.query(Role).filter(Role.name == "school_admin").first()
+        school_admin_role = role_registry.get_by_name(db, "school_admin")
         if not school_admin_role:
             return 0
 
@@ -370,7 +379,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
     def get_student_school_associations(self, db: Session, student_id: int) -> List[Any]:
         """Get all school associations for a student."""
-        student_role = db.query(Role).filter(Role.name == "student").first()
+        student_role = role_registry.get_by_name(db, "student")
         if not student_role:
             return []
 
@@ -385,5 +394,22 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         db.query(CourseEnrollment).filter(CourseEnrollment.user_id == user_id).delete()
         db.query(user_school_association).filter(user_school_association.c.user_id == user_id).delete()
 
+    def select_export_for_super_admin(self) -> Select:
+        """Every user with their roles and schools, as the super admin user list shows them, as rows for an export."""
+        return (
+            select(
+                User.id, User.full_name, User.email, User.is_active,
+                func.string_agg(Role.name, "; ").label("roles"),
+                func.string_agg(School.name, "; ").label("schools"),
+                User.created_at,
+            )
+            .outerjoin(user_school_association, user_school_association.c.user_id == User.id)
+            .outerjoin(Role, Role.id == user_school_association.c.role_id)
+            .outerjoin(School, School.id == user_school_association.c.school_id)
+            .where(User.deleted_at == None)
+            .group_by(User.id)
+            .order_by(User.id)
+        )
+
 
 user = CRUDUser(User)
@@ -1,9 +1,12 @@
+from sqlalchemy import bindparam, func
 from sqlalchemy.orm import Session, selectinload
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from app.crud.base import CRUDBase
+from app.crud.base import CRUDBase, UPSERT_INSERTS
 from app.models.user_answer import UserAnswer
 from app.schemas.user_answer import UserAnswerCreate, UserAnswerUpdate
+
+
 class CRUDUserAnswer(CRUDBase[UserAnswer, UserAnswerCreate, UserAnswerUpdate]):
 
     def _query_with_relationships(self, db: Session):
@@ -49,6 +52,68 @@ class CRUDUserAnswer(CRUDBase[UserAnswer, UserAnswerCreate, UserAnswerUpdate]):
             .all()
         )
 
+    def upsert_many(self, db: Session, *, exam_attempt_id: int, user_id: int,
+                    answers: Dict[int, Optional[int]], returning: bool = True) -> List[UserAnswer]:
+        """Insert or overwrite the answers ({question_id: answer_text}) of one attempt in a single statement.
+
+        Does not commit. Returns the stored rows when ``returning`` is set.
+        """
+        if not answers:
+            return []
+        rows = [
+            {"exam_attempt_id": exam_attempt_id, "question_id": question_id, "user_id": user_id, "answer_text": answer_text}
+            for question_id, answer_text in answers.items()
+        ]
+        insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if insert is None:
+            return self._upsert_many_fallback(db, exam_attempt_id, rows)
+
+        stmt = insert(UserAnswer).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserAnswer.exam_attempt_id, UserAnswer.question_id],
+            set_={"answer_text": stmt.excluded.answer_text, "updated_at": func.now()},
+        )
+        if not returning:
+            db.execute(stmt)
+            return []
+        return db.scalars(stmt.returning(UserAnswer), execution_options={"populate_existing": True}).all()
+
+    def _upsert_many_fallback(self, db: Session, exam_attempt_id: int, rows: List[Dict[str, Any]]) -> List[UserAnswer]:
+        existing = {
+            answer.question_id: answer
+            for answer in db.query(UserAnswer).filter(
+                UserAnswer.exam_attempt_id == exam_attempt_id,
+                UserAnswer.question_id.in_([row["question_id"] for row in rows])
+            )
+        }
+        stored = []
+        for row in rows:
+            answer = existing.get(row["question_id"])
+            if answer is None:
+                answer = UserAnswer(**row)
+                db.add(answer)
+            else:
+                answer.answer_text = row["answer_text"]
+            stored.append(answer)
+        db.flush()
+        return stored
+
+    def bulk_grade(self, db: Session, grades: List[Dict[str, Any]]) -> None:
+        """Bulk-apply {"answer_id", "is_correct", "score", "graded_at"} grades in one executemany UPDATE."""
+        if not grades:
+            return
+        table = UserAnswer.__table__
+        db.execute(
+            table.update()
+            .where(table.c.id == bindparam("answer_id"))
+            .values(
+                is_correct=bindparam("is_correct"),
+                score=bindparam("score"),
+                updated_at=bindparam("graded_at"),
+            ),
+            grades,
+        )
+
     def get_correct_answers_count(self, db: Session, exam_attempt_id: int) -> int:
         return (
             self._query_with_relationships(db)
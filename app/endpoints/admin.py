@@ -1,13 +1,25 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.core.constants import RoleEnum
+from app.core.constants import ExportFormatEnum, RoleEnum
 from app.schemas.user import SuperAdminUserSummary, SuperAdminUserUpdate, User as UserSchema
+from app.services.export import FORMAT_DESCRIPTION, MEDIA_TYPES
 from app.services.user import user_service
+from app.services.lesson_heartbeat import lesson_heartbeat_service
+from app.services.course_tree import course_tree_service
+from app.services.exam_content import exam_content_service
+from app.services.leaderboard_rank import leaderboard_rank_service
+from app.services.trading_leaderboard import trading_leaderboard_refresh_queue
+from app.crud.role import role_registry
 from app.schemas.response import APIResponse
 from app.utils import deps
 from app.crud.base import PaginatedResponse
 from app.core.decorators import cache_endpoint
 from app.core.cache import cache
+from app.core.metrics import loop_lag_monitor, query_metrics
+from app.core.database import pool_monitor, replica_pool_monitor
 
 router = APIRouter()
 
@@ -17,11 +29,20 @@ async def get_all_users_admin(
     *,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
-    limit: int = 50
+    limit: int = 50,
+    cursor: Optional[str] = None
 ):
-    paginated_users = user_service.get_all_users_for_super_admin_paginated(db, skip=skip, limit=limit)
+    paginated_users = user_service.get_all_users_for_super_admin_paginated(db, skip=skip, limit=limit, cursor=cursor)
     return APIResponse(message="Users retrieved successfully", data=paginated_users)
 
+@router.get("/users/export", response_class=StreamingResponse, dependencies=[Depends(deps.require_role(RoleEnum.SUPER_ADMIN))])
+async def export_users_admin(export_format: ExportFormatEnum = Query(ExportFormatEnum.CSV, alias="format", description=FORMAT_DESCRIPTION)):
+    return StreamingResponse(
+        user_service.export_users_for_super_admin(export_format=export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format.value}"'},
+    )
+
 @router.get("/users/{user_id}", response_model=APIResponse[UserSchema], dependencies=[Depends(deps.require_role(RoleEnum.SUPER_ADMIN))])
 @cache_endpoint(ttl=300)
 async def get_user_admin(
@@ -52,3 +73,20 @@ async def delete_user_admin(
     deleted_user = await user_service.delete_user_by_admin(db, user_id)
     await cache.clear()
     return APIResponse(message="User deleted successfully")
+
+@router.get("/metrics", response_model=APIResponse[dict], dependencies=[Depends(deps.require_role(RoleEnum.SUPER_ADMIN))])
+async def get_runtime_metrics():
+    metrics = {
+        "event_loop": loop_lag_monitor.snapshot(),
+        "db_pool": pool_monitor.snapshot(),
+        "db_queries": query_metrics.snapshot(),
+        "lesson_heartbeats": lesson_heartbeat_service.snapshot(),
+        "course_trees": course_tree_service.snapshot(),
+        "exam_content": exam_content_service.snapshot(),
+        "leaderboard_ranks": leaderboard_rank_service.snapshot(),
+        "trading_leaderboard_refreshes": trading_leaderboard_refresh_queue.snapshot(),
+        "roles": role_registry.snapshot(),
+    }
+    if replica_pool_monitor:
+        metrics["db_replica_pool"] = replica_pool_monitor.snapshot()
+    return APIResponse(message="Runtime metrics retrieved successfully", data=metrics)
@@ -48,7 +48,7 @@ async def create_super_admin(
     signup_request: SuperAdminCreate
 ):
     """Handles the creation of a new school and its administrator."""
-    new_admin = auth_service.create_super_admin(
+    new_admin = await auth_service.create_super_admin(
         db=db,
         super_admin_in=signup_request
     )
@@ -56,12 +56,12 @@ async def create_super_admin(
     return APIResponse(message="Super admin created successfully", data=User.model_validate(new_admin))
 
 @router.post("/login", response_model=APIResponse[LoginResponse])
-def login_for_access_token(
+async def login_for_access_token(
     request: LoginRequest,
     db: Session = Depends(deps.get_db)
 ):
     """Standard OAuth2 login, returns a token and available user contexts."""
-    login_data = auth_service.login(db=db, email=request.email, password=request.password)
+    login_data = await auth_service.login(db=db, email=request.email, password=request.password)
     return APIResponse(message="Login successful", data=login_data)
 
 @router.post("/select-context", response_model=APIResponse[Token])
@@ -98,13 +98,13 @@ async def forgot_password(
     await auth_service.request_password_reset(db=db, email=request.email, frontend_base_url=request.frontend_base_url)
     return APIResponse(message="Password reset link sent if email exists")
 @router.post("/reset-password", status_code=status.HTTP_200_OK, response_model=APIResponse[None])
-def reset_password(
+async def reset_password(
     *,
     db: Session = Depends(deps.get_db),
     request: ResetPasswordRequest
 ):
     """Reset user's password using a valid reset token."""
-    auth_service.reset_password(db=db, token=request.token, new_password=request.new_password)
+    await auth_service.reset_password(db=db, token=request.token, new_password=request.new_password)
     return APIResponse(message="Password has been reset successfully")
 
 @router.post("/verify-account", response_model=APIResponse[None])
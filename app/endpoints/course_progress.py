@@ -5,8 +5,9 @@ from sqlalchemy.orm import Session
 from app.schemas.response import APIResponse
 from app.utils import deps
 from app.schemas.course_enrollment import CourseEnrollment
-from app.schemas.lesson_progress import LessonProgress
+from app.schemas.lesson_progress import LessonHeartbeat, LessonProgress, LessonProgressSync, LessonProgressSyncResult
 from app.services.course_progress import course_progress_service
+from app.services.lesson_heartbeat import lesson_heartbeat_service
 from app.schemas.user import UserContext
 from app.core.decorators import cache_endpoint
 from app.core.cache import cache
@@ -49,6 +50,31 @@ async def complete_lesson(
     return APIResponse(message="Lesson completed successfully", data=LessonProgress.model_validate(progress))
 
 
+@router.post("/lessons/{lesson_id}/heartbeat", response_model=APIResponse[None])
+async def lesson_heartbeat(
+    *,
+    db: Session = Depends(deps.get_db),
+    lesson_id: int,
+    heartbeat: LessonHeartbeat,
+    context: UserContext = Depends(deps.get_current_user_with_context)
+):
+    # Buffered and flushed in bulk by the scheduler; progress caches catch up on their own TTL.
+    await lesson_heartbeat_service.record(db, user_id=context.user.id, lesson_id=lesson_id, seconds=heartbeat.seconds)
+    return APIResponse(message="Heartbeat recorded")
+
+
+@router.post("/lessons/progress/sync", response_model=APIResponse[LessonProgressSyncResult])
+async def sync_lesson_progress(
+    *,
+    db: Session = Depends(deps.get_transactional_db),
+    sync_in: LessonProgressSync,
+    context: UserContext = Depends(deps.get_current_user_with_context)
+):
+    result = await course_progress_service.sync_lesson_progress(db, sync_in=sync_in, current_user_context=context)
+    await cache.invalidate_user_cache(context.user.id)
+    return APIResponse(message="Lesson progress synced successfully", data=result)
+
+
 @router.get("/courses/{course_id}/progress", response_model=APIResponse[CourseEnrollment])
 @cache_endpoint(ttl=300)
 async def get_course_progress(
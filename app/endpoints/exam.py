@@ -8,7 +8,7 @@ from app.utils import deps
 from app.schemas.exam import Exam, ExamCreate, ExamUpdate
 from app.schemas.question import Question, QuestionCreate, QuestionUpdate
 from app.schemas.exam_attempt import ExamAttempt, ExamAttemptDetails
-from app.schemas.user_answer import UserAnswer, UserAnswerCreate
+from app.schemas.user_answer import AnswerAutosave, AnswerAutosaveResult, UserAnswer, UserAnswerCreate
 from app.services.exam import exam_service
 from app.services.exam_attempt import exam_attempt_service
 from app.schemas.user import UserContext
@@ -171,6 +171,19 @@ async def start_exam_attempt(
     return APIResponse(message="Exam attempt started successfully", data=ExamAttempt.model_validate(new_attempt))
 
 
+@router.post("/{exam_id}/attempts/open", response_model=APIResponse[dict])
+async def open_exam_for_class(
+    *,
+    db: Session = Depends(deps.get_transactional_db),
+    exam_id: int,
+    context: UserContext = Depends(deps.get_current_user_with_context)
+):
+    # Pre-creates the class's attempts so the start surge only has to resume them.
+    result = exam_attempt_service.open_exam_for_class(db, exam_id=exam_id, current_user_context=context)
+    await cache.clear()
+    return APIResponse(message="Exam opened for the class", data=result)
+
+
 @router.post("/attempts/{attempt_id}/answers", response_model=APIResponse[UserAnswer])
 async def submit_answer(
     *,
@@ -208,6 +221,20 @@ async def submit_bulk_answers(
     return APIResponse(message="Answers submitted successfully", data=[UserAnswer.model_validate(ua) for ua in user_answers])
 
 
+@router.put("/attempts/{attempt_id}/answers", response_model=APIResponse[AnswerAutosaveResult])
+async def autosave_answers(
+    *,
+    db: Session = Depends(deps.get_transactional_db),
+    attempt_id: int,
+    autosave_in: AnswerAutosave,
+    context: UserContext = Depends(deps.get_current_user_with_context)
+):
+    # Meant to be called repeatedly while the exam is open; returns an ack instead of the stored answers.
+    result = exam_attempt_service.autosave_answers(db, attempt_id=attempt_id, autosave_in=autosave_in, current_user_context=context)
+    await cache.invalidate_user_cache(context.user.id)
+    return APIResponse(message="Answers saved", data=result)
+
+
 @router.post("/attempts/{attempt_id}/submit", response_model=APIResponse[ExamAttemptDetails])
 async def submit_exam(
     *,
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+
+from app.crud.base import CursorPage
 
 from app.models.user import User
 from app.schemas.response import APIResponse
@@ -24,6 +26,18 @@ async def get_my_notifications(
     data = notification_service.get_user_notifications(db, user_id=user.id, skip=skip, limit=limit)
     return APIResponse(message="Notifications fetched successfully", data=data)
 
+@router.get("/page", response_model=APIResponse[CursorPage[Notification]])
+@cache_endpoint(ttl=60)
+async def get_my_notifications_page(
+    db: Session = Depends(deps.get_db),
+    user: User = Depends(deps.get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500)
+):
+    """Retrieve notifications for the current user, newest first, one cursor page at a time."""
+    data = notification_service.get_user_notifications_page(db, user_id=user.id, cursor=cursor, limit=limit)
+    return APIResponse(message="Notifications fetched successfully", data=data)
+
 @router.get("/unread_count", response_model=APIResponse[int])
 @cache_endpoint(ttl=30)
 async def get_unread_notifications_count(
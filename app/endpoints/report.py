@@ -1,13 +1,16 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, status
 from fastapi.params import Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 from app.schemas.response import APIResponse
+from app.core.constants import ExportFormatEnum
 from app.utils import deps
 from app.schemas.user import UserContext
-from app.schemas.report import AdminDashboardReportSchema, AdminDashboardStatsSchema, LeaderboardResponseSchema, SchoolDashboardStatsSchema, SchoolReportSchema, TradingLeaderboardResponseSchema, StudentLessonProgressSchema
+from app.schemas.report import AdminDashboardReportSchema, AdminDashboardStatsSchema, LeaderboardResponseSchema, LeaderboardPositionSchema, SchoolDashboardStatsSchema, SchoolReportSchema, TradingLeaderboardResponseSchema, StudentLessonProgressSchema
+from app.services.export import FORMAT_DESCRIPTION, MEDIA_TYPES
 from app.services.report import report_service
 from app.core.decorators import cache_endpoint
 
@@ -17,7 +20,7 @@ router = APIRouter()
 @cache_endpoint(ttl=600)
 async def get_school_report(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     school_id: int,
     context: UserContext = Depends(deps.get_current_user_with_context),
     start_date: Optional[datetime] = Query(None),
@@ -31,35 +34,80 @@ async def get_school_report(
 @cache_endpoint(ttl=600)
 async def get_school_leaderboard(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     school_id: int,
     context: UserContext = Depends(deps.get_current_user_with_context),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False
 ):
-    leaderboard_data = await report_service.get_school_leaderboard(db, school_id=school_id, current_user_context=context, skip=skip, limit=limit)
+    leaderboard_data = await report_service.get_school_leaderboard(db, school_id=school_id, current_user_context=context, skip=skip, limit=limit, cursor=cursor, include_total=include_total)
     return APIResponse(message="School leaderboard retrieved successfully", data=leaderboard_data)
 
 
+@router.get("/schools/{school_id}/leaderboard/export", response_class=StreamingResponse)
+async def export_school_leaderboard(
+    *,
+    school_id: int,
+    context: UserContext = Depends(deps.get_current_user_with_context),
+    export_format: ExportFormatEnum = Query(ExportFormatEnum.CSV, alias="format", description=FORMAT_DESCRIPTION)
+):
+    return StreamingResponse(
+        report_service.export_school_leaderboard(school_id=school_id, current_user_context=context, export_format=export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="school-{school_id}-leaderboard.{export_format.value}"'},
+    )
+
+
+@router.get("/schools/{school_id}/leaderboard/students/{student_id}", response_model=APIResponse[LeaderboardPositionSchema])
+async def get_leaderboard_position(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    school_id: int,
+    student_id: int,
+    context: UserContext = Depends(deps.get_current_user_with_context),
+    window: int = Query(5, ge=0, le=50)
+):
+    position = await report_service.get_leaderboard_position(db, school_id=school_id, student_id=student_id, current_user_context=context, window=window)
+    return APIResponse(message="Leaderboard position retrieved successfully", data=position)
+
+
 @router.get("/schools/{school_id}/trading-leaderboard", response_model=APIResponse[TradingLeaderboardResponseSchema])
 @cache_endpoint(ttl=600)
 async def get_school_trading_leaderboard(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     school_id: int,
     context: UserContext = Depends(deps.get_current_user_with_context),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False
 ):
-    leaderboard_data = await report_service.get_trading_leaderboard(db, school_id=school_id, current_user_context=context, skip=skip, limit=limit)
+    leaderboard_data = await report_service.get_trading_leaderboard(db, school_id=school_id, current_user_context=context, skip=skip, limit=limit, cursor=cursor, include_total=include_total)
     return APIResponse(message="School trading leaderboard retrieved successfully", data=leaderboard_data)
 
 
+@router.get("/schools/{school_id}/trading-leaderboard/export", response_class=StreamingResponse)
+async def export_school_trading_leaderboard(
+    *,
+    school_id: int,
+    context: UserContext = Depends(deps.get_current_user_with_context),
+    export_format: ExportFormatEnum = Query(ExportFormatEnum.CSV, alias="format", description=FORMAT_DESCRIPTION)
+):
+    return StreamingResponse(
+        report_service.export_trading_leaderboard(school_id=school_id, current_user_context=context, export_format=export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="school-{school_id}-trading-leaderboard.{export_format.value}"'},
+    )
+
+
 @router.get("/schools/{school_id}/stats", response_model=APIResponse[SchoolDashboardStatsSchema])
 @cache_endpoint(ttl=600)
 async def get_school_dashboard_stats(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     school_id: int,
     context: UserContext = Depends(deps.get_current_user_with_context),
     start_date: Optional[datetime] = Query(None),
@@ -73,7 +121,7 @@ async def get_school_dashboard_stats(
 @cache_endpoint(ttl=300)
 async def get_student_lesson_progress(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     context: UserContext = Depends(deps.get_current_user_with_context)
 ):
     progress_data = report_service.get_student_lesson_progress_by_level(db, current_user_context=context)
@@ -84,7 +132,7 @@ async def get_student_lesson_progress(
 @cache_endpoint(ttl=600)
 async def get_admin_dashboard_report(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     context: UserContext = Depends(deps.get_current_user_with_context),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None)
@@ -97,7 +145,7 @@ async def get_admin_dashboard_report(
 @cache_endpoint(ttl=600)
 async def get_admin_dashboard_stats(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     context: UserContext = Depends(deps.get_current_user_with_context),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None)
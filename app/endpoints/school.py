@@ -108,7 +108,7 @@ async def get_school_teams(
 @cache_endpoint(ttl=600)
 async def get_admin_schools_report(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     context: UserContext = Depends(deps.get_current_user_with_context),
     skip: int = 0,
     limit: int = 100
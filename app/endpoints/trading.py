@@ -1,10 +1,12 @@
 import asyncio
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.core.constants import OrderTypeEnum
+from app.core.constants import ExportFormatEnum, OrderTypeEnum
+from app.crud.base import CursorPage
 from app.schemas.response import APIResponse
 from app.utils import deps
 from app.schemas.user import UserContext
@@ -28,6 +30,7 @@ from app.schemas.trading import (
     OrderPreview,
     NewsArticle
 )
+from app.services.export import FORMAT_DESCRIPTION, MEDIA_TYPES
 from app.services.polygon import polygon_service
 from app.services.trading import trading_service
 from app.core.decorators import cache_endpoint
@@ -454,6 +457,36 @@ def create_trading_router():
             data=history
         )
 
+    @router.get("/trade/history/page", response_model=APIResponse[CursorPage[TradeOrder]])
+    @cache_endpoint(ttl=300)
+    async def get_trade_history_page(
+        db: Session = Depends(deps.get_db),
+        context: UserContext = Depends(deps.get_current_user_with_context),
+        cursor: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=500)
+    ):
+        page = await trading_service.get_trade_history_page(
+            db,
+            user_id=context.user.id,
+            cursor=cursor,
+            limit=limit
+        )
+        return APIResponse(
+            message="Trade history retrieved successfully",
+            data=page
+        )
+
+    @router.get("/trade/history/export", response_class=StreamingResponse)
+    async def export_trade_history(
+        context: UserContext = Depends(deps.get_current_user_with_context),
+        export_format: ExportFormatEnum = Query(ExportFormatEnum.CSV, alias="format", description=FORMAT_DESCRIPTION)
+    ):
+        return StreamingResponse(
+            trading_service.export_trade_history(context.user.id, export_format=export_format),
+            media_type=MEDIA_TYPES[export_format],
+            headers={"Content-Disposition": f'attachment; filename="trade-history.{export_format.value}"'},
+        )
+
     @router.get("/stocks/{ticker}/history", response_model=APIResponse[HistoricalDataSchema])
     @cache_endpoint(ttl=600)
     async def get_historical_data(
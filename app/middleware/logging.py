@@ -5,6 +5,8 @@ from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import StreamingResponse
 from app.core.cache import cache
+from app.core.config import settings
+from app.core.metrics import RequestQueryStats, current_route, query_metrics, query_stats, request_scope
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +14,9 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         request_id = str(uuid.uuid4())
         request.state.request_id = request_id
+        request_scope.set(request.scope)
+        stats = RequestQueryStats()
+        query_stats.set(stats)
         
         start_time = time.time()
         
@@ -36,6 +41,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         
         process_time = time.time() - start_time
         status_code = response.status_code
+        query_metrics.record(current_route(), stats)
         
         cache_status = getattr(request.state, "cache_status", None)
         cache_msg = f" [CACHE: {cache_status}]" if cache_status else ""
@@ -50,10 +56,16 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                 "path": path,
                 "status_code": status_code,
                 "duration_ms": round(process_time * 1000, 2),
-                "cache_status": cache_status
+                "cache_status": cache_status,
+                "db_queries": stats.count,
+                "db_time_ms": round(stats.duration * 1000, 2)
             }
         )
         
+        if settings.DB_QUERY_HEADERS:
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Time-Ms"] = f"{stats.duration * 1000:.2f}"
+        
         if isinstance(response, StreamingResponse):
             response.headers["X-Request-ID"] = request_id
         else:
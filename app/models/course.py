@@ -28,6 +28,10 @@ class Course(Base):
     level = Column(Enum(CourseLevelEnum), nullable=False, default=CourseLevelEnum.BEGINNER)
     school_id = Column(Integer, ForeignKey("schools.id"), nullable=False)
     is_active = Column(Boolean, default=True)
+    # Live lessons across live curriculums; kept current by the lesson and curriculum CRUD.
+    total_lessons = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped whenever a curriculum or lesson of the course is written; keys the cached course tree.
+    content_version = Column(Integer, nullable=False, default=0, server_default="0")
     deleted_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
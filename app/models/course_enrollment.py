@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum as SQLEnum, func
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum as SQLEnum, Index, func, text
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.core.constants import EnrollmentStatusEnum
@@ -13,10 +13,15 @@ class CourseEnrollment(Base):
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     progress_percentage = Column(Integer, default=0)
+    completed_lessons = Column(Integer, nullable=False, default=0, server_default="0")
     deleted_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=True)
 
+    __table_args__ = (
+        Index('ix_course_enrollments_user_course_active', 'user_id', 'course_id', postgresql_where=text('deleted_at IS NULL')),
+    )
+
     user = relationship("User", back_populates="course_enrollments")
     course = relationship("Course", back_populates="enrollments")
     lesson_progress = relationship("LessonProgress", back_populates="enrollment", cascade="all, delete-orphan")
@@ -24,10 +29,7 @@ class CourseEnrollment(Base):
 
 
     def calculate_progress(self):
-        if not self.lesson_progress:
-            return 0
-        total_lessons = len(self.lesson_progress)
-        if total_lessons == 0:
+        total_lessons = self.course.total_lessons if self.course else 0
+        if not total_lessons:
             return 0
-        completed = sum(1 for lp in self.lesson_progress if lp.is_completed)
-        return int((completed / total_lessons) * 100)
\ No newline at end of file
+        return min(100, int((self.completed_lessons / total_lessons) * 100))
\ No newline at end of file
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -10,7 +10,9 @@ class Curriculum(Base):
     title = Column(String, index=True, nullable=False)
     description = Column(String, nullable=True)
     order = Column(Integer, nullable=False, default=0)
-    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
+    # active_history keeps the previous course on reassignment, so a move can
+    # restate both courses' counters.
+    course_id = column_property(Column(Integer, ForeignKey("courses.id"), nullable=False), active_history=True)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -17,6 +17,8 @@ class Exam(Base):
     is_active = Column(Boolean, default=True)
     allow_multiple_attempts = Column(Boolean, default=False)
     show_results_immediately = Column(Boolean, default=False)
+    # Bumped whenever one of the exam's questions is written; keys the cached question set.
+    content_version = Column(Integer, nullable=False, default=0, server_default="0")
     deleted_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, Boolean, Enum
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, Boolean, Enum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 from app.core.constants import ExamAttemptStatusEnum
 
+# Predicate of the partial unique index that allows one open attempt per user and exam.
+IN_PROGRESS_ONLY = text("status = 'IN_PROGRESS'")
+
 class ExamAttempt(Base):
     __tablename__ = "exam_attempts"
 
@@ -18,6 +21,14 @@ class ExamAttempt(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index('ix_exam_attempts_user_exam', 'user_id', 'exam_id'),
+        Index(
+            'uq_exam_attempts_user_exam_in_progress', 'user_id', 'exam_id', unique=True,
+            postgresql_where=IN_PROGRESS_ONLY, sqlite_where=IN_PROGRESS_ONLY,
+        ),
+    )
+
     user = relationship("User", back_populates="exam_attempts")
     exam = relationship("Exam", back_populates="attempts")
     user_answers = relationship("UserAnswer", back_populates="exam_attempt", cascade="all, delete-orphan")
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 from app.core.constants import LessonTypeEnum
@@ -13,7 +13,9 @@ class Lesson(Base):
     lesson_type = Column(Enum(LessonTypeEnum), nullable=False, default=LessonTypeEnum.TEXT)
     duration = Column(Integer, nullable=False, default=0) # Duration in minutes
     order = Column(Integer, nullable=False, default=0)
-    curriculum_id = Column(Integer, ForeignKey("curriculums.id"), nullable=False)
+    # active_history keeps the previous curriculum on reassignment, so a move
+    # can restate both courses' counters.
+    curriculum_id = column_property(Column(Integer, ForeignKey("curriculums.id"), nullable=False), active_history=True)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Boolean, func
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Boolean, Index, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -18,5 +18,9 @@ class LessonProgress(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=True)
 
+    __table_args__ = (
+        Index('ix_lesson_progress_enrollment_lesson', 'enrollment_id', 'lesson_id'),
+    )
+
     enrollment = relationship("CourseEnrollment", back_populates="lesson_progress")
     lesson = relationship("Lesson", back_populates="progress_records")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -14,4 +14,8 @@ class Notification(Base):
     link = Column(String, nullable=True) # Optional link to related resource
     notification_type = Column(String, nullable=True) # e.g., 'new_assignment', 'account_activity'
 
+    __table_args__ = (
+        Index('ix_notifications_user_read', 'user_id', 'is_read'),
+    )
+
     user = relationship("User")
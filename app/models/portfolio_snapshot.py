@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Index, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -21,4 +21,8 @@ class PortfolioSnapshot(Base):
     percent_change_from_start = Column(Float, default=0.0, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index('ix_portfolio_snapshots_user_date', 'user_id', 'snapshot_date'),
+    )
+
     user = relationship("User", back_populates="portfolio_snapshots")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Float, DateTime
+from sqlalchemy import Column, ForeignKey, Integer, String, Float, Date, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
@@ -16,15 +16,58 @@ class TradingLeaderboardSnapshot(Base):
     trading_profit = Column(Float, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # One row per student per school; the conflict target for refresh upserts.
+        Index('uq_trading_leaderboard_snapshots_school_student', 'school_id', 'student_id', unique=True),
+    )
+
 class LeaderboardSnapshot(Base):
     __tablename__ = "leaderboard_snapshots"
 
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, index=True)
+    # student_id and total_rewards are the sort keys of the leaderboard pages;
+    # NOT NULL so the keyset row comparison never meets a NULL.
+    student_id = Column(Integer, nullable=False, index=True)
     student_full_name = Column(String, index=True)
     student_email = Column(String, index=True)
-    lessons_completed = Column(Integer)
-    accumulated_exam_score = Column(Float)
-    total_rewards = Column(Integer)
-    school_id = Column(Integer, ForeignKey("schools.id"), index=True)
+    lessons_completed = Column(Integer, default=0)
+    accumulated_exam_score = Column(Float, default=0.0)
+    total_rewards = Column(Integer, nullable=False, default=0)
+    # Covered by the composite indexes below, which both lead with school_id.
+    school_id = Column(Integer, ForeignKey("schools.id"))
     timestamp = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # One score row per student per school; also the conflict target for reconciling upserts.
+        Index('uq_leaderboard_snapshots_school_student', 'school_id', 'student_id', unique=True),
+        # Same order as the leaderboard pages, so top-N reads are index scans.
+        Index('ix_leaderboard_snapshots_school_score', school_id, total_rewards.desc(), student_id.desc()),
+    )
+
+class SchoolDailyRollup(Base):
+    """Per-school totals of what was created on one day, as the school dashboards count it."""
+    __tablename__ = "school_daily_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    school_id = Column(Integer, ForeignKey("schools.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    courses = Column(Integer, nullable=False, default=0)
+    students = Column(Integer, nullable=False, default=0)
+    teachers = Column(Integer, nullable=False, default=0)
+    staff = Column(Integer, nullable=False, default=0)
+    lessons_completed = Column(Integer, nullable=False, default=0)
+    exam_score = Column(Float, nullable=False, default=0.0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        Index('uq_school_daily_rollups_school_day', 'school_id', 'day', unique=True),
+        Index('ix_school_daily_rollups_day', 'day'),
+    )
+
+class PlatformDailyRollup(Base):
+    """Platform-wide figures for one day that have no school, and the marker that the day has been rolled up."""
+    __tablename__ = "platform_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    revenue = Column(Float, nullable=False, default=0.0)
+    computed_at = Column(DateTime, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, func
 
 from app.core.database import Base
 
@@ -8,3 +8,4 @@ class TokenDenylist(Base):
     id = Column(Integer, primary_key=True, index=True)
     jti = Column(String, nullable=False, index=True)
     exp = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
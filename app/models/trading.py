@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Enum, Numeric
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Enum, Index, Numeric
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -68,4 +68,10 @@ class TradeOrder(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index('ix_trade_orders_user_executed', 'user_id', 'executed_at'),
+        # Trade history pages keyset on id within a user.
+        Index('ix_trade_orders_user_id_id', 'user_id', 'id'),
+    )
+
     user = relationship("User", back_populates="trade_orders")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -16,6 +16,11 @@ class UserAnswer(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # One answer per question per attempt; also the conflict target for answer upserts.
+        Index('uq_user_answers_attempt_question', 'exam_attempt_id', 'question_id', unique=True),
+    )
+
     exam_attempt = relationship("ExamAttempt", back_populates="user_answers")
     question = relationship("Question", back_populates="user_answers")
     user = relationship("User", back_populates="user_answers")
@@ -14,7 +14,7 @@ from app.core.config import settings
 from app.schemas.token import TokenPayload
 from app.core.database import SessionLocal
 from app.crud.user import user as user_crud
-from app.crud.token_denylist import token_denylist as token_denylist_crud
+from app.services.token_denylist import token_denylist_service
 
 logger = logging.getLogger(__name__)
 
@@ -98,7 +98,7 @@ def register_websocket_events(sio_server: socketio.AsyncServer):
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
             token_data = TokenPayload(**payload)
 
-            if token_data.jti and token_denylist_crud.get_by_jti(db, jti=token_data.jti):
+            if token_data.jti and token_denylist_service.is_revoked(db, token_data.jti):
                 logger.warning(f"Connection rejected for {sid}: Token has been revoked")
                 return False
 
@@ -30,6 +30,7 @@ class Course(CourseBase):
     id: int
     school_id: int
     total_enrolled_students: int = 0
+    total_lessons: int = 0
     user_progress_percentage: Optional[int] = None
     user_enrollment_status: Optional[EnrollmentStatusEnum] = None
     user_started_at: Optional[datetime] = None
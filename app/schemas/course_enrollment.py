@@ -28,5 +28,6 @@ class CourseEnrollment(CourseEnrollmentBase):
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     progress_percentage: int
+    completed_lessons: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
\ No newline at end of file
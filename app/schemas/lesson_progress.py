@@ -1,7 +1,11 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
 from datetime import datetime
 
+from app.schemas.course_enrollment import CourseEnrollment
+
+MAX_PROGRESS_SYNC_EVENTS = 200
+
 
 class LessonProgressBase(BaseModel):
     enrollment_id: int
@@ -30,4 +34,24 @@ class LessonProgress(LessonProgressBase):
     time_spent_seconds: int
     last_accessed_at: Optional[datetime] = None
     created_at: datetime
-    updated_at: Optional[datetime] = None
\ No newline at end of file
+    updated_at: Optional[datetime] = None
+
+
+class LessonProgressEvent(BaseModel):
+    lesson_id: int
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    time_spent_seconds: int = Field(default=0, ge=0)  # spent since the previous event for this lesson
+
+
+class LessonProgressSync(BaseModel):
+    events: List[LessonProgressEvent] = Field(..., min_length=1, max_length=MAX_PROGRESS_SYNC_EVENTS)
+
+
+class LessonProgressSyncResult(BaseModel):
+    enrollments: List[CourseEnrollment]
+    lesson_progress: List[LessonProgress]
+
+
+class LessonHeartbeat(BaseModel):
+    seconds: int = Field(..., ge=1)  # watched since the previous heartbeat
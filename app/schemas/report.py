@@ -37,12 +37,21 @@ class LeaderboardEntrySchema(BaseModel):
     lessons_completed: int
     accumulated_exam_score: float
     total_rewards: int
+    rank: Optional[int] = None
 
 class LeaderboardResponseSchema(BaseModel):
     items: List[LeaderboardEntrySchema]
-    total: int
+    # Left out of cursor pages unless include_total is set.
+    total: Optional[int] = None
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
+
+class LeaderboardPositionSchema(BaseModel):
+    student_id: int
+    rank: Optional[int] = None
+    total: int
+    items: List[LeaderboardEntrySchema]
 
 class TradingLeaderboardEntrySchema(BaseModel):
     student_id: int
@@ -54,9 +63,10 @@ class TradingLeaderboardEntrySchema(BaseModel):
 
 class TradingLeaderboardResponseSchema(BaseModel):
     items: List[TradingLeaderboardEntrySchema]
-    total: int
+    total: Optional[int] = None
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
 
 class SchoolDashboardStatsSchema(BaseModel):
     total_students: int
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
 from datetime import datetime
 
 class UserAnswerBase(BaseModel):
@@ -27,3 +27,18 @@ class UserAnswer(UserAnswerBase):
     created_at: datetime
     updated_at: Optional[datetime]
     model_config = ConfigDict(from_attributes=True)
+
+
+class AnswerDraft(BaseModel):
+    question_id: int
+    answer_text: Optional[int] = None
+
+
+class AnswerAutosave(BaseModel):
+    # Any subset of the exam; later drafts for the same question win.
+    answers: List[AnswerDraft] = Field(..., min_length=1, max_length=500)
+
+
+class AnswerAutosaveResult(BaseModel):
+    saved: int
+    saved_at: datetime
@@ -2,15 +2,14 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from app.core.constants import ADMIN_SCHOOL_NAME, RoleEnum
+from app.core.database import run_in_db_thread
 from app.crud.user import user as crud_user
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import get_password_hash_async, verify_password_async, create_access_token
 from app.schemas.token import LoginResponse, SuperAdminCreate, Token, TokenPayload
-from app.schemas.token_denylist import TokenDenylistCreate
 from app.models.user import User
 from app.models.one_time_token import TokenType
-from app.crud.token_denylist import token_denylist as crud_token_denylist
 from app.crud.one_time_token import one_time_token as crud_one_time_token
-from app.crud.role import role as crud_role
+from app.crud.role import role_registry
 from app.crud.school import school as crud_school
 from app.core.config import settings
 from jose import JWTError, jwt
@@ -21,11 +20,12 @@ import random
 from app.schemas.user import UserContext
 from app.services.email import EmailService
 from app.services.notification import notification_service
+from app.services.token_denylist import token_denylist_service
 
 class AuthService:
-    def login(self, db: Session, *, email: str, password: str) -> LoginResponse:
-        user = crud_user.get_by_email(db, email=email)
-        if not user or not verify_password(password, user.hashed_password):
+    async def login(self, db: Session, *, email: str, password: str) -> LoginResponse:
+        user = await run_in_db_thread(crud_user.get_by_email, db, email=email)
+        if not user or not await verify_password_async(password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
@@ -37,7 +37,7 @@ class AuthService:
                 detail="User is not verified or inactive",
             )
 
-        contexts = crud_user.get_user_contexts(db, user_id=user.id)
+        contexts = await run_in_db_thread(crud_user.get_user_contexts, db, user_id=user.id)
 
         pydantic_contexts = []
         for ctx in contexts:
@@ -93,7 +93,7 @@ class AuthService:
         if not token_data.jti or not token_data.exp:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token missing JTI or expiration claim")
 
-        crud_token_denylist.create(db, obj_in=TokenDenylistCreate(jti=token_data.jti, exp=datetime.fromtimestamp(token_data.exp)))
+        token_denylist_service.revoke(db, jti=token_data.jti, exp=token_data.exp)
         db.commit()
 
     async def request_password_reset(self, db: Session, *, email: str, frontend_base_url: str) -> None:
@@ -122,7 +122,7 @@ class AuthService:
             template_context={'full_name': user.full_name, 'reset_code': reset_link}
         )
 
-    def reset_password(self, db: Session, *, token: str, new_password: str) -> None:
+    async def reset_password(self, db: Session, *, token: str, new_password: str) -> None:
         reset_token = crud_one_time_token.get_by_token_value(db, token=token, token_type=TokenType.PASSWORD_RESET)
         if not reset_token:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired token.")
@@ -131,7 +131,7 @@ class AuthService:
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
 
-        user.hashed_password = get_password_hash(new_password)
+        user.hashed_password = await get_password_hash_async(new_password)
         crud_user.update(db, db_obj=user)
 
         crud_one_time_token.delete_by_token_value(db, token=token, token_type=TokenType.PASSWORD_RESET)
@@ -190,8 +190,8 @@ class AuthService:
             template_context={'user_name': user.full_name, 'verification_code': verification_code}
         )
 
-    def create_super_admin(self, db: Session, *, super_admin_in: SuperAdminCreate) -> User:
-        admin_role = crud_role.get_by_name(db, name=RoleEnum.SUPER_ADMIN) #would later be admin and member...
+    async def create_super_admin(self, db: Session, *, super_admin_in: SuperAdminCreate) -> User:
+        admin_role = role_registry.get_by_name(db, RoleEnum.SUPER_ADMIN) #would later be admin and member...
         if not admin_role:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -205,7 +205,7 @@ class AuthService:
                 detail="A user with this email already exists.",
             )
 
-        hashed_password = get_password_hash(super_admin_in.password)
+        hashed_password = await get_password_hash_async(super_admin_in.password)
 
         super_admin_data = {
             "full_name": super_admin_in.full_name,
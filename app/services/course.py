@@ -2,7 +2,6 @@ from typing import List
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
-from app.models.course import Course as CourseModel
 from app.schemas.course import CourseCreate, CourseUpdate, Course as CourseSchema
 from app.schemas.user import UserContext, User
 from app.core.constants import RoleEnum
@@ -12,6 +11,8 @@ from app.crud.course import course as crud_course
 from app.crud.course_enrollment import course_enrollment as crud_enrollment
 from app.schemas.course_enrollment import CourseEnrollmentCreate
 from app.models.course_enrollment import EnrollmentStatusEnum
+from app.services.course_tree import course_tree_service
+from app.services.exam_eligibility import exam_eligibility_service
 from app.services.notification import notification_service
 from app.utils.permission import PermissionHelper as permission_helper
 
@@ -180,8 +181,9 @@ class CourseService:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User is not enrolled in this course.")
 
         crud_course.unenroll_student_from_course(db, course=course, user=student_user)
+        exam_eligibility_service.invalidate_course(course.id)
 
-        enrollment = crud_enrollment.get_by_user_and_course(db, user_id=user_id, course_id=course_id)
+        enrollment = crud_enrollment.get_by_user_and_course(db, user_id=user_id, course_id=course_id, profile="minimal")
         if enrollment:
             crud_enrollment.delete(db, id=enrollment.id)
 
@@ -195,70 +197,16 @@ class CourseService:
 
         return CourseSchema.model_validate(course)
 
-    def _enrich_course_with_progress(self, db: Session, course_model: CourseModel, user_id: int) -> CourseSchema:
-        course_schema = CourseSchema.model_validate(course_model)
-
-        user_enrollment = next((e for e in course_model.enrollments if e.user_id == user_id), None)
-
-        if user_enrollment:
-            course_schema.user_progress_percentage = user_enrollment.progress_percentage
-            course_schema.user_enrollment_status = user_enrollment.status
-            course_schema.user_started_at = user_enrollment.started_at
-            course_schema.user_completed_at = user_enrollment.completed_at
-
-            lesson_progress_map = {lp.lesson_id: lp for lp in user_enrollment.lesson_progress}
-
-            for curriculum_schema in course_schema.curriculums:
-                for lesson_schema in curriculum_schema.lessons:
-                    lesson_progress = lesson_progress_map.get(lesson_schema.id)
-                    if lesson_progress:
-                        lesson_schema.is_completed = lesson_progress.is_completed
-                        lesson_schema.started_at = lesson_progress.started_at
-                        lesson_schema.completed_at = lesson_progress.completed_at
-                        lesson_schema.time_spent_seconds = lesson_progress.time_spent_seconds
-                        lesson_schema.last_accessed_at = lesson_progress.last_accessed_at
-                    else:
-                        lesson_schema.is_completed = False
-                        lesson_schema.started_at = None
-                        lesson_schema.completed_at = None
-                        lesson_schema.time_spent_seconds = 0
-                        lesson_schema.last_accessed_at = None
-        else:
-            course_schema.user_progress_percentage = 0
-            course_schema.user_enrollment_status = EnrollmentStatusEnum.NOT_STARTED
-            course_schema.user_started_at = None
-            course_schema.user_completed_at = None
-            for curriculum_schema in course_schema.curriculums:
-                for lesson_schema in curriculum_schema.lessons:
-                    lesson_schema.is_completed = False
-                    lesson_schema.started_at = None
-                    lesson_schema.completed_at = None
-                    lesson_schema.time_spent_seconds = 0
-                    lesson_schema.last_accessed_at = None
-
-        return course_schema
-
-    def _batch_enrich_courses_with_progress(self, db: Session, course_ids: List[int], user_id: int) -> List[CourseSchema]:
-        courses = crud_course.get_batch_with_relationships(db, course_ids)
-        course_map = {course.id: course for course in courses}
-        enriched_courses = []
-        for course_id in course_ids:
-            if course_id in course_map:
-                enriched_courses.append(self._enrich_course_with_progress(db, course_map[course_id], user_id))
-        return enriched_courses
-
     def get_course(self, db: Session, course_id: int, current_user_context: UserContext) -> CourseSchema:
-        course_model = crud_course.get(db, id=course_id)
+        course_model = crud_course.get(db, id=course_id, profile="minimal")
         if not course_model:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
 
         permission_helper.require_course_view_permission(current_user_context, course_model)
-
-        result = self._enrich_course_with_progress(db, course_model, current_user_context.user.id)
-        return result
+        return course_tree_service.build(db, [course_model], current_user_context.user.id)[0]
 
     def get_course_teachers(self, db: Session, course_id: int, current_user_context: UserContext) -> List[User]:
-        course = crud_course.get(db, id=course_id)
+        course = crud_course.get(db, id=course_id, profile="minimal")
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
 
@@ -266,7 +214,7 @@ class CourseService:
         return course.teachers
 
     def get_course_students(self, db: Session, course_id: int, current_user_context: UserContext) -> List[User]:
-        course = crud_course.get(db, id=course_id)
+        course = crud_course.get(db, id=course_id, profile="minimal")
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
 
@@ -275,50 +223,36 @@ class CourseService:
 
     def get_all_courses(self, db: Session, current_user_context: UserContext, skip: int = 0, limit: int = 100) -> List[CourseSchema]:
         if permission_helper.is_super_admin(current_user_context):
-            courses = crud_course.get_multi(db, skip=skip, limit=limit)
+            courses = crud_course.get_multi(db, skip=skip, limit=limit, profile="minimal")
         elif current_user_context.school:
-            courses = crud_course.get_courses_by_school(db, school_id=current_user_context.school.id, skip=skip, limit=limit)
+            courses = crud_course.get_courses_by_school(db, school_id=current_user_context.school.id, skip=skip, limit=limit, profile="minimal")
         else:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view courses.")
 
-        course_ids = [course.id for course in courses]
-        enriched_courses = self._batch_enrich_courses_with_progress(db, course_ids, current_user_context.user.id)
-        return enriched_courses
+        return course_tree_service.build(db, courses, current_user_context.user.id)
 
     def get_user_courses(self, db: Session, current_user_context: UserContext) -> List[CourseSchema]:
-        courses = crud_course.get_courses_by_user_id(db, user_id=current_user_context.user.id)
-        enriched_courses = []
-        for course_model in courses:
-            enriched_courses.append(self._enrich_course_with_progress(db, course_model, current_user_context.user.id))
-
-        return enriched_courses
+        courses = crud_course.get_courses_by_user_id(db, user_id=current_user_context.user.id, profile="minimal")
+        return course_tree_service.build(db, courses, current_user_context.user.id)
 
     def get_courses_by_school_id(self, db: Session, school_id: int, current_user_context: UserContext, skip: int = 0, limit: int = 100) -> List[CourseSchema]:
         permission_helper.require_school_view_permission(current_user_context, school_id)
-        courses = crud_course.get_courses_by_school(db, school_id=school_id, skip=skip, limit=limit)
-        enriched_courses = []
-        for course_model in courses:
-            enriched_courses.append(self._enrich_course_with_progress(db, course_model, current_user_context.user.id))
-        return enriched_courses
+        courses = crud_course.get_courses_by_school(db, school_id=school_id, skip=skip, limit=limit, profile="minimal")
+        return course_tree_service.build(db, courses, current_user_context.user.id)
 
     def get_student_courses_admin(self, db: Session, student_id: int, current_user_context: UserContext) -> List[CourseSchema]:
         student_user = crud_user.get(db, id=student_id)
         if not student_user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found.")
 
-        courses = crud_course.get_student_courses(db, user_id=student_id)
-
-        enriched_courses = []
-        for course_model in courses:
-            enriched_courses.append(self._enrich_course_with_progress(db, course_model, student_id))
-
-        return enriched_courses
+        courses = crud_course.get_student_courses(db, user_id=student_id, profile="minimal")
+        return course_tree_service.build(db, courses, student_id)
 
     async def update_student_courses_bulk(self, db: Session, student_id: int, course_ids: List[int], current_user_context: UserContext) -> dict:
         permission_helper.require_school_management_permission(current_user_context, current_user_context.school.id)
         permission_helper.validate_user_role_in_school(db, student_id, current_user_context.school.id, RoleEnum.STUDENT)
 
-        current_courses = crud_course.get_student_courses(db, user_id=student_id)
+        current_courses = crud_course.get_student_courses(db, user_id=student_id, profile="minimal")
         current_course_ids = {course.id for course in current_courses}
         target_course_ids = set(course_ids)
 
@@ -329,16 +263,17 @@ class CourseService:
         unenrolled_count = 0
 
         for course_id in to_unenroll:
-            enrollment = crud_enrollment.get_by_user_and_course(db, user_id=student_id, course_id=course_id)
+            enrollment = crud_enrollment.get_by_user_and_course(db, user_id=student_id, course_id=course_id, profile="minimal")
             if enrollment:
-                crud_course.unenroll_student_from_course(db, course=crud_course.get(db, id=course_id), user=crud_user.get(db, id=student_id))
+                crud_course.unenroll_student_from_course(db, course=crud_course.get(db, id=course_id, profile="minimal"), user=crud_user.get(db, id=student_id))
+                exam_eligibility_service.invalidate_course(course_id)
                 crud_enrollment.delete(db, id=enrollment.id)
                 unenrolled_count += 1
 
         if to_enroll:
             bulk_enrollments = []
             for course_id in to_enroll:
-                course = crud_course.get(db, id=course_id)
+                course = crud_course.get(db, id=course_id, profile="minimal")
                 if course:
                     crud_course.enroll_student_in_course(db, course=course, user=crud_user.get(db, id=student_id))
                     bulk_enrollments.append(CourseEnrollmentCreate(
@@ -374,7 +309,7 @@ class CourseService:
 
         permission_helper.validate_user_role_in_school(db, teacher_id, current_user_context.school.id, RoleEnum.TEACHER)
 
-        current_courses = crud_course.get_teacher_courses(db, user_id=teacher_id)
+        current_courses = crud_course.get_teacher_courses(db, user_id=teacher_id, profile="minimal")
         current_course_ids = {course.id for course in current_courses}
         target_course_ids = set(course_ids)
 
@@ -386,7 +321,7 @@ class CourseService:
 
         for course_id in to_remove:
             try:
-                course = crud_course.get(db, id=course_id)
+                course = crud_course.get(db, id=course_id, profile="minimal")
                 teacher_user = crud_user.get(db, id=teacher_id)
                 crud_course.remove_teacher_from_course(db, course=course, user=teacher_user)
                 removed_count += 1
@@ -395,7 +330,7 @@ class CourseService:
 
         for course_id in to_assign:
             try:
-                course = crud_course.get(db, id=course_id)
+                course = crud_course.get(db, id=course_id, profile="minimal")
                 teacher_user = crud_user.get(db, id=teacher_id)
                 crud_course.add_teacher_to_course(db, course=course, user=teacher_user)
                 assigned_count += 1
@@ -1,8 +1,10 @@
+from collections import defaultdict
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
+from app.core.database import run_in_db_thread
 from app.crud.course_enrollment import course_enrollment as crud_enrollment
 from app.crud.lesson_progress import lesson_progress as crud_lesson_progress
 from app.crud.course import course as crud_course
@@ -11,17 +13,20 @@ from app.crud.course_reward import course_reward as crud_reward
 from app.crud.exam import exam as crud_exam
 from app.crud.exam_attempt import exam_attempt as crud_exam_attempt
 from app.schemas.user import UserContext
-from app.schemas.lesson_progress import LessonProgressCreate
+from app.schemas.course_enrollment import CourseEnrollment as CourseEnrollmentSchema
+from app.schemas.lesson_progress import LessonProgress as LessonProgressSchema, LessonProgressCreate, LessonProgressSync, LessonProgressSyncResult
+from app.models.lesson_progress import LessonProgress
 from app.schemas.reward_rating import CourseRewardCreate
 from app.models.course_enrollment import EnrollmentStatusEnum
 from app.utils.permission import PermissionHelper as permission_helper
+from app.services.leaderboard import leaderboard_service
 
 
 
 class CourseProgressService:
 
     def _get_or_raise_enrollment(self, db: Session, user_id: int, course_id: int):
-        enrollment = crud_enrollment.get_by_user_and_course(db, user_id=user_id, course_id=course_id)
+        enrollment = crud_enrollment.get_by_user_and_course(db, user_id=user_id, course_id=course_id, profile="minimal")
         if not enrollment:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -54,7 +59,7 @@ class CourseProgressService:
         if progress >= 100 and enrollment.status != EnrollmentStatusEnum.COMPLETED:
             enrollment.status = EnrollmentStatusEnum.COMPLETED
             enrollment.completed_at = datetime.now()
-            crud_enrollment.update(db, db_obj=enrollment, obj_in={})
+        db.add(enrollment)
 
         if enrollment.status == EnrollmentStatusEnum.COMPLETED and self._has_passed_course_exam(db, enrollment):
             existing_completion_rewards = crud_reward.get_by_enrollment_and_type(
@@ -69,16 +74,20 @@ class CourseProgressService:
                     points=100,
                     awarded_at=datetime.now()
                 )
-                crud_reward.create(db, obj_in=reward_in)
+                crud_reward.create(db, obj_in=reward_in, commit=False)
+                leaderboard_service.record(db, enrollment.user_id, rewards=reward_in.points)
 
     async def start_course(self, db: Session, course_id: int, current_user_context: UserContext):
+        return await run_in_db_thread(self._start_course, db, course_id, current_user_context)
+
+    def _start_course(self, db: Session, course_id: int, current_user_context: UserContext):
         if not permission_helper.is_student(current_user_context):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only students can start courses."
             )
 
-        course = crud_course.get(db, id=course_id)
+        course = crud_course.get(db, id=course_id, profile="minimal")
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
 
@@ -95,6 +104,9 @@ class CourseProgressService:
         return enrollment
 
     async def start_lesson(self, db: Session, lesson_id: int, current_user_context: UserContext):
+        return await run_in_db_thread(self._start_lesson, db, lesson_id, current_user_context)
+
+    def _start_lesson(self, db: Session, lesson_id: int, current_user_context: UserContext):
         if not permission_helper.is_student(current_user_context):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -138,6 +150,9 @@ class CourseProgressService:
         return lesson_progress
 
     async def complete_lesson(self, db: Session, lesson_id: int, current_user_context: UserContext):
+        return await run_in_db_thread(self._complete_lesson, db, lesson_id, current_user_context)
+
+    def _complete_lesson(self, db: Session, lesson_id: int, current_user_context: UserContext):
         if not permission_helper.is_student(current_user_context):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -169,14 +184,114 @@ class CourseProgressService:
         if not lesson_progress.is_completed:
             lesson_progress.is_completed = True
             lesson_progress.completed_at = datetime.now()
-            crud_lesson_progress.update(db, db_obj=lesson_progress, obj_in={})
+            crud_enrollment.increment_completed_lessons(db, enrollment)
+            db.add(lesson_progress)
+            db.flush()
+            leaderboard_service.record(db, current_user_context.user.id, lessons_completed=1)
 
             self._update_course_progress(db, enrollment)
+            db.flush()
 
         return lesson_progress
 
+    async def sync_lesson_progress(self, db: Session, sync_in: LessonProgressSync, current_user_context: UserContext) -> LessonProgressSyncResult:
+        return await run_in_db_thread(self._sync_lesson_progress, db, sync_in, current_user_context)
+
+    def _sync_lesson_progress(self, db: Session, sync_in: LessonProgressSync, current_user_context: UserContext) -> LessonProgressSyncResult:
+        """Apply a batch of offline progress events in the caller's transaction.
+
+        Events for the same lesson are merged first, so the batch costs one
+        lookup per table regardless of its size.
+        """
+        if not permission_helper.is_student(current_user_context):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only students can record lesson progress."
+            )
+
+        user_id = current_user_context.user.id
+        merged = self._merge_progress_events(sync_in)
+
+        course_by_lesson = crud_lesson.get_course_ids(db, list(merged))
+        missing = sorted(set(merged) - set(course_by_lesson))
+        if missing:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Lessons not found: {missing}")
+
+        course_ids = sorted(set(course_by_lesson.values()))
+        for course in crud_course.get_batch_with_relationships(db, course_ids, profile="minimal"):
+            permission_helper.require_course_view_permission(current_user_context, course)
+
+        enrollments = crud_enrollment.get_by_user_for_courses(db, user_id=user_id, course_ids=course_ids, profile="minimal")
+        not_enrolled = [course_id for course_id in course_ids if course_id not in enrollments]
+        if not_enrolled:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"You are not enrolled in courses: {not_enrolled}")
+
+        existing = {
+            (record.enrollment_id, record.lesson_id): record
+            for record in crud_lesson_progress.get_for_enrollments_and_lessons(
+                db, enrollment_ids=[e.id for e in enrollments.values()], lesson_ids=list(merged)
+            )
+        }
+
+        now = datetime.now()
+        newly_completed: Dict[int, int] = defaultdict(int)
+        records = []
+        for lesson_id, event in merged.items():
+            enrollment = enrollments[course_by_lesson[lesson_id]]
+            record = existing.get((enrollment.id, lesson_id))
+            if record is None:
+                record = LessonProgress(enrollment_id=enrollment.id, lesson_id=lesson_id, time_spent_seconds=0, is_completed=False)
+                db.add(record)
+
+            record.started_at = min(filter(None, [record.started_at, event["started_at"], event["completed_at"]]), default=now)
+            record.last_accessed_at = max(filter(None, [record.last_accessed_at, event["started_at"], event["completed_at"]]), default=now)
+            record.time_spent_seconds = (record.time_spent_seconds or 0) + event["time_spent_seconds"]
+            if event["completed_at"] and not record.is_completed:
+                record.is_completed = True
+                record.completed_at = event["completed_at"]
+                newly_completed[enrollment.id] += 1
+            records.append(record)
+
+        for enrollment in enrollments.values():
+            if enrollment.status == EnrollmentStatusEnum.NOT_STARTED:
+                enrollment.status = EnrollmentStatusEnum.IN_PROGRESS
+                enrollment.started_at = now
+            if newly_completed[enrollment.id]:
+                crud_enrollment.increment_completed_lessons(db, enrollment, count=newly_completed[enrollment.id])
+            db.add(enrollment)
+
+        db.flush()
+        leaderboard_service.record(db, user_id, lessons_completed=sum(newly_completed.values()))
+
+        for enrollment in enrollments.values():
+            if newly_completed[enrollment.id]:
+                self._update_course_progress(db, enrollment)
+        db.flush()
+
+        return LessonProgressSyncResult(
+            enrollments=[CourseEnrollmentSchema.model_validate(e) for e in enrollments.values()],
+            lesson_progress=[LessonProgressSchema.model_validate(r) for r in records]
+        )
+
+    def _merge_progress_events(self, sync_in: LessonProgressSync) -> Dict[int, dict]:
+        merged: Dict[int, dict] = {}
+        for event in sync_in.events:
+            started_at, completed_at = self._naive(event.started_at), self._naive(event.completed_at)
+            entry = merged.setdefault(event.lesson_id, {"started_at": None, "completed_at": None, "time_spent_seconds": 0})
+            entry["started_at"] = min(filter(None, [entry["started_at"], started_at]), default=None)
+            entry["completed_at"] = min(filter(None, [entry["completed_at"], completed_at]), default=None)
+            entry["time_spent_seconds"] += event.time_spent_seconds
+        return merged
+
+    @staticmethod
+    def _naive(value: Optional[datetime]) -> Optional[datetime]:
+        # Progress timestamps are stored as naive local time, like datetime.now() elsewhere here.
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone().replace(tzinfo=None)
+        return value
+
     def get_course_progress(self, db: Session, course_id: int, current_user_context: UserContext):
-        course = crud_course.get(db, id=course_id)
+        course = crud_course.get(db, id=course_id, profile="minimal")
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
 
@@ -186,14 +301,14 @@ class CourseProgressService:
         return enrollment
 
     def get_completed_lessons(self, db: Session, course_id: int, current_user_context: UserContext) -> List[int]:
-        course = crud_course.get(db, id=course_id)
+        course = crud_course.get(db, id=course_id, profile="minimal")
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
 
         permission_helper.require_course_view_permission(current_user_context, course)
 
         enrollment = crud_enrollment.get_by_user_and_course(
-            db, user_id=current_user_context.user.id, course_id=course_id
+            db, user_id=current_user_context.user.id, course_id=course_id, profile="minimal"
         )
 
         if not enrollment:
@@ -203,14 +318,14 @@ class CourseProgressService:
         return completed
 
     def get_lesson_progress_details(self, db: Session, course_id: int, current_user_context: UserContext):
-        course = crud_course.get(db, id=course_id)
+        course = crud_course.get(db, id=course_id, profile="minimal")
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
 
         permission_helper.require_course_view_permission(current_user_context, course)
 
         enrollment = crud_enrollment.get_by_user_and_course(
-            db, user_id=current_user_context.user.id, course_id=course_id
+            db, user_id=current_user_context.user.id, course_id=course_id, profile="minimal"
         )
 
         if not enrollment:
@@ -0,0 +1,144 @@
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import VersionedLRU
+from app.core.config import settings
+from app.crud.course import course as crud_course
+from app.crud.course_enrollment import course_enrollment as crud_enrollment
+from app.crud.course_rating import course_rating as crud_rating
+from app.models.course import Course as CourseModel
+from app.models.course_enrollment import EnrollmentStatusEnum
+from app.schemas.course import Course as CourseSchema
+from app.schemas.curriculum import Curriculum as CurriculumSchema
+from app.schemas.lesson import Lesson as LessonSchema
+from app.schemas.reward_rating import CourseRating as CourseRatingSchema
+
+logger = logging.getLogger(__name__)
+
+NO_LESSON_PROGRESS = {
+    "is_completed": False,
+    "started_at": None,
+    "completed_at": None,
+    "time_spent_seconds": 0,
+    "last_accessed_at": None,
+}
+
+
+class CourseTreeService:
+    """Serves course → curriculum → lesson trees with the caller's progress laid over them.
+
+    The tree itself is the same for every user, so it is loaded with one joined
+    query and kept in an in-process LRU keyed by the course's content_version;
+    any curriculum or lesson write bumps the version, so a stale tree is never
+    served. Per request only the user's enrollments, ratings and roster counts
+    are read, in a fixed number of queries however many courses are listed.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self._trees = VersionedLRU(max_size or settings.COURSE_TREE_CACHE_SIZE)
+
+    def build(self, db: Session, courses: List[CourseModel], user_id: int) -> List[CourseSchema]:
+        if not courses:
+            return []
+        course_ids = [course.id for course in courses]
+        trees = self._get_trees(db, courses)
+        enrollments = crud_enrollment.get_by_user_for_courses(db, user_id=user_id, course_ids=course_ids, profile="progress")
+        ratings = crud_rating.get_by_courses(db, course_ids)
+        student_counts = crud_course.get_student_counts(db, course_ids)
+
+        return [
+            self._overlay(
+                course,
+                trees[course.id],
+                enrollments.get(course.id),
+                ratings.get(course.id, []),
+                student_counts.get(course.id, 0),
+            )
+            for course in courses
+        ]
+
+    def _get_trees(self, db: Session, courses: List[CourseModel]) -> Dict[int, List[CurriculumSchema]]:
+        trees: Dict[int, List[CurriculumSchema]] = {}
+        missing: Dict[int, int] = {}
+        for course in courses:
+            cached = self._trees.get(course.id, course.content_version)
+            if cached is None:
+                missing[course.id] = course.content_version
+            else:
+                trees[course.id] = cached
+        if not missing:
+            return trees
+
+        loaded = self._load_trees(db, list(missing))
+        for course_id, version in missing.items():
+            trees[course_id] = loaded.get(course_id, [])
+            self._trees.put(course_id, version, trees[course_id])
+        return trees
+
+    def _load_trees(self, db: Session, course_ids: List[int]) -> Dict[int, List[CurriculumSchema]]:
+        trees: Dict[int, List[CurriculumSchema]] = {}
+        curriculums: Dict[int, CurriculumSchema] = {}
+        for curriculum, lesson in crud_course.get_content_trees(db, course_ids):
+            schema = curriculums.get(curriculum.id)
+            if schema is None:
+                schema = CurriculumSchema(
+                    id=curriculum.id,
+                    course_id=curriculum.course_id,
+                    title=curriculum.title,
+                    description=curriculum.description,
+                    order=curriculum.order,
+                    lessons=[],
+                )
+                curriculums[curriculum.id] = schema
+                trees.setdefault(curriculum.course_id, []).append(schema)
+            if lesson is not None:
+                schema.lessons.append(LessonSchema.model_validate(lesson))
+        return trees
+
+    def _overlay(self, course: CourseModel, curriculums: List[CurriculumSchema], enrollment, ratings, student_count: int) -> CourseSchema:
+        progress = {lp.lesson_id: lp for lp in enrollment.lesson_progress} if enrollment else {}
+        # Copies only: the cached curriculums and lessons are shared between users.
+        curriculums = [
+            curriculum.model_copy(update={"lessons": [
+                lesson.model_copy(update=self._lesson_progress(progress.get(lesson.id)))
+                for lesson in curriculum.lessons
+            ]})
+            for curriculum in curriculums
+        ]
+        return CourseSchema(
+            id=course.id,
+            school_id=course.school_id,
+            title=course.title,
+            description=course.description,
+            thumbnail=course.thumbnail,
+            level=course.level,
+            is_active=course.is_active,
+            total_lessons=course.total_lessons,
+            total_enrolled_students=student_count,
+            user_progress_percentage=enrollment.progress_percentage if enrollment else 0,
+            user_enrollment_status=enrollment.status if enrollment else EnrollmentStatusEnum.NOT_STARTED,
+            user_started_at=enrollment.started_at if enrollment else None,
+            user_completed_at=enrollment.completed_at if enrollment else None,
+            curriculums=curriculums,
+            ratings=[CourseRatingSchema.model_validate(rating) for rating in ratings],
+        )
+
+    @staticmethod
+    def _lesson_progress(lesson_progress) -> dict:
+        if lesson_progress is None:
+            return NO_LESSON_PROGRESS
+        return {
+            "is_completed": lesson_progress.is_completed,
+            "started_at": lesson_progress.started_at,
+            "completed_at": lesson_progress.completed_at,
+            "time_spent_seconds": lesson_progress.time_spent_seconds,
+            "last_accessed_at": lesson_progress.last_accessed_at,
+        }
+
+    def snapshot(self) -> dict:
+        return self._trees.snapshot()
+
+
+course_tree_service = CourseTreeService()
@@ -13,7 +13,7 @@ from app.utils.permission import PermissionHelper
 
 class CurriculumService:
     def create_curriculum(self, db: Session, curriculum_in: CurriculumCreate, current_user_context: UserContext) -> Curriculum:
-        course = crud_course.get(db, id=curriculum_in.course_id)
+        course = crud_course.get(db, id=curriculum_in.course_id, profile="minimal")
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
 
@@ -36,7 +36,7 @@ class CurriculumService:
         return curriculum
 
     def get_curriculums_by_course(self, db: Session, course_id: int, current_user_context: UserContext) -> List[Curriculum]:
-        course = crud_course.get(db, id=course_id)
+        course = crud_course.get(db, id=course_id, profile="minimal")
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
 
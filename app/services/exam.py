@@ -11,7 +11,7 @@ from app.schemas.exam import ExamCreate, ExamUpdate, Exam
 from app.schemas.question import QuestionCreate, QuestionUpdate, Question
 from app.schemas.user import UserContext
 from app.utils.permission import PermissionHelper as permission_helper
-from app.schemas.question import Question as QuestionSchema
+from app.services.exam_content import exam_content_service
 from app.core.constants import CourseLevelEnum, StudentExamStatusEnum, QuestionTypeEnum
 
 
@@ -38,7 +38,7 @@ class ExamService:
         target_curriculum_id = exam.curriculum_id if exam else curriculum_id
 
         if target_course_id:
-            course = crud_course.get(db, id=target_course_id)
+            course = crud_course.get(db, id=target_course_id, profile="minimal")
             if not course:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
             return course
@@ -94,11 +94,11 @@ class ExamService:
             return None, None
 
         if permission_helper.is_school_admin(current_user_context) and current_user_context.school:
-            courses = crud_course.get_courses_by_school(db, school_id=current_user_context.school.id)
+            courses = crud_course.get_courses_by_school(db, school_id=current_user_context.school.id, profile="minimal")
         elif permission_helper.is_teacher(current_user_context):
-            courses = crud_course.get_teacher_courses(db, user_id=current_user_context.user.id)
+            courses = crud_course.get_teacher_courses(db, user_id=current_user_context.user.id, profile="minimal")
         elif permission_helper.is_student(current_user_context):
-            courses = crud_course.get_student_courses(db, user_id=current_user_context.user.id)
+            courses = crud_course.get_student_courses(db, user_id=current_user_context.user.id, profile="minimal")
         else:
             return [], []
 
@@ -283,25 +283,14 @@ class ExamService:
 
     def get_exam_questions(self, db: Session, exam_id: int, current_user_context: UserContext,
                           include_correct_answers: bool = False) -> List[Question]:
-        exam = crud_exam.get(db, id=exam_id)
+        exam = crud_exam.get_minimal(db, id=exam_id)
         if not exam:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found.")
         self._require_exam_view_permission(db, current_user_context, exam)
-        questions = crud_question.get_by_exam(db, exam_id=exam_id)
-        base = []
-        for question in questions:
-            base.append({
-                "id": question.id,
-                "question_text": question.question_text,
-                "options": question.options,
-                "correct_answer": None if (not include_correct_answers and permission_helper.is_student(current_user_context)) else question.correct_answer,
-                "exam_id": question.exam_id,
-                "question_type": question.question_type,
-                "points": question.points,
-                "created_at": question.created_at,
-                "updated_at": question.updated_at
-            })
-        return [QuestionSchema.model_validate(q) for q in base]
+        questions = exam_content_service.get_questions(db, exam)
+        if not include_correct_answers and permission_helper.is_student(current_user_context):
+            return [question.model_copy(update={"correct_answer": None}) for question in questions]
+        return list(questions)
 
 
 exam_service = ExamService()
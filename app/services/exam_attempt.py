@@ -1,9 +1,10 @@
+import logging
 from typing import Tuple, List
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from datetime import datetime
 
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, run_in_db_thread
 from app.crud.exam import exam as crud_exam
 from app.crud.question import question as crud_question
 from app.crud.exam_attempt import exam_attempt as crud_exam_attempt
@@ -11,9 +12,9 @@ from app.crud.user_answer import user_answer as crud_user_answer
 from app.crud.course import course as crud_course
 from app.crud.curriculum import curriculum as crud_curriculum
 from app.schemas.exam import Exam
-from app.schemas.exam_attempt import ExamAttemptCreate, ExamAttemptDetails, ExamAttemptUpdate, ExamAttempt
+from app.schemas.exam_attempt import ExamAttemptDetails, ExamAttempt
 from app.schemas.question import QuestionWithUserAnswer
-from app.schemas.user_answer import UserAnswerCreate, UserAnswerUpdate, UserAnswer
+from app.schemas.user_answer import AnswerAutosave, AnswerAutosaveResult, UserAnswerCreate, UserAnswer
 from app.schemas.user import UserContext
 from app.core.constants import EnrollmentStatusEnum, ExamAttemptStatusEnum
 from app.utils.permission import PermissionHelper as permission_helper
@@ -21,15 +22,20 @@ from app.utils.events import event_bus
 from app.crud.course_enrollment import course_enrollment as enrollment_crud
 from app.services.reward_rating import reward_rating_service
 from app.services.course_progress import course_progress_service
+from app.services.exam_content import exam_content_service
+from app.services.exam_eligibility import exam_eligibility_service
+from app.services.exam_grading import exam_grader
+from app.services.leaderboard import leaderboard_service
 from app.core.cache import cache
 
+logger = logging.getLogger(__name__)
 
 
 class ExamAttemptService:
 
     def _get_course_from_exam(self, db: Session, exam: Exam):
         if exam.course_id:
-            course = crud_course.get(db, id=exam.course_id)
+            course = crud_course.get(db, id=exam.course_id, profile="minimal")
             if not course:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
             return course
@@ -47,19 +53,11 @@ class ExamAttemptService:
                 detail="Only students can start exam attempts."
             )
 
-        course = self._get_course_from_exam(db, exam)
-        if not course:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Exam is not associated with a course or curriculum."
-            )
-
-        permission_helper.require_course_view_permission(current_user_context, course)
-
-        if not permission_helper.is_student_of_course(current_user_context.user.id, course):
+        school_id, is_enrolled = exam_eligibility_service.is_eligible(db, exam, current_user_context.user.id)
+        if not permission_helper.belongs_to_school(current_user_context, school_id) or not is_enrolled:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="You must be a student of this course to take this exam."
+                detail="You do not have permission to view this course."
             )
 
     def _require_attempt_ownership_and_in_progress(self, current_user_context: UserContext, attempt: ExamAttempt):
@@ -85,9 +83,7 @@ class ExamAttemptService:
                 detail="You can only view your own exam attempts."
             )
 
-        exam = crud_exam.get(db, id=attempt.exam_id)
-        if not exam:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found for this attempt.")
+        exam = self._get_attempt_exam(attempt)
 
         course = self._get_course_from_exam(db, exam)
         if not course:
@@ -100,6 +96,21 @@ class ExamAttemptService:
 
         permission_helper.require_course_view_permission(current_user_context, course)
 
+    def _get_attempt_exam(self, attempt: ExamAttempt):
+        # Eager-loaded with the attempt; only the live exam counts.
+        exam = attempt.exam
+        if not exam or exam.deleted_at is not None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found for this attempt.")
+        return exam
+
+    def _build_attempt_details(self, exam, attempt: ExamAttempt, questions) -> ExamAttemptDetails:
+        user_answers_map = {ans.question_id: ans for ans in attempt.user_answers}
+        questions_with_answers = [
+            QuestionWithUserAnswer(user_answer=user_answers_map.get(question.id), **question.model_dump())
+            for question in questions
+        ]
+        return ExamAttemptDetails(exam=exam, questions=questions_with_answers)
+
     def _validate_question_belongs_to_exam(self, question, attempt):
         if question.exam_id != attempt.exam_id:
             raise HTTPException(
@@ -107,69 +118,61 @@ class ExamAttemptService:
                 detail="Question does not belong to this exam attempt."
             )
 
-    def _calculate_score(self, db: Session, attempt: ExamAttempt, exam: Exam) -> Tuple[float, bool]:
-        total_score = 0.0
-        total_possible_points = 0
-
-        questions = crud_question.get_by_exam(db, exam_id=exam.id)
-        user_answers = crud_user_answer.get_all_by_attempt(db, exam_attempt_id=attempt.id)
-        user_answers_map = {ans.question_id: ans for ans in user_answers}
-
-        for question in questions:
-            total_possible_points += question.points
-            user_answer = user_answers_map.get(question.id)
-
-            if user_answer:
-                try:
-                    user_answer_int = int(user_answer.answer_text)
-                    correct_answer_int = int(question.correct_answer)
-                    is_correct = user_answer_int == correct_answer_int
-                except (ValueError, TypeError):
-                    is_correct = False
-                    correct_answer_int = None
-
-                score = question.points if is_correct else 0.0
-                total_score += score
-
-                update_data = UserAnswerUpdate(
-                    is_correct=is_correct,
-                    score=score)
-
-                crud_user_answer.update(db, db_obj=user_answer, obj_in=update_data)
-
-        final_score_percentage = (total_score / total_possible_points * 100) if total_possible_points > 0 else 0.0
-        passed = exam.pass_percentage is not None and final_score_percentage >= exam.pass_percentage
-
-        return total_score, passed
-
     def start_exam_attempt(self, db: Session, exam_id: int, current_user_context: UserContext) -> ExamAttempt:
-        exam = crud_exam.get(db, id=exam_id)
+        exam = crud_exam.get_minimal(db, id=exam_id)
         if not exam:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found.")
 
         self._require_student_enrollment_in_exam(db, current_user_context, exam)
 
-        existing_attempts = crud_exam_attempt.get_by_user_and_exam(
-            db,
-            user_id=current_user_context.user.id,
-            exam_id=exam_id
-        )
+        latest = crud_exam_attempt.get_start_state(db, user_id=current_user_context.user.id, exam_id=exam_id)
+        if latest and latest.status == ExamAttemptStatusEnum.IN_PROGRESS:
+            # Already open, e.g. pre-created by open_exam_for_class: resume it.
+            return crud_exam_attempt.get_minimal(db, id=latest.id)
 
-        if not exam.allow_multiple_attempts and existing_attempts:
+        if not exam.allow_multiple_attempts and latest:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="You have already attempted this exam and multiple attempts are not allowed."
             )
 
-        attempt_in = ExamAttemptCreate(
+        attempt_id = crud_exam_attempt.start_for_user(
+            db,
             user_id=current_user_context.user.id,
             exam_id=exam_id,
             start_time=datetime.now()
         )
-        new_attempt = crud_exam_attempt.create(db, obj_in=attempt_in)
-        db.flush()
+        if attempt_id is None:
+            # A concurrent start for the same user opened one first: resume it.
+            attempt_id = crud_exam_attempt.get_start_state(db, user_id=current_user_context.user.id, exam_id=exam_id).id
+
+        return crud_exam_attempt.get_minimal(db, id=attempt_id)
+
+    def open_exam_for_class(self, db: Session, exam_id: int, current_user_context: UserContext) -> dict:
+        """Start attempts for every student of the exam's course who can still take it, in one insert."""
+        exam = crud_exam.get_minimal(db, id=exam_id)
+        if not exam:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found.")
+
+        course = self._get_course_from_exam(db, exam)
+        if not course:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Exam is not associated with a course or curriculum."
+            )
+        permission_helper.require_not_student(current_user_context, "Students cannot open exams for a class.")
+        permission_helper.require_course_view_permission(current_user_context, course)
+        if permission_helper.is_teacher(current_user_context) and not permission_helper.is_teacher_of_course(current_user_context.user.id, course):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You must be a teacher of this course to open this exam."
+            )
 
-        return new_attempt
+        _, _, students = exam_eligibility_service.get_roster(db, exam, refresh=True)
+        skip = crud_exam_attempt.get_user_ids_with_attempts(db, exam_id=exam_id, in_progress_only=exam.allow_multiple_attempts)
+        to_start = sorted(students - skip)
+        created = crud_exam_attempt.create_many_for_users(db, exam_id=exam_id, user_ids=to_start, start_time=datetime.now())
+        return {"exam_id": exam_id, "students": len(students), "attempts_created": created}
 
     def submit_answer(self, db: Session, attempt_id: int, question_id: int,
                      answer_text: str, current_user_context: UserContext) -> UserAnswer:
@@ -185,24 +188,12 @@ class ExamAttemptService:
 
         self._validate_question_belongs_to_exam(question, attempt)
 
-        existing_answer = crud_user_answer.get_by_attempt_and_question(
+        [updated_answer] = crud_user_answer.upsert_many(
             db,
             exam_attempt_id=attempt_id,
-            question_id=question_id
+            user_id=current_user_context.user.id,
+            answers={question_id: answer_text}
         )
-
-        if existing_answer:
-            answer_in = UserAnswerUpdate(answer_text=answer_text)
-            updated_answer = crud_user_answer.update(db, db_obj=existing_answer, obj_in=answer_in)
-        else:
-            answer_in = UserAnswerCreate(
-                user_id=current_user_context.user.id,
-                exam_attempt_id=attempt_id,
-                question_id=question_id,
-                answer_text=answer_text
-            )
-            updated_answer = crud_user_answer.create(db, obj_in=answer_in)
-
         return updated_answer
 
     def submit_bulk_answers(self, db: Session, attempt_id: int, answers_in: List[UserAnswerCreate], current_user_context: UserContext) -> List[UserAnswer]:
@@ -213,111 +204,100 @@ class ExamAttemptService:
         if len(question_ids) != len(set(question_ids)):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Duplicate question_ids found in submission.")
 
-        attempt = crud_exam_attempt.get(db, id=attempt_id)
+        attempt = self._get_answerable_attempt(db, attempt_id, current_user_context, question_ids)
+        stored = crud_user_answer.upsert_many(
+            db,
+            exam_attempt_id=attempt.id,
+            user_id=current_user_context.user.id,
+            answers={ans.question_id: ans.answer_text for ans in answers_in}
+        )
+        stored_by_question = {answer.question_id: answer for answer in stored}
+        return [stored_by_question[question_id] for question_id in question_ids]
+
+    def autosave_answers(self, db: Session, attempt_id: int, autosave_in: AnswerAutosave, current_user_context: UserContext) -> AnswerAutosaveResult:
+        drafts = {draft.question_id: draft.answer_text for draft in autosave_in.answers}
+        attempt = self._get_answerable_attempt(db, attempt_id, current_user_context, drafts)
+        crud_user_answer.upsert_many(
+            db,
+            exam_attempt_id=attempt.id,
+            user_id=current_user_context.user.id,
+            answers=drafts,
+            returning=False
+        )
+        return AnswerAutosaveResult(saved=len(drafts), saved_at=datetime.now())
+
+    def _get_answerable_attempt(self, db: Session, attempt_id: int, current_user_context: UserContext, question_ids):
+        attempt = crud_exam_attempt.get_minimal(db, id=attempt_id)
         if not attempt:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam attempt not found.")
 
         self._require_attempt_ownership_and_in_progress(current_user_context, attempt)
 
-        exam_questions = {q.id for q in crud_question.get_by_exam(db, exam_id=attempt.exam_id)}
-        invalid_questions = [ans.question_id for ans in answers_in if ans.question_id not in exam_questions]
+        exam_questions = crud_question.get_ids_in_exam(db, exam_id=attempt.exam_id, question_ids=question_ids)
+        invalid_questions = [question_id for question_id in question_ids if question_id not in exam_questions]
 
         if invalid_questions:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid question_id(s): {invalid_questions}. All questions must belong to the exam."
             )
-
-        existing_answers = {ans.question_id: ans for ans in crud_user_answer.get_all_by_attempt(db, exam_attempt_id=attempt_id)}
-        processed_answers = []
-
-        for answer_in in answers_in:
-            if answer_in.question_id in existing_answers:
-                existing_answer = existing_answers[answer_in.question_id]
-                update_data = UserAnswerUpdate(answer_text=answer_in.answer_text)
-                updated_answer = crud_user_answer.update(db, db_obj=existing_answer, obj_in=update_data)
-                processed_answers.append(updated_answer)
-            else:
-                create_data = UserAnswerCreate(
-                    user_id=current_user_context.user.id,
-                    exam_attempt_id=attempt_id,
-                    question_id=answer_in.question_id,
-                    answer_text=answer_in.answer_text
-                )
-                new_answer = crud_user_answer.create(db, obj_in=create_data)
-                processed_answers.append(new_answer)
-
-        return processed_answers
+        return attempt
 
     async def submit_exam(self, db: Session, attempt_id: int, current_user_context: UserContext) -> ExamAttemptDetails:
-        attempt = crud_exam_attempt.get(db, id=attempt_id)
-        if not attempt:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam attempt not found.")
-
-        self._require_attempt_ownership_and_in_progress(current_user_context, attempt)
-
-        exam = crud_exam.get(db, id=attempt.exam_id)
-        if not exam:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found for this attempt.")
-
-        score, passed = self._calculate_score(db, attempt, exam)
-
-        attempt_update = ExamAttemptUpdate(
-            end_time=datetime.now(),
-            score=score,
-            passed=passed,
-            status=ExamAttemptStatusEnum.COMPLETED
-        )
-        updated_attempt = crud_exam_attempt.update(db, db_obj=attempt, obj_in=attempt_update)
-
-        questions = crud_question.get_by_exam(db, exam_id=exam.id)
-        user_answers = crud_user_answer.get_all_by_attempt(db, exam_attempt_id=updated_attempt.id)
-        user_answers_map = {ans.question_id: ans for ans in user_answers}
-
-        questions_with_answers = []
-        for question in questions:
-            user_answer = user_answers_map.get(question.id)
-            questions_with_answers.append(QuestionWithUserAnswer(user_answer=user_answer, **question.__dict__))
-
-        result = ExamAttemptDetails(exam=exam, questions=questions_with_answers)
+        result, passed, school_id = await run_in_db_thread(self._grade_and_complete_attempt, db, attempt_id, current_user_context)
+        exam = result.exam
 
         if passed and exam.course_id:
             await event_bus.publish("course_completed", {
                 "student_id": current_user_context.user.id,
                 "course_id": exam.course_id,
-                "school_id": exam.course.school_id if exam.course else None
+                "school_id": school_id
             })
 
             try:
-                enrollment = enrollment_crud.get_by_user_and_course(db, user_id=current_user_context.user.id, course_id=exam.course_id)
-                if enrollment and enrollment.status == EnrollmentStatusEnum.COMPLETED:
-                    course_progress_service._update_course_progress(db, enrollment)
+                await run_in_db_thread(self._award_completion_if_eligible, db, current_user_context.user.id, exam.course_id)
             except Exception as e:
-                print(f"Warning: Failed to check rewards for course {exam.course_id}, user {current_user_context.user.id}: {e}")
-            
-            return result
+                logger.warning(f"Failed to check rewards for course {exam.course_id}, user {current_user_context.user.id}: {e}")
 
-    def get_exam_attempt(self, db: Session, attempt_id: int, current_user_context: UserContext) -> ExamAttemptDetails:
+        return result
+
+    def _grade_and_complete_attempt(self, db: Session, attempt_id: int, current_user_context: UserContext) -> Tuple[ExamAttemptDetails, bool, int | None]:
         attempt = crud_exam_attempt.get(db, id=attempt_id)
         if not attempt:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam attempt not found.")
 
-        self._require_attempt_view_permission(db, current_user_context, attempt)
+        self._require_attempt_ownership_and_in_progress(current_user_context, attempt)
 
-        exam = crud_exam.get(db, id=attempt.exam_id)
-        if not exam:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found for this attempt.")
+        exam = self._get_attempt_exam(attempt)
+        questions = exam_content_service.get_questions(db, exam)
+        score, passed = exam_grader.grade(db, exam, attempt, questions)
 
-        questions = crud_question.get_by_exam(db, exam_id=exam.id)
-        user_answers = crud_user_answer.get_all_by_attempt(db, exam_attempt_id=attempt.id)
-        user_answers_map = {ans.question_id: ans for ans in user_answers}
+        attempt.end_time = datetime.now()
+        attempt.score = score
+        attempt.passed = passed
+        attempt.status = ExamAttemptStatusEnum.COMPLETED
+        db.flush()
+        leaderboard_service.record(db, attempt.user_id, exam_score=score)
 
-        questions_with_answers = []
-        for question in questions:
-            user_answer = user_answers_map.get(question.id)
-            questions_with_answers.append(QuestionWithUserAnswer(user_answer=user_answer, **question.__dict__))
+        result = self._build_attempt_details(exam, attempt, questions)
+        school_id = exam.course.school_id if exam.course_id and exam.course else None
+        return result, passed, school_id
 
-        return ExamAttemptDetails(exam=exam, questions=questions_with_answers)
+    def _award_completion_if_eligible(self, db: Session, user_id: int, course_id: int):
+        enrollment = enrollment_crud.get_by_user_and_course(db, user_id=user_id, course_id=course_id, profile="progress")
+        if enrollment and enrollment.status == EnrollmentStatusEnum.COMPLETED:
+            course_progress_service._update_course_progress(db, enrollment)
+
+    def get_exam_attempt(self, db: Session, attempt_id: int, current_user_context: UserContext) -> ExamAttemptDetails:
+        attempt = crud_exam_attempt.get(db, id=attempt_id)
+        if not attempt:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam attempt not found.")
+
+        self._require_attempt_view_permission(db, current_user_context, attempt)
+
+        exam = self._get_attempt_exam(attempt)
+        questions = exam_content_service.get_questions(db, exam)
+        return self._build_attempt_details(exam, attempt, questions)
 
     def get_user_exam_attempts(self, db: Session, user_id: int, current_user_context: UserContext) -> List[ExamAttempt]:
         if user_id != current_user_context.user.id:
@@ -332,7 +312,7 @@ class ExamAttemptService:
         if not permission_helper.is_super_admin(current_user_context) and user_id != current_user_context.user.id:
             filtered_attempts = []
             for attempt in attempts:
-                exam = crud_exam.get(db, id=attempt.exam_id)
+                exam = crud_exam.get_minimal(db, id=attempt.exam_id)
                 if exam:
                     course = self._get_course_from_exam(db, exam)
                     if course and permission_helper.can_view_course(current_user_context, course):
@@ -343,7 +323,7 @@ class ExamAttemptService:
 
     def get_exam_attempts_by_exam(self, db: Session, exam_id: int,
                                  current_user_context: UserContext) -> List[ExamAttempt]:
-        exam = crud_exam.get(db, id=exam_id)
+        exam = crud_exam.get_minimal(db, id=exam_id)
         if not exam:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found.")
 
@@ -386,6 +366,7 @@ class ExamAttemptService:
                 await reward_rating_service.award_completion_reward(
                     db, enrollment_id=enrollment.id, current_user_context=mock_admin_context
                 )
+                db.commit()
             except Exception:
                 pass
 
@@ -0,0 +1,42 @@
+import logging
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import VersionedLRU
+from app.core.config import settings
+from app.crud.question import question as crud_question
+from app.models.exam import Exam as ExamModel
+from app.schemas.question import Question as QuestionSchema
+
+logger = logging.getLogger(__name__)
+
+
+class ExamContentService:
+    """Per-exam question-set snapshots shared by rendering and grading.
+
+    Snapshots are tuples of question schemas, including correct answers, held
+    in an in-process LRU under the exam's content_version, which every
+    question write bumps. Callers already hold the exam row, so a warm exam
+    costs no query against the questions table. Snapshots are shared between
+    requests: copy a question before changing it.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self._question_sets = VersionedLRU(max_size or settings.EXAM_CONTENT_CACHE_SIZE)
+
+    def get_questions(self, db: Session, exam: ExamModel) -> Tuple[QuestionSchema, ...]:
+        questions = self._question_sets.get(exam.id, exam.content_version)
+        if questions is None:
+            questions = tuple(
+                QuestionSchema.model_validate(question)
+                for question in sorted(crud_question.get_by_exam(db, exam_id=exam.id), key=lambda q: q.id)
+            )
+            self._question_sets.put(exam.id, exam.content_version, questions)
+        return questions
+
+    def snapshot(self) -> dict:
+        return self._question_sets.snapshot()
+
+
+exam_content_service = ExamContentService()
@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.course import course as crud_course
+from app.crud.exam import exam as crud_exam
+from app.models.exam import Exam as ExamModel
+
+logger = logging.getLogger(__name__)
+
+# Roster loads are serialised per exam through a fixed set of locks, so the
+# lock table stays the same size however many exams are started.
+LOAD_LOCK_STRIPES = 64
+
+
+class ExamEligibilityService:
+    """Short-lived per-exam roster snapshots for the attempt-start surge.
+
+    When a class starts an exam together, the first request loads the exam's
+    course, school and student ids; the rest check membership in memory. A
+    user missing from the snapshot gets the authoritative EXISTS check, and a
+    hit reloads the snapshot, so new enrollments work right away. Removals
+    clear the snapshot on the worker that handled them; on other workers the
+    snapshot expires after EXAM_ELIGIBILITY_TTL_SECONDS.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self._ttl = ttl_seconds if ttl_seconds is not None else settings.EXAM_ELIGIBILITY_TTL_SECONDS
+        # exam_id -> (expires_at, course_id, school_id, student ids)
+        self._rosters: Dict[int, Tuple[float, int, int, FrozenSet[int]]] = {}
+        self._lock = threading.Lock()
+        self._load_locks = tuple(threading.Lock() for _ in range(LOAD_LOCK_STRIPES))
+
+    def get_roster(self, db: Session, exam: ExamModel, refresh: bool = False) -> Tuple[int, int, FrozenSet[int]]:
+        """(course_id, school_id, student ids) for the exam's course."""
+        roster = None if refresh else self._cached(exam.id)
+        if roster is not None:
+            return roster
+
+        # One loader per exam; concurrent starters wait for it instead of all querying.
+        with self._load_locks[exam.id % LOAD_LOCK_STRIPES]:
+            roster = None if refresh else self._cached(exam.id)
+            if roster is None:
+                roster = self._load(db, exam)
+                with self._lock:
+                    self._rosters[exam.id] = (time.monotonic() + self._ttl, *roster)
+        return roster
+
+    def is_eligible(self, db: Session, exam: ExamModel, user_id: int) -> Tuple[int, bool]:
+        """(school_id of the exam's course, whether the user is one of its students)."""
+        course_id, school_id, students = self.get_roster(db, exam)
+        if user_id in students:
+            return school_id, True
+        if crud_course.has_student(db, course_id=course_id, user_id=user_id):
+            self.get_roster(db, exam, refresh=True)
+            return school_id, True
+        return school_id, False
+
+    def invalidate_course(self, course_id: int) -> None:
+        with self._lock:
+            for exam_id in [exam_id for exam_id, entry in self._rosters.items() if entry[1] == course_id]:
+                del self._rosters[exam_id]
+
+    def _cached(self, exam_id: int) -> Optional[Tuple[int, int, FrozenSet[int]]]:
+        with self._lock:
+            entry = self._rosters.get(exam_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1:]
+
+    def _load(self, db: Session, exam: ExamModel) -> Tuple[int, int, FrozenSet[int]]:
+        course_id = crud_exam.get_course_id(db, exam)
+        if course_id is None:
+            if exam.curriculum_id:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Curriculum not found.")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Exam is not associated with a course or curriculum."
+            )
+        course = crud_course.get_school_and_student_ids(db, course_id)
+        if course is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
+        school_id, students = course
+        return course_id, school_id, students
+
+
+exam_eligibility_service = ExamEligibilityService()
@@ -0,0 +1,72 @@
+import logging
+from datetime import datetime
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.crud.user_answer import user_answer as crud_user_answer
+from app.models.exam import Exam
+from app.models.exam_attempt import ExamAttempt
+from app.schemas.question import Question as QuestionSchema
+
+logger = logging.getLogger(__name__)
+
+
+class ExamGrader:
+    """Grades a whole attempt in one pass and persists it with one UPDATE.
+
+    Works on the exam's cached question set and the answers already loaded
+    with the attempt, so grading adds no reads. Exams with at least
+    EXAM_GRADING_VECTORIZE_MIN_QUESTIONS questions are scored with numpy; both
+    paths give identical results. Graded values are written back onto the
+    loaded answers, so callers can serialize them without re-querying.
+    """
+
+    def grade(self, db: Session, exam: Exam, attempt: ExamAttempt, questions: Sequence[QuestionSchema]) -> Tuple[float, bool]:
+        answers = {answer.question_id: answer for answer in attempt.user_answers}
+
+        points = [q.points for q in questions]
+        correct = [q.correct_answer for q in questions]
+        chosen = [answers[q.id].answer_text if q.id in answers else None for q in questions]
+
+        if len(questions) >= settings.EXAM_GRADING_VECTORIZE_MIN_QUESTIONS:
+            is_correct, scores = self._score_vectorized(points, correct, chosen)
+        else:
+            is_correct, scores = self._score(points, correct, chosen)
+
+        graded_at = datetime.now()
+        grades = []
+        for question, question_correct, score in zip(questions, is_correct, scores):
+            answer = answers.get(question.id)
+            if answer is None:
+                continue
+            grades.append({"answer_id": answer.id, "is_correct": question_correct, "score": score, "graded_at": graded_at})
+            set_committed_value(answer, "is_correct", question_correct)
+            set_committed_value(answer, "score", score)
+            set_committed_value(answer, "updated_at", graded_at)
+        crud_user_answer.bulk_grade(db, grades)
+
+        total_score = float(sum(scores))
+        total_possible_points = sum(points)
+        final_score_percentage = (total_score / total_possible_points * 100) if total_possible_points > 0 else 0.0
+        passed = exam.pass_percentage is not None and final_score_percentage >= exam.pass_percentage
+        return total_score, passed
+
+    @staticmethod
+    def _score(points: Sequence[int], correct: Sequence, chosen: Sequence) -> Tuple[List[bool], List[float]]:
+        is_correct = [c is not None and a is not None and a == c for c, a in zip(correct, chosen)]
+        scores = [float(p) if ok else 0.0 for p, ok in zip(points, is_correct)]
+        return is_correct, scores
+
+    @staticmethod
+    def _score_vectorized(points: Sequence[int], correct: Sequence, chosen: Sequence) -> Tuple[List[bool], List[float]]:
+        # None becomes NaN, which never compares equal, so unanswered or keyless questions score zero.
+        is_correct = np.asarray(correct, dtype=float) == np.asarray(chosen, dtype=float)
+        scores = np.where(is_correct, np.asarray(points, dtype=float), 0.0)
+        return is_correct.tolist(), scores.tolist()
+
+
+exam_grader = ExamGrader()
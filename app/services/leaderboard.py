@@ -0,0 +1,70 @@
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DateTime, Select, literal, select
+from sqlalchemy.orm import Session
+
+from app.crud.report import leaderboard_snapshot as crud_leaderboard
+from app.crud.user import user as crud_user
+from app.services.leaderboard_rank import leaderboard_rank_service
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderboardService:
+    """Keeps the school leaderboards current with per-event score deltas.
+
+    Each student has one score row per school they study at. Lesson
+    completions, graded exams and rewards call ``record`` in the transaction
+    that writes them, which adds the delta to those rows with one UPDATE. When
+    that UPDATE finds a school the student studies at without a row (their
+    first event, or a school they joined since), the missing rows are seeded
+    with one INSERT ... SELECT of the student's totals, which already include
+    the event.
+    ``reconcile_school`` rewrites a school's rows from the same aggregate, to
+    repair drift or backfill.
+    """
+
+    def record(self, db: Session, student_id: int, *, lessons_completed: int = 0,
+               exam_score: float = 0.0, rewards: int = 0) -> None:
+        if not (lessons_completed or exam_score or rewards):
+            return
+        deltas = {
+            "lessons_completed": lessons_completed,
+            "accumulated_exam_score": exam_score,
+            "total_rewards": rewards,
+        }
+        changed, unseeded = crud_leaderboard.increment_for_student(db, student_id, **deltas)
+        if unseeded or not changed:
+            db.flush()
+            changed += self._seed_student(db, student_id)
+            # Another transaction may have seeded some rows first, from data
+            # that could not see this event yet, so the delta still has to be
+            # applied to those.
+            late, _ = crud_leaderboard.increment_for_student(
+                db, student_id, **deltas, except_schools=sorted({school_id for school_id, _, _ in changed}),
+            )
+            changed += late
+        leaderboard_rank_service.stage(db, changed)
+
+    def reconcile_school(self, db: Session, school_id: int) -> int:
+        """Overwrite the school's rows with freshly aggregated scores. Does not commit."""
+        rows = self._rows(db, school_id=school_id)
+        written = crud_leaderboard.upsert_from(db, rows, overwrite=True)
+        removed = crud_leaderboard.delete_for_school_except(db, school_id, select(rows.subquery().c.student_id))
+        leaderboard_rank_service.stage(db, written)
+        leaderboard_rank_service.stage_removed(db, school_id, removed)
+        logger.info("Reconciled leaderboard for school %s: %s rows written, %s removed", school_id, len(written), len(removed))
+        return len(written)
+
+    def _seed_student(self, db: Session, student_id: int) -> List[Tuple[int, int, int]]:
+        return crud_leaderboard.upsert_from(db, self._rows(db, student_id=student_id), overwrite=False)
+
+    @staticmethod
+    def _rows(db: Session, *, school_id: Optional[int] = None, student_id: Optional[int] = None) -> Select:
+        query = crud_user.get_leaderboard_query(db, school_id=school_id, student_id=student_id)
+        return query.add_columns(literal(datetime.utcnow(), DateTime).label("timestamp")).statement
+
+
+leaderboard_service = LeaderboardService()
@@ -0,0 +1,120 @@
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.rank_index import MemoryRankIndex, RankIndexBackend, create_rank_index_backend
+from app.crud.report import leaderboard_snapshot as crud_leaderboard
+from app.models.report import LeaderboardSnapshot
+
+logger = logging.getLogger(__name__)
+
+_STAGED = "leaderboard_rank_staged"
+
+RankedRow = Tuple[int, LeaderboardSnapshot]
+
+
+class LeaderboardRankService:
+    """Rank index over the school leaderboards, one sorted set per school.
+
+    leaderboard_snapshots stays the source of truth: a school's set is loaded
+    from its rows on first use and after expiry. Score changes written by
+    ``leaderboard_service`` are staged on the session and applied once it
+    commits, so a rolled back event never reaches the index. Top-N pages,
+    windows around a student and a student's rank are then O(log n) lookups,
+    and only the rows on the page are read from the database.
+    """
+
+    def __init__(self, backend: Optional[RankIndexBackend] = None):
+        self._index = backend or create_rank_index_backend("leaderboard")
+
+    def stage(self, db: Session, rows: Iterable[Tuple[int, int, int]]) -> None:
+        """Queue (school_id, student_id, total_rewards) rows for the index until ``db`` commits."""
+        scores = self._staged(db)["scores"]
+        for school_id, student_id, total_rewards in rows:
+            scores.setdefault(school_id, {})[student_id] = total_rewards or 0
+
+    def stage_removed(self, db: Session, school_id: int, student_ids: Iterable[int]) -> None:
+        """Queue students leaving the school's board until ``db`` commits."""
+        student_ids = set(student_ids)
+        if student_ids:
+            self._staged(db)["removed"].setdefault(school_id, set()).update(student_ids)
+
+    def stage_reload(self, db: Session, school_id: int) -> None:
+        """Reload the school's set from the database once ``db`` commits."""
+        self._staged(db)["reload"].add(school_id)
+
+    def apply(self, changes: dict) -> None:
+        for school_id, scores in changes["scores"].items():
+            if school_id not in changes["reload"]:
+                self._index.set_scores(school_id, scores)
+        for school_id, student_ids in changes["removed"].items():
+            if school_id not in changes["reload"]:
+                self._index.remove(school_id, student_ids)
+        for school_id in changes["reload"]:
+            self._index.drop(school_id)
+
+    def rebuild(self, db: Session, school_id: int) -> int:
+        scores = crud_leaderboard.get_scores_for_school(db, school_id)
+        self._index.replace(school_id, scores)
+        return len(scores)
+
+    def get_page(self, db: Session, school_id: int, skip: int, limit: int) -> Tuple[List[RankedRow], int]:
+        """((rank, row) for the page, number of ranked students)."""
+        self._ensure_loaded(db, school_id)
+        ranked = self._hydrate(db, school_id, self._index.page(school_id, skip, skip + limit))
+        return ranked, self._index.size(school_id)
+
+    def get_position(self, db: Session, school_id: int, student_id: int, window: int) -> Tuple[Optional[int], List[RankedRow], int]:
+        """(student's rank, (rank, row) for up to ``window`` neighbours either side, number of ranked students)."""
+        self._ensure_loaded(db, school_id)
+        total = self._index.size(school_id)
+        position = self._index.position(school_id, student_id)
+        score = self._index.score(school_id, student_id)
+        # Either can go missing if the board changes between the two reads.
+        if position is None or score is None:
+            return None, [], total
+        ranked = self._hydrate(db, school_id, self._index.page(school_id, max(0, position - window), position + window + 1))
+        return self._index.rank_of_score(school_id, score), ranked, total
+
+    def rank_of_score(self, db: Session, school_id: int, score: int) -> int:
+        self._ensure_loaded(db, school_id)
+        return self._index.rank_of_score(school_id, score)
+
+    def snapshot(self) -> dict:
+        if isinstance(self._index, MemoryRankIndex):
+            return {"backend": "memory", **self._index.snapshot()}
+        return {"backend": "redis"}
+
+    def _ensure_loaded(self, db: Session, school_id: int) -> None:
+        if not self._index.is_loaded(school_id):
+            self.rebuild(db, school_id)
+
+    def _hydrate(self, db: Session, school_id: int, ranking: List[Tuple[int, int]]) -> List[RankedRow]:
+        rows = crud_leaderboard.get_for_students(db, school_id, [student_id for student_id, _ in ranking])
+        return [
+            (self._index.rank_of_score(school_id, score), rows[student_id])
+            for student_id, score in ranking
+            if student_id in rows
+        ]
+
+    def _staged(self, db: Session) -> dict:
+        return db.info.setdefault(_STAGED, {}).setdefault(self, {"scores": {}, "removed": {}, "reload": set()})
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_staged_ranks(session: Session) -> None:
+    for service, changes in session.info.pop(_STAGED, {}).items():
+        try:
+            service.apply(changes)
+        except Exception as e:
+            logger.error(f"Applying leaderboard rank changes failed: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_staged_ranks(session: Session) -> None:
+    session.info.pop(_STAGED, None)
+
+
+leaderboard_rank_service = LeaderboardRankService()
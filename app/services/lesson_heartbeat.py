@@ -0,0 +1,95 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import run_in_db_thread
+from app.crud.lesson_progress import lesson_progress as crud_lesson_progress
+
+logger = logging.getLogger(__name__)
+
+MAX_RESOLVED_PROGRESS_IDS = 50_000
+
+
+class LessonHeartbeatService:
+    """Coalesces time-spent pings into periodic bulk UPDATEs of lesson_progress.
+
+    Heartbeats only touch memory: deltas are summed per progress row and the
+    scheduler flushes them every LESSON_HEARTBEAT_FLUSH_SECONDS, plus once on
+    shutdown. A failed flush puts its deltas back, so time is written at least
+    once; a hard crash loses at most one interval.
+    """
+
+    def __init__(self):
+        self._pending: Dict[int, Tuple[int, datetime]] = {}
+        self._progress_ids: Dict[Tuple[int, int], int] = {}
+        self._lock = threading.Lock()
+        self._received = 0
+        self._rows_written = 0
+        self._flushes = 0
+
+    async def record(self, db: Session, *, user_id: int, lesson_id: int, seconds: int) -> None:
+        with self._lock:
+            progress_id = self._progress_ids.get((user_id, lesson_id))
+        if progress_id is None:
+            progress_id = await run_in_db_thread(crud_lesson_progress.get_id_for_user_and_lesson, db, user_id, lesson_id)
+            if progress_id is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="You must start the lesson before sending heartbeats."
+                )
+            with self._lock:
+                if len(self._progress_ids) >= MAX_RESOLVED_PROGRESS_IDS:
+                    self._progress_ids.clear()
+                self._progress_ids[(user_id, lesson_id)] = progress_id
+
+        seconds = max(0, min(seconds, settings.LESSON_HEARTBEAT_MAX_SECONDS))
+        now = datetime.now()
+        with self._lock:
+            buffered, _ = self._pending.get(progress_id, (0, now))
+            self._pending[progress_id] = (buffered + seconds, now)
+            self._received += 1
+
+    def flush(self, db: Session) -> int:
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+
+        try:
+            crud_lesson_progress.add_time_spent(db, [
+                {"progress_id": progress_id, "seconds": seconds, "accessed_at": accessed_at}
+                for progress_id, (seconds, accessed_at) in batch.items()
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._requeue(batch)
+            raise
+
+        with self._lock:
+            self._rows_written += len(batch)
+            self._flushes += 1
+        return len(batch)
+
+    def _requeue(self, batch: Dict[int, Tuple[int, datetime]]) -> None:
+        with self._lock:
+            for progress_id, (seconds, accessed_at) in batch.items():
+                buffered, latest = self._pending.get(progress_id, (0, accessed_at))
+                self._pending[progress_id] = (buffered + seconds, max(latest, accessed_at))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "received": self._received,
+                "rows_written": self._rows_written,
+                "flushes": self._flushes,
+                "pending_rows": len(self._pending),
+            }
+
+
+lesson_heartbeat_service = LessonHeartbeatService()
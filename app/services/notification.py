@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
+from app.crud.base import CursorPage
 from app.crud.notification import notification as crud_notification
 from app.schemas.notification import NotificationCreate, NotificationUpdate, Notification
 
@@ -14,6 +15,14 @@ class NotificationService:
         result = crud_notification.get_for_user(db, user_id=user_id, skip=skip, limit=limit)
         return result
 
+    def get_user_notifications_page(self, db: Session, *, user_id: int, cursor: Optional[str] = None, limit: int = 100) -> CursorPage[Notification]:
+        items, next_cursor = crud_notification.get_page_for_user(db, user_id=user_id, cursor=cursor, limit=limit)
+        return CursorPage[Notification](
+            items=[Notification.model_validate(n) for n in items],
+            next_cursor=next_cursor,
+            has_next=next_cursor is not None
+        )
+
     def get_unread_count(self, db: Session, *, user_id: int) -> int:
         result = len(crud_notification.get_unread_for_user(db, user_id=user_id))
         return result
@@ -67,6 +67,42 @@ class PolygonService:
         }
 
         return quote_data
+
+    async def get_latest_prices(self, tickers: List[str], batch_size: int = 250) -> Dict[str, float]:
+        """Previous-close prices for many tickers, fetched in batches from the snapshot endpoint.
+
+        Tickers with a fresh entry in the quote cache are not requested again.
+        Tickers the snapshot endpoint does not return fall back to
+        get_latest_quote; tickers without any price are left out.
+        """
+        prices: Dict[str, float] = {}
+        missing = []
+        for ticker in dict.fromkeys(tickers):
+            cached = self.price_cache.get(f"quote_{ticker}")
+            if cached and datetime.utcnow() - cached['timestamp'] < timedelta(seconds=5):
+                prices[ticker] = cached['data']['price']
+            else:
+                missing.append(ticker)
+
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            try:
+                data = await self._make_request("/v2/snapshot/locale/us/markets/stocks/tickers", {"tickers": ",".join(batch)})
+            except HTTPException:
+                continue
+            for snapshot in (data or {}).get("tickers") or []:
+                close = (snapshot.get("prevDay") or {}).get("c")
+                if close:
+                    prices[snapshot["ticker"]] = close
+
+        unresolved = [ticker for ticker in missing if ticker not in prices]
+        if unresolved:
+            quotes = await asyncio.gather(*(self.get_latest_quote(ticker) for ticker in unresolved), return_exceptions=True)
+            for ticker, quote in zip(unresolved, quotes):
+                if not isinstance(quote, Exception) and quote and quote.get("price"):
+                    prices[ticker] = quote["price"]
+        return prices
+
     async def get_company_details(self, ticker: str) -> Optional[dict]:
         data = await self._make_request(f"/v3/reference/tickers/{ticker}", allow_404=True)
         if not data:
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from datetime import datetime
 from collections import defaultdict
 
@@ -8,29 +8,27 @@ from app.schemas.report import SchoolReportSchema, StudentExamStats
 from app.schemas.report import (
     AdminDashboardReportSchema, AdminDashboardStatsSchema, MostActiveUserSchema,
     SchoolDashboardStatsSchema, SchoolReportSchema, LeaderboardEntrySchema,
-    LeaderboardResponseSchema, TopPerformerSchema, TradingLeaderboardEntrySchema,
+    LeaderboardResponseSchema, LeaderboardPositionSchema, TopPerformerSchema, TradingLeaderboardEntrySchema,
     TradingLeaderboardResponseSchema, StudentLessonProgressSchema, LevelProgressSchema
 )
-from app.core.constants import RoleEnum
 from app.crud.user import user as crud_user
-from app.crud.course import course as crud_course
-from app.crud.role import role as crud_role
 from app.crud.school import school as crud_school
 from app.crud.exam import exam as crud_exam
 from app.crud.exam_attempt import exam_attempt as crud_exam_attempt
 from app.crud.course_enrollment import course_enrollment
-from app.crud.lesson_progress import lesson_progress
 from app.services.exam import exam_service
-from app.services.trading import trading_service
+from app.services.leaderboard import leaderboard_service
+from app.services.leaderboard_rank import leaderboard_rank_service
+from app.services.report_rollup import report_rollup_service
+from app.services.trading_leaderboard import trading_leaderboard_refresh_queue, trading_leaderboard_service
+from app.services.export import export_service
+from app.core.constants import ExportFormatEnum
 
-from app.services.stripe import stripe_service
 from app.schemas.report import StudentExamStats
 from app.crud.report import trading_leaderboard_snapshot, leaderboard_snapshot
 from app.utils.permission import PermissionHelper as permission_helper
 from app.utils.events import event_bus
 from fastapi import HTTPException, status
-from app.core.database import SessionLocal
-import asyncio
 
 class ReportService:
     def get_student_exam_stats(self, db: Session, current_user_context: UserContext) -> StudentExamStats:
@@ -62,26 +60,14 @@ class ReportService:
 
         user_id = current_user_context.user.id
 
-        enrollments = course_enrollment.get_by_user(db, user_id=user_id)
+        counters = course_enrollment.get_progress_counters_for_user(db, user_id=user_id)
 
         progress_by_level = defaultdict(lambda: {"available": 0, "completed": 0})
         total_available = 0
         total_completed = 0
 
-        for enrollment in enrollments:
-            course = enrollment.course
-            if not course or course.deleted_at:
-                continue
-
-            level = course.level.value if course.level else "unknown"
-
-            available_in_course = 0
-            for curriculum in course.curriculums:
-                if curriculum.deleted_at:
-                    continue
-                available_in_course += len([l for l in curriculum.lessons if not l.deleted_at])
-
-            completed_in_course = lesson_progress.count_completed_by_enrollment(db, enrollment.id)
+        for course_level, available_in_course, completed_in_course in counters:
+            level = course_level.value if course_level else "unknown"
 
             progress_by_level[level]["available"] += available_in_course
             progress_by_level[level]["completed"] += completed_in_course
@@ -111,13 +97,7 @@ class ReportService:
     def get_school_report(self, db: Session, school_id: int, current_user_context: UserContext, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> SchoolReportSchema:
         permission_helper.require_school_view_permission(current_user_context, school_id)
 
-        total_courses_count = crud_course.get_courses_by_school_count(db, school_id=school_id, start_date=start_date, end_date=end_date)
-
-        student_role = crud_role.get_by_name(db, name=RoleEnum.STUDENT)
-        if not student_role:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Student role not found.")
-
-        total_enrolled_students_count = crud_user.get_users_by_school_and_role_count(db, school_id=school_id, role_id=student_role.id, start_date=start_date, end_date=end_date)
+        totals = report_rollup_service.school_totals(db, school_id, start_date, end_date, metrics=("courses", "students"))
 
         top_performer_data = crud_user.get_top_performer_by_exam_score(db, school_id=school_id, start_date=start_date, end_date=end_date)
         top_performer = TopPerformerSchema(**top_performer_data) if top_performer_data else None
@@ -126,116 +106,86 @@ class ReportService:
         most_active_user = MostActiveUserSchema(**most_active_user_data) if most_active_user_data else None
 
         return SchoolReportSchema(
-            total_courses_count=total_courses_count,
-            total_enrolled_students_count=total_enrolled_students_count,
+            total_courses_count=int(totals["courses"]),
+            total_enrolled_students_count=int(totals["students"]),
             top_performer=top_performer,
             most_active_user=most_active_user
         )
 
     async def get_school_leaderboard(
-        self, db: Session, school_id: int, current_user_context: UserContext, skip: int = 0, limit: int = 100
+        self, db: Session, school_id: int, current_user_context: UserContext, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+        include_total: bool = False
     ) -> LeaderboardResponseSchema:
         permission_helper.require_school_view_permission(current_user_context, school_id)
 
-        snapshots = leaderboard_snapshot.get_all_snapshots_for_school(db, school_id=school_id, skip=skip, limit=limit)
-        total_snapshots = leaderboard_snapshot.count_snapshots_for_school(db, school_id=school_id)
-
-        leaderboard_entries = []
-        for snapshot in snapshots:
-            leaderboard_entries.append(LeaderboardEntrySchema(
-                student_id=snapshot.student_id,
-                student_full_name=snapshot.student_full_name,
-                student_email=snapshot.student_email,
-                lessons_completed=snapshot.lessons_completed,
-                accumulated_exam_score=snapshot.accumulated_exam_score,
-                total_rewards=snapshot.total_rewards
-            ))
+        next_cursor = None
+        if cursor is not None:
+            snapshots, next_cursor = leaderboard_snapshot.get_page_for_school(db, school_id=school_id, cursor=cursor or None, limit=limit)
+            ranked = [(leaderboard_rank_service.rank_of_score(db, school_id, snapshot.total_rewards or 0), snapshot) for snapshot in snapshots]
+            # Walking pages by cursor doesn't need a total, so only count when asked.
+            total_snapshots = leaderboard_snapshot.count_snapshots_for_school(db, school_id=school_id) if include_total else None
+        else:
+            ranked, total_snapshots = leaderboard_rank_service.get_page(db, school_id, skip=skip, limit=limit)
 
         data = {
-            "items": leaderboard_entries,
+            "items": [self._leaderboard_entry(rank, snapshot) for rank, snapshot in ranked],
             "total": total_snapshots,
             "skip": skip,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor
         }
         return LeaderboardResponseSchema(**data)
 
+    async def get_leaderboard_position(
+        self, db: Session, school_id: int, student_id: int, current_user_context: UserContext, window: int = 5
+    ) -> LeaderboardPositionSchema:
+        permission_helper.require_school_view_permission(current_user_context, school_id)
+
+        rank, ranked, total = leaderboard_rank_service.get_position(db, school_id, student_id, window=window)
+        return LeaderboardPositionSchema(
+            student_id=student_id,
+            rank=rank,
+            total=total,
+            items=[self._leaderboard_entry(entry_rank, snapshot) for entry_rank, snapshot in ranked]
+        )
+
+    @staticmethod
+    def _leaderboard_entry(rank: int, snapshot) -> LeaderboardEntrySchema:
+        return LeaderboardEntrySchema(
+            student_id=snapshot.student_id,
+            student_full_name=snapshot.student_full_name,
+            student_email=snapshot.student_email,
+            lessons_completed=snapshot.lessons_completed,
+            accumulated_exam_score=snapshot.accumulated_exam_score,
+            total_rewards=snapshot.total_rewards,
+            rank=rank
+        )
+
     async def precompute_leaderboard(self, db: Session, school_id: int):
-        try:
-            student_role = crud_role.get_by_name(db, name=RoleEnum.STUDENT)
-            if not student_role:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Student role not found.")
-
-            students = crud_user.get_users_by_school_and_role(db, school_id=school_id, role_id=student_role.id)
-            leaderboard_data = crud_user.get_leaderboard_data_for_school(db, school_id=school_id, skip=0, limit=len(students))
-            leaderboard_snapshot.delete_all_snapshots_for_school(db, school_id=school_id)
-
-            new_snapshots = []
-            for entry in leaderboard_data:
-                snapshot_data = {
-                    "student_id": entry.student_id,
-                    "student_full_name": entry.student_full_name,
-                    "student_email": entry.student_email,
-                    "lessons_completed": entry.lessons_completed,
-                    "accumulated_exam_score": entry.accumulated_exam_score,
-                    "total_rewards": entry.total_rewards,
-                    "timestamp": datetime.utcnow(),
-                    "school_id": school_id
-                }
-                new_snapshots.append(snapshot_data)
-
-            leaderboard_snapshot.bulk_create_leaderboard_snapshots(db, snapshots_data=new_snapshots)
-        except Exception as e:
-            print(f"Error precomputing leaderboard for school {school_id}: {e}")
-            raise
+        """Reconcile the school's incrementally maintained leaderboard with the source tables."""
+        leaderboard_service.reconcile_school(db, school_id)
+        db.commit()
 
     async def precompute_trading_leaderboard(
         self, db: Session, school_id: int, current_user_context: UserContext
     ):
-        try:
-            student_role = crud_role.get_by_name(db, name=RoleEnum.STUDENT)
-            if not student_role:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Student role not found.")
-
-            students = crud_user.get_users_by_school_and_role(db, school_id=school_id, role_id=student_role.id)
-
-            tasks = []
-            for student in students:
-                tasks.append(trading_service.get_trading_account_summary(db, user_id=student.id))
-
-            summaries = await asyncio.gather(*tasks, return_exceptions=True)
-            trading_leaderboard_snapshot.delete_all_snapshots_for_school(db, school_id=school_id)
-
-            new_snapshots = []
-            for i, student in enumerate(students):
-                summary = summaries[i]
-                if isinstance(summary, Exception):
-                    print(f"Error fetching trading summary for student {student.id}: {summary}")
-                    continue
-
-                snapshot_data = {
-                    "student_id": student.id,
-                    "student_full_name": student.full_name,
-                    "student_email": student.email,
-                    "starting_capital": summary.starting_capital,
-                    "current_balance": summary.current_balance,
-                    "trading_profit": summary.trading_profit,
-                    "timestamp": datetime.utcnow(),
-                    "school_id": school_id
-                }
-                new_snapshots.append(snapshot_data)
-
-            trading_leaderboard_snapshot.bulk_create_trading_leaderboard_snapshots(db, snapshots_data=new_snapshots)
-        except Exception as e:
-            print(f"Error precomputing trading leaderboard for school {school_id}: {e}")
-            raise
+        """Recompute the school's trading leaderboard in bulk; see TradingLeaderboardService."""
+        await trading_leaderboard_service.precompute_school(db, school_id)
 
     async def get_trading_leaderboard(
-        self, db: Session, school_id: int, current_user_context: UserContext, skip: int = 0, limit: int = 100
+        self, db: Session, school_id: int, current_user_context: UserContext, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+        include_total: bool = False
     ) -> TradingLeaderboardResponseSchema:
         permission_helper.require_school_view_permission(current_user_context, school_id)
 
-        snapshots = trading_leaderboard_snapshot.get_all_snapshots_for_school(db, school_id=school_id, skip=skip, limit=limit)
-        total_snapshots = trading_leaderboard_snapshot.count_snapshots_for_school(db, school_id=school_id)
+        next_cursor = None
+        total_snapshots = None
+        if cursor is not None:
+            snapshots, next_cursor = trading_leaderboard_snapshot.get_page_for_school(db, school_id=school_id, cursor=cursor or None, limit=limit)
+        else:
+            snapshots = trading_leaderboard_snapshot.get_all_snapshots_for_school(db, school_id=school_id, skip=skip, limit=limit)
+        if cursor is None or include_total:
+            total_snapshots = trading_leaderboard_snapshot.count_snapshots_for_school(db, school_id=school_id)
 
         leaderboard_entries = []
         for snapshot in snapshots:
@@ -252,43 +202,52 @@ class ReportService:
             "items": leaderboard_entries,
             "total": total_snapshots,
             "skip": skip,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor
         }
         return TradingLeaderboardResponseSchema(**data)
 
-    def get_school_dashboard_stats(self, db: Session, school_id: int, current_user_context: UserContext, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> SchoolReportSchema:
+    def export_school_leaderboard(self, school_id: int, current_user_context: UserContext, export_format: ExportFormatEnum) -> AsyncIterator[bytes]:
         permission_helper.require_school_view_permission(current_user_context, school_id)
-        permission_helper.require_not_student(current_user_context)
-
-        total_courses_count = crud_course.get_courses_by_school_count(db, school_id=school_id, start_date=start_date, end_date=end_date)
-
-        student_role = crud_role.get_by_name(db, name=RoleEnum.STUDENT)
-        if not student_role:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Student role not found.")
+        return export_service.stream(
+            leaderboard_snapshot.select_export_for_school(school_id),
+            ["rank", "student_id", "student_full_name", "student_email", "lessons_completed", "accumulated_exam_score", "total_rewards"],
+            export_format=export_format,
+            sheet_title="leaderboard",
+        )
 
-        total_students_count = crud_user.get_users_by_school_and_role_count(db, school_id=school_id, role_id=student_role.id, start_date=start_date, end_date=end_date)
+    def export_trading_leaderboard(self, school_id: int, current_user_context: UserContext, export_format: ExportFormatEnum) -> AsyncIterator[bytes]:
+        permission_helper.require_school_view_permission(current_user_context, school_id)
+        return export_service.stream(
+            trading_leaderboard_snapshot.select_export_for_school(school_id),
+            ["rank", "student_id", "student_full_name", "student_email", "starting_capital", "current_balance", "trading_profit"],
+            export_format=export_format,
+            sheet_title="trading leaderboard",
+        )
 
-        total_teams_count = crud_user.get_non_student_users_by_school_count(db, school_id=school_id, start_date=start_date, end_date=end_date)
+    def get_school_dashboard_stats(self, db: Session, school_id: int, current_user_context: UserContext, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> SchoolReportSchema:
+        permission_helper.require_school_view_permission(current_user_context, school_id)
+        permission_helper.require_not_student(current_user_context)
 
+        totals = report_rollup_service.school_totals(db, school_id, start_date, end_date, metrics=("students", "courses", "staff"))
         return SchoolDashboardStatsSchema(
-            total_students=total_students_count,
-            total_courses=total_courses_count,
-            total_teams=total_teams_count
+            total_students=int(totals["students"]),
+            total_courses=int(totals["courses"]),
+            total_teams=int(totals["staff"])
         )
 
     async def get_admin_dashboard_report(self, db: Session, current_user_context: UserContext, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> AdminDashboardReportSchema:
         if not permission_helper.is_super_admin(current_user_context):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only Super Admin can access this report.")
 
-        total_courses_count = crud_course.get_all_courses_count(db, start_date=start_date, end_date=end_date)
+        totals = report_rollup_service.platform_totals(db, start_date, end_date, metrics=("courses", "students"))
         total_schools_count = crud_school.get_all_schools_count(db, start_date=start_date, end_date=end_date)
-        total_students_count = crud_user.get_all_students_count(db, start_date=start_date, end_date=end_date)
-        total_revenue = await stripe_service.get_total_revenue(start_date=start_date, end_date=end_date)
+        total_revenue = await report_rollup_service.platform_revenue(db, start_date, end_date)
 
         return AdminDashboardReportSchema(
-            total_courses_count=total_courses_count,
+            total_courses_count=int(totals["courses"]),
             total_schools_count=total_schools_count,
-            total_students_count=total_students_count,
+            total_students_count=int(totals["students"]),
             total_revenue=total_revenue
         )
 
@@ -296,130 +255,20 @@ class ReportService:
         if not permission_helper.is_super_admin(current_user_context):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only Super Admin can access this report.")
 
-        total_courses_count = crud_course.get_all_courses_count(db, start_date=start_date, end_date=end_date)
-        total_students_count = crud_user.get_all_students_count(db, start_date=start_date, end_date=end_date)
-        total_teachers_count = crud_user.get_all_teachers_count(db, start_date=start_date, end_date=end_date)
+        totals = report_rollup_service.platform_totals(db, start_date, end_date, metrics=("courses", "students", "teachers"))
         return AdminDashboardStatsSchema(
-            total_courses=total_courses_count,
-            total_students=total_students_count,
-            total_teachers=total_teachers_count
+            total_courses=int(totals["courses"]),
+            total_students=int(totals["students"]),
+            total_teachers=int(totals["teachers"])
         )
 
-    async def update_student_leaderboard(self, db: Session, student_id: int, school_id: int):
-        try:
-            student_role = crud_role.get_by_name(db, name=RoleEnum.STUDENT)
-            if not student_role:
-                return
-
-            association = crud_user.get_association_by_user_school_role(
-                db, user_id=student_id, school_id=school_id, role_id=student_role.id
-            )
-            if not association:
-                return
-
-            student = crud_user.get(db, id=student_id)
-            if not student:
-                return
-
-            leaderboard_data = crud_user.get_leaderboard_data_for_student(
-                db, school_id=school_id, student_id=student_id
-            )
-
-            if not leaderboard_data:
-                return
-
-            snapshot_data = {
-                "student_id": student_id,
-                "student_full_name": leaderboard_data.student_full_name,
-                "student_email": leaderboard_data.student_email,
-                "lessons_completed": leaderboard_data.lessons_completed,
-                "accumulated_exam_score": leaderboard_data.accumulated_exam_score,
-                "total_rewards": leaderboard_data.total_rewards,
-                "school_id": school_id,
-                "timestamp": datetime.utcnow()
-            }
-
-            leaderboard_snapshot.update_or_create_snapshot(db, student_id, school_id, snapshot_data)
-        except Exception as e:
-            print(f"Error updating student leaderboard for student {student_id}: {e}")
-
-    async def update_student_trading_leaderboard(self, db: Session, student_id: int, school_id: int):
-        try:
-            student_role = crud_role.get_by_name(db, name=RoleEnum.STUDENT)
-            if not student_role:
-                return
-
-            association = crud_user.get_association_by_user_school_role(
-                db, user_id=student_id, school_id=school_id, role_id=student_role.id
-            )
-            if not association:
-                return
-
-            student = crud_user.get(db, id=student_id)
-            if not student:
-                return
-
-            trading_summary = await trading_service.get_trading_account_summary(db, user_id=student_id)
-
-            snapshot_data = {
-                "student_id": student_id,
-                "student_full_name": student.full_name,
-                "student_email": student.email,
-                "starting_capital": trading_summary.starting_capital,
-                "current_balance": trading_summary.current_balance,
-                "trading_profit": trading_summary.trading_profit,
-                "school_id": school_id,
-                "timestamp": datetime.utcnow()
-            }
-
-            trading_leaderboard_snapshot.update_or_create_snapshot(db, student_id, school_id, snapshot_data)
-        except Exception as e:
-            print(f"Error updating student trading leaderboard for student {student_id}: {e}")
-
-
-async def handle_course_completion_event(data: dict):
-    student_id = data.get("student_id")
-    course_id = data.get("course_id")
-    school_id = data.get("school_id")
-    if not all([student_id, course_id, school_id]):
-        return
-
-    db = SessionLocal()
-    try:
-        await report_service.update_student_leaderboard(db, student_id, school_id)
-    finally:
-        db.close()
-
-
-async def handle_reward_awarded_event(data: dict):
-    student_id = data.get("student_id")
-    school_id = data.get("school_id")
-    if not all([student_id, school_id]):
-        return
-
-    db = SessionLocal()
-    try:
-        await report_service.update_student_leaderboard(db, student_id, school_id)
-    finally:
-        db.close()
-
 
 async def handle_trade_executed_event(data: dict):
     student_id = data.get("student_id")
-    if not student_id:
-        return
-
-    db = SessionLocal()
-    try:
-        associations = crud_user.get_student_school_associations(db, student_id)
-        for association in associations:
-            await report_service.update_student_trading_leaderboard(db, student_id, association.school_id)
-    finally:
-        db.close()
+    if student_id:
+        trading_leaderboard_refresh_queue.submit(student_id)
 
 
 report_service = ReportService()
 
-event_bus.subscribe("course_completed", handle_course_completion_event)
-event_bus.subscribe("reward_awarded", handle_reward_awarded_event)
 event_bus.subscribe("trade_executed", handle_trade_executed_event)
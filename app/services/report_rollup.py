@@ -0,0 +1,132 @@
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import run_in_db_thread
+from app.crud.report_rollup import ROLLUP_METRICS, platform_daily_rollup as crud_platform_rollup, school_daily_rollup as crud_school_rollup
+from app.services.stripe import stripe_service
+
+logger = logging.getLogger(__name__)
+
+Slice = Tuple[Optional[datetime], Optional[datetime]]
+
+
+class ReportRollupService:
+    """Serves date-ranged dashboard totals from daily rollups.
+
+    The nightly job rewrites the school rollups for the last
+    REPORT_ROLLUP_RECOMPUTE_DAYS days (and any day not rolled up before)
+    from the fact tables, and adds Stripe revenue for the days it has not
+    rolled up before. A range then sums the rollup rows of its whole,
+    rolled-up days, and counts only the rest live with the same filters:
+    partial days at either edge, and everything since the last rollup.
+    Until the first rollup every range is counted live.
+
+    Rollups are bucketed by creation day (UTC) but filtered on current
+    state, so a change to an already rolled-up day's facts, such as a soft
+    delete, a role change or a new membership for an existing user, is not
+    in the totals until a rollup covers that day again: the next nightly run
+    inside the recompute window, the weekly full rebuild (``full=True``)
+    beyond it. Until then totals can differ from the direct counts.
+    """
+
+    async def rollup(self, db: Session, through: Optional[date] = None, full: bool = False) -> int:
+        """Roll up the days through ``through`` (default: yesterday, UTC) that may have changed. Commits.
+
+        That is the recompute window and every day not rolled up before, or
+        all of history with ``full``.
+        """
+        through = through or datetime.utcnow().date() - timedelta(days=1)
+        rolled_through = await run_in_db_thread(crud_platform_rollup.get_rolled_through, db)
+        first_day = None
+        if not full and rolled_through is not None:
+            first_day = min(rolled_through + timedelta(days=1), through - timedelta(days=settings.REPORT_ROLLUP_RECOMPUTE_DAYS - 1))
+        revenue_by_day: Dict[date, float] = {}
+        if rolled_through is None or rolled_through < through:
+            since = self._day_start(rolled_through + timedelta(days=1)) if rolled_through else None
+            revenue = await stripe_service.get_daily_revenue(since, self._day_end(through))
+            revenue_by_day = {day: amount for day, amount in revenue.items() if day <= through}
+            revenue_by_day.setdefault(through, 0.0)
+        rows = await run_in_db_thread(self._store, db, first_day, through, revenue_by_day)
+        logger.info("Rolled up reports from %s through %s: %s school-day rows, %s revenue days",
+                    first_day or "the beginning", through, rows, len(revenue_by_day))
+        return rows
+
+    def school_totals(self, db: Session, school_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      metrics: Sequence[str] = ROLLUP_METRICS) -> Dict[str, float]:
+        return self._totals(db, start, end, school_id, metrics)
+
+    def platform_totals(self, db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                        metrics: Sequence[str] = ROLLUP_METRICS) -> Dict[str, float]:
+        """Totals over every school; ``revenue`` here is school invoice revenue, see platform_revenue for Stripe's."""
+        return self._totals(db, start, end, None, metrics)
+
+    async def platform_revenue(self, db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None) -> float:
+        """Succeeded Stripe charges in the range, as StripeService.get_total_revenue counts them."""
+        days, live = await run_in_db_thread(self._plan, db, start, end)
+        total = await run_in_db_thread(crud_platform_rollup.sum_revenue, db, *days) if days else 0.0
+        for since, until in live:
+            total += await stripe_service.get_total_revenue(start_date=since, end_date=until)
+        return total
+
+    def _totals(self, db: Session, start: Optional[datetime], end: Optional[datetime], school_id: Optional[int],
+                metrics: Sequence[str]) -> Dict[str, float]:
+        days, live = self._plan(db, start, end)
+        totals = dict.fromkeys(metrics, 0)
+        if days:
+            rolled = crud_school_rollup.sum_days(db, *days, school_id=school_id)
+            for metric in metrics:
+                totals[metric] += rolled[metric]
+        for since, until in live:
+            for values in crud_school_rollup.aggregate(db, since=since, until=until, school_id=school_id, metrics=metrics).values():
+                for metric in metrics:
+                    totals[metric] += values[metric]
+        return totals
+
+    def _plan(self, db: Session, start: Optional[datetime], end: Optional[datetime]) -> Tuple[Optional[Tuple[date, date]], List[Slice]]:
+        """Split an inclusive [start, end] range into rolled-up whole days and the slices left to count live."""
+        start, end = self._as_utc(start), self._as_utc(end)
+        rolled_through = crud_platform_rollup.get_rolled_through(db)
+        if rolled_through is None:
+            return None, [(start, end)]
+
+        first_day = date.min if start is None else start.date() if start.time() == time.min else start.date() + timedelta(days=1)
+        # A day is whole once the range reaches the next midnight.
+        last_day = rolled_through if end is None else min(rolled_through, end.date() - timedelta(days=1))
+        if first_day > last_day:
+            return None, [(start, end)]
+
+        live: List[Slice] = []
+        if start is not None and start < self._day_start(first_day):
+            live.append((start, self._day_end(first_day - timedelta(days=1))))
+        live.append((self._day_start(last_day + timedelta(days=1)), end))
+        return (first_day, last_day), live
+
+    def _store(self, db: Session, first_day: Optional[date], through: date, revenue_by_day: Dict[date, float]) -> int:
+        since = self._day_start(first_day) if first_day else None
+        aggregated = crud_school_rollup.aggregate(db, since=since, until=self._day_end(through))
+        rows = [{"school_id": school_id, "day": day, **values} for (school_id, day), values in aggregated.items()]
+        crud_school_rollup.replace_days(db, first_day, through, rows)
+        crud_platform_rollup.replace_days(db, revenue_by_day)
+        db.commit()
+        return len(rows)
+
+    @staticmethod
+    def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+        if value is None or value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    @staticmethod
+    def _day_start(day: date) -> datetime:
+        return datetime.combine(day, time.min)
+
+    @staticmethod
+    def _day_end(day: date) -> datetime:
+        return datetime.combine(day, time.max)
+
+
+report_rollup_service = ReportRollupService()
@@ -12,6 +12,7 @@ from app.schemas.reward_rating import (CourseRewardCreate, CourseRatingCreate, C
 from app.models.course_enrollment import EnrollmentStatusEnum
 from app.utils.permission import PermissionHelper as permission_helper
 from app.utils.events import event_bus
+from app.services.leaderboard import leaderboard_service
 
 
 class RewardRatingService:
@@ -43,8 +44,8 @@ class RewardRatingService:
             awarded_at=datetime.now()
         )
 
-        reward = crud_reward.create(db, obj_in=reward_in)
-        db.flush()
+        reward = crud_reward.create(db, obj_in=reward_in, commit=False)
+        leaderboard_service.record(db, enrollment.user_id, rewards=reward.points)
 
         await event_bus.publish("reward_awarded", {
             "student_id": enrollment.user_id,
@@ -86,14 +87,14 @@ class RewardRatingService:
                 detail="Only students can rate courses."
             )
 
-        course = crud_course.get(db, id=rating_in.course_id)
+        course = crud_course.get(db, id=rating_in.course_id, profile="minimal")
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
 
         permission_helper.require_course_view_permission(current_user_context, course)
 
         enrollment = crud_enrollment.get_by_user_and_course(
-            db, user_id=current_user_context.user.id, course_id=rating_in.course_id
+            db, user_id=current_user_context.user.id, course_id=rating_in.course_id, profile="minimal"
         )
 
         if not enrollment:
@@ -162,7 +163,7 @@ class RewardRatingService:
 
     def get_course_ratings(self, db: Session, course_id: int, current_user_context: UserContext,
                           skip: int = 0, limit: int = 100):
-        course = crud_course.get(db, id=course_id)
+        course = crud_course.get(db, id=course_id, profile="minimal")
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
 
@@ -172,7 +173,7 @@ class RewardRatingService:
         return ratings
 
     def get_course_rating_stats(self, db: Session, course_id: int, current_user_context: UserContext):
-        course = crud_course.get(db, id=course_id)
+        course = crud_course.get(db, id=course_id, profile="minimal")
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
 
@@ -189,7 +190,7 @@ class RewardRatingService:
         )
 
     def get_user_rating_for_course(self, db: Session, course_id: int, current_user_context: UserContext):
-        course = crud_course.get(db, id=course_id)
+        course = crud_course.get(db, id=course_id, profile="minimal")
         if not course:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found.")
 
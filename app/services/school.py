@@ -6,10 +6,10 @@ from fastapi import HTTPException, status
 
 from app.core.config import settings
 from app.core.constants import RoleEnum
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 from app.crud.school import school as crud_school
 from app.crud.user import user as crud_user
-from app.crud.role import role as crud_role
+from app.crud.role import role_registry
 from app.crud.course import course as crud_course
 from app.crud.base import PaginatedResponse
 from app.crud.one_time_token import one_time_token as crud_one_time_token
@@ -31,7 +31,7 @@ class SchoolService:
                 detail="A user with this email already exists.",
             )
 
-        school_admin_role = crud_role.get_by_name(db, name=RoleEnum.SCHOOL_ADMIN)
+        school_admin_role = role_registry.get_by_name(db, RoleEnum.SCHOOL_ADMIN)
         if not school_admin_role:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -41,7 +41,7 @@ class SchoolService:
         try:
             new_school = crud_school.create(db, obj_in=school_in, commit=False)
 
-            hashed_password = get_password_hash(admin_in.password)
+            hashed_password = await get_password_hash_async(admin_in.password)
 
             admin_create_data = {
                 "full_name": admin_in.full_name,
@@ -137,7 +137,7 @@ class SchoolService:
         if school.deleted_at:
             raise HTTPException(status_code=400, detail="School is already deleted")
 
-        courses = crud_course.get_courses_by_school(db, school_id=school_id)
+        courses = crud_course.get_courses_by_school(db, school_id=school_id, profile="minimal")
         for course in courses:
             crud_course.bulk_soft_delete_related_entities(db, course.id)
 
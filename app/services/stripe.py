@@ -2,7 +2,7 @@ import stripe
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 
 from app.core.config import settings
 from app.models.user import User
@@ -10,7 +10,7 @@ from app.models.billing import StripeCustomer, Subscription
 from app.crud.subscription import subscription as crud_subscription
 from app.crud.stripe_customer import stripe_customer as crud_stripe_customer
 from app.crud.user import user as crud_user
-from app.crud.role import role as crud_role
+from app.crud.role import role_registry
 from app.core.constants import RoleEnum
 from app.schemas.billing import BillingReportSchema, InvoiceCreate, StripeCustomerCreate, BillingHistoryInvoiceSchema, TransactionTimeseriesReport, TimeseriesDataPoint, SubscriptionDetailSchema, SchoolInvoiceSchema, InvoicePaymentIntentSchema, InvoiceCheckoutSessionCreate, CheckoutSession
 from app.schemas.user import User as UserSchema, UserContext
@@ -70,7 +70,7 @@ class StripeService:
         if not school:
             raise HTTPException(status_code=404, detail="School not found in database.")
 
-        school_admin_role = crud_role.get_by_name(db, name=RoleEnum.SCHOOL_ADMIN)
+        school_admin_role = role_registry.get_by_name(db, RoleEnum.SCHOOL_ADMIN)
         if not school_admin_role:
             raise HTTPException(status_code=500, detail="School admin role not found.")
 
@@ -378,6 +378,18 @@ class StripeService:
 
     async def get_total_revenue(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> float:
         total_revenue = 0.0
+        async for charge in self._paid_charges(start_date, end_date):
+            total_revenue += charge.amount / 100.0
+        return total_revenue
+
+    async def get_daily_revenue(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Dict[date, float]:
+        """Succeeded charge totals per UTC day of creation."""
+        revenue: Dict[date, float] = defaultdict(float)
+        async for charge in self._paid_charges(start_date, end_date):
+            revenue[datetime.utcfromtimestamp(charge.created).date()] += charge.amount / 100.0
+        return dict(revenue)
+
+    async def _paid_charges(self, start_date: Optional[datetime], end_date: Optional[datetime]):
         charge_params = {"limit": 100}
         if start_date:
             charge_params["created"] = {"gte": int(start_date.timestamp())}
@@ -391,12 +403,11 @@ class StripeService:
         while True:
             for charge in charges.data:
                 if charge.paid and charge.status == 'succeeded':
-                    total_revenue += charge.amount / 100.0
+                    yield charge
             if not charges.has_more:
                 break
             charge_params["starting_after"] = charges.data[-1].id
             charges = await self._make_request(stripe.Charge.list, **charge_params)
-        return total_revenue
 
     async def get_billing_report(self, db: Session) -> BillingReportSchema:
         total_revenue = await self.get_total_revenue()
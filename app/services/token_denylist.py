@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.token_denylist import token_denylist as crud_token_denylist
+from app.schemas.token_denylist import TokenDenylistCreate
+
+logger = logging.getLogger(__name__)
+
+
+class TokenDenylistService:
+    """In-memory view of revoked JTIs, kept in sync with the token_denylist table.
+
+    Each entry lives until the token's own expiry, after which the token would
+    be rejected by signature validation anyway. Other processes pick up new
+    revocations by polling for rows created since the newest one seen, less
+    TOKEN_DENYLIST_SYNC_OVERLAP_SECONDS: created_at is stamped when a row is
+    written, and a transaction can commit after a later one has.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}
+        self._seen_through: Optional[datetime] = None
+        self._last_sync = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # Queries run outside the lock so a slow read never stalls is_revoked
+    # callers; only the in-memory update is serialised.
+    def load(self, db: Session) -> int:
+        rows = crud_token_denylist.get_unexpired_since(db)
+        with self._lock:
+            # Keep live entries rather than clearing: a revoke() may have landed
+            # after the query above ran.
+            now = time.time()
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+            self._seen_through = None
+            self._apply_rows(rows)
+            self._loaded = True
+            self._last_sync = time.monotonic()
+            return len(self._revoked)
+
+    def sync(self, db: Session) -> int:
+        if not self._loaded:
+            return self.load(db)
+        with self._lock:
+            seen_through = self._seen_through
+        since = None
+        if seen_through is not None:
+            since = seen_through - timedelta(seconds=settings.TOKEN_DENYLIST_SYNC_OVERLAP_SECONDS)
+        rows = crud_token_denylist.get_unexpired_since(db, since=since)
+        with self._lock:
+            self._apply_rows(rows)
+            self._last_sync = time.monotonic()
+        return len(rows)
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        if not self._loaded or time.monotonic() - self._last_sync >= settings.TOKEN_DENYLIST_SYNC_SECONDS:
+            try:
+                self.sync(db)
+            except Exception as e:
+                logger.error(f"Token denylist sync failed: {e}")
+                return crud_token_denylist.get_by_jti(db, jti=jti) is not None
+
+        with self._lock:
+            exp = self._revoked.get(jti)
+            if exp is None:
+                return False
+            if exp <= time.time():
+                self._revoked.pop(jti, None)
+                return False
+            return True
+
+    def revoke(self, db: Session, *, jti: str, exp: int) -> None:
+        crud_token_denylist.create(
+            db,
+            obj_in=TokenDenylistCreate(jti=jti, exp=datetime.fromtimestamp(exp, tz=timezone.utc))
+        )
+        with self._lock:
+            self._revoked[jti] = float(exp)
+
+    def purge_expired(self, db: Session) -> int:
+        now = time.time()
+        with self._lock:
+            for jti in [jti for jti, exp in self._revoked.items() if exp <= now]:
+                del self._revoked[jti]
+        return crud_token_denylist.delete_expired(db)
+
+    def _apply_rows(self, rows) -> None:
+        for row in rows:
+            exp = row.exp if row.exp.tzinfo else row.exp.replace(tzinfo=timezone.utc)
+            self._revoked[row.jti] = exp.timestamp()
+            if self._seen_through is None or row.created_at > self._seen_through:
+                self._seen_through = row.created_at
+
+
+token_denylist_service = TokenDenylistService()
@@ -4,12 +4,14 @@ from collections import defaultdict
 from datetime import datetime, timedelta
 from decimal import Decimal, ROUND_HALF_UP
 from functools import wraps
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.core.constants import OrderTypeEnum, OrderStatusEnum, RoleEnum
+from app.core.constants import ExportFormatEnum, OrderTypeEnum, OrderStatusEnum, RoleEnum
+from app.core.database import run_in_db_thread
+from app.crud.base import CursorPage
 from app.crud.trading import (
     account_balance as crud_account_balance,
     portfolio_position as crud_portfolio_position,
@@ -20,7 +22,7 @@ from app.crud.trading import (
 from app.crud.transaction import transaction as crud_transaction
 from app.crud.portfolio_snapshot import portfolio_snapshot as crud_portfolio_snapshot
 from app.crud.user import user as user_crud
-from app.crud.role import role as user_role
+from app.crud.role import role_registry
 from app.schemas.trading import (
     AccountBalanceSchema,
     HistoricalDataPointSchema,
@@ -39,6 +41,7 @@ from app.schemas.trading import (
     WatchlistStockSchema,
 )
 from app.schemas.user import UserContext
+from app.services.export import export_service
 from app.services.logo import logo_service
 from app.services.polygon import polygon_service
 from app.utils.events import event_bus
@@ -359,16 +362,10 @@ class TradingService:
         from_date: Optional[datetime] = None,
         to_date: Optional[datetime] = None
     ) -> AccountBalanceSchema:
-        account = crud_account_balance.get_by_user_id(db, user_id=user_id)
-
-        if not account:
-            account = crud_account_balance.create(
-                db,
-                obj_in={"user_id": user_id, "balance": Decimal("0.00")}
-            )
+        account = await run_in_db_thread(self._get_or_create_account, db, user_id)
 
         today = datetime.utcnow().date()
-        latest_snapshot = crud_portfolio_snapshot.get_by_user_and_date(db, user_id, today)
+        latest_snapshot = await run_in_db_thread(crud_portfolio_snapshot.get_by_user_and_date, db, user_id, today)
 
         if latest_snapshot:
             available_balance = Decimal(str(latest_snapshot.cash_balance))
@@ -378,7 +375,7 @@ class TradingService:
             available_balance = Decimal(str(account.balance))
             portfolio_value = Decimal("0.00")
 
-            positions = crud_portfolio_position.get_multi_by_user(db, user_id=user_id)
+            positions = await run_in_db_thread(crud_portfolio_position.get_multi_by_user, db, user_id=user_id)
 
             if positions:
                 symbols = [p.symbol for p in positions]
@@ -457,7 +454,7 @@ class TradingService:
                 detail="Student not found"
             )
 
-        student_role = user_role.get_by_name(db, name=RoleEnum.STUDENT)
+        student_role = role_registry.get_by_name(db, RoleEnum.STUDENT)
         if not student_role:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -521,7 +518,8 @@ class TradingService:
         skip: int = 0,
         limit: int = 100
     ) -> List[PortfolioPositionSchema]:
-        positions = crud_portfolio_position.get_multi_by_user(
+        positions = await run_in_db_thread(
+            crud_portfolio_position.get_multi_by_user,
             db,
             user_id=user_id,
             skip=skip,
@@ -588,12 +586,7 @@ class TradingService:
         user_id: int,
         order_in: TradeOrderCreate
     ) -> TradeOrder:
-        account = crud_account_balance.get_by_user_id(db, user_id=user_id)
-        if not account:
-            account = crud_account_balance.create(
-                db,
-                obj_in={"user_id": user_id, "balance": Decimal("0.00")}
-            )
+        account = await run_in_db_thread(self._get_or_create_account, db, user_id)
 
         if order_in.quantity <= 0:
             raise HTTPException(
@@ -622,12 +615,12 @@ class TradingService:
 
         realized_pnl = None
         if order_in.order_type == OrderTypeEnum.BUY:
-            await self._process_buy_order(
-                db, user_id, order_in, account, executed_price, total_amount
+            await run_in_db_thread(
+                self._process_buy_order, db, user_id, order_in, account, executed_price, total_amount
             )
         elif order_in.order_type == OrderTypeEnum.SELL:
-            realized_pnl = await self._process_sell_order(
-                db, user_id, order_in, account, executed_price, total_amount
+            realized_pnl = await run_in_db_thread(
+                self._process_sell_order, db, user_id, order_in, account, executed_price, total_amount
             )
         else:
             raise HTTPException(
@@ -646,7 +639,7 @@ class TradingService:
             "realized_pnl": realized_pnl
         })
 
-        new_trade = crud_trade_order.create(db, obj_in=trade_data)
+        new_trade = await run_in_db_thread(self._record_trade, db, trade_data)
 
         await event_bus.publish("trade_executed", {
             "student_id": user_id,
@@ -661,9 +654,21 @@ class TradingService:
             f"type={order_in.order_type}, qty={order_in.quantity}, price={executed_price}"
         )
 
-        return TradeOrder.model_validate(new_trade)
+        return new_trade
+
+    def _get_or_create_account(self, db: Session, user_id: int):
+        account = crud_account_balance.get_by_user_id(db, user_id=user_id)
+        if not account:
+            account = crud_account_balance.create(
+                db,
+                obj_in={"user_id": user_id, "balance": Decimal("0.00")}
+            )
+        return account
+
+    def _record_trade(self, db: Session, trade_data: dict) -> TradeOrder:
+        return TradeOrder.model_validate(crud_trade_order.create(db, obj_in=trade_data))
 
-    async def _process_buy_order(
+    def _process_buy_order(
         self,
         db: Session,
         user_id: int,
@@ -720,7 +725,7 @@ class TradingService:
                 }
             )
 
-    async def _process_sell_order(
+    def _process_sell_order(
         self,
         db: Session,
         user_id: int,
@@ -812,7 +817,8 @@ class TradingService:
         skip: int = 0,
         limit: int = 100
     ) -> List[TradeOrder]:
-        trades = crud_trade_order.get_multi_by_user(
+        trades = await run_in_db_thread(
+            crud_trade_order.get_multi_by_user,
             db,
             user_id=user_id,
             skip=skip,
@@ -821,6 +827,35 @@ class TradingService:
 
         return [TradeOrder.model_validate(t) for t in trades]
 
+    async def get_trade_history_page(
+        self,
+        db: Session,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> CursorPage[TradeOrder]:
+        trades, next_cursor = await run_in_db_thread(
+            crud_trade_order.get_page_by_user,
+            db,
+            user_id=user_id,
+            cursor=cursor,
+            limit=limit
+        )
+
+        return CursorPage[TradeOrder](
+            items=[TradeOrder.model_validate(t) for t in trades],
+            next_cursor=next_cursor,
+            has_next=next_cursor is not None
+        )
+
+    def export_trade_history(self, user_id: int, export_format: ExportFormatEnum) -> AsyncIterator[bytes]:
+        return export_service.stream(
+            crud_trade_order.select_export_by_user(user_id),
+            ["id", "symbol", "order_type", "status", "quantity", "price", "executed_price", "total_amount", "realized_pnl", "created_at", "executed_at"],
+            export_format=export_format,
+            sheet_title="trade history",
+        )
+
     async def get_portfolio_historical_data(
         self,
         db: Session,
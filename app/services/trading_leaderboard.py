@@ -0,0 +1,197 @@
+import asyncio
+import logging
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, run_in_db_thread
+from app.crud.report import trading_leaderboard_snapshot as crud_trading_leaderboard
+from app.models.user import User
+from app.services.polygon import polygon_service
+
+logger = logging.getLogger(__name__)
+
+
+class TradingLeaderboardService:
+    """Computes a whole school's trading leaderboard in bulk.
+
+    Two queries load every student's funding, cash and open positions, one
+    bulk price lookup covers the union of their symbols, and the balances and
+    profits are computed column-wise with pandas. Results match
+    TradingService.get_trading_account_summary: positions without a price
+    are valued at their average cost, and profit is never negative.
+    """
+
+    async def compute_school(self, db: Session, school_id: int) -> List[dict]:
+        accounts, positions = await run_in_db_thread(self._load, db, school_id, datetime.utcnow().date())
+        symbols = sorted({position.symbol for position in positions})
+        prices = await polygon_service.get_latest_prices(symbols) if symbols else {}
+        return self.build_rows(school_id, accounts, positions, prices, timestamp=datetime.utcnow())
+
+    async def precompute_school(self, db: Session, school_id: int) -> int:
+        rows = await self.compute_school(db, school_id)
+        await run_in_db_thread(self._store, db, school_id, rows)
+        logger.info("Precomputed trading leaderboard for school %s: %s students", school_id, len(rows))
+        return len(rows)
+
+    async def refresh_students(self, db: Session, student_ids: List[int]) -> int:
+        """Recompute the given students' rows in every school they study at, with the same bulk queries and price lookup."""
+        accounts, positions, memberships = await run_in_db_thread(self._load_students, db, student_ids, datetime.utcnow().date())
+        symbols = sorted({position.symbol for position in positions})
+        prices = await polygon_service.get_latest_prices(symbols) if symbols else {}
+        computed = {row["student_id"]: row for row in self.build_rows(None, accounts, positions, prices, timestamp=datetime.utcnow())}
+        rows = [{**computed[student_id], "school_id": school_id} for student_id, school_id in memberships if student_id in computed]
+        await run_in_db_thread(self._store_students, db, student_ids, rows)
+        return len(rows)
+
+    @staticmethod
+    def build_rows(school_id: Optional[int], accounts: Sequence[Any], positions: Sequence[Any],
+                   prices: Dict[str, float], timestamp: datetime) -> List[dict]:
+        if not accounts:
+            return []
+        frame = pd.DataFrame(
+            [tuple(account) for account in accounts],
+            columns=["student_id", "student_full_name", "student_email", "starting_capital", "total_invested", "cash_balance"]
+        )
+        for column in ("starting_capital", "total_invested", "cash_balance"):
+            frame[column] = frame[column].astype(float)
+
+        if positions:
+            held = pd.DataFrame([tuple(position) for position in positions], columns=["user_id", "symbol", "quantity", "average_price"])
+            price = held["symbol"].map(prices).astype(float).fillna(held["average_price"].astype(float))
+            held["value"] = held["quantity"].astype(float) * price
+            stock_value = held.groupby("user_id")["value"].sum()
+            frame["stock_value"] = frame["student_id"].map(stock_value).fillna(0.0)
+        else:
+            frame["stock_value"] = 0.0
+
+        net = frame["cash_balance"] + frame["stock_value"] - frame["total_invested"]
+        frame = frame.assign(
+            current_balance=frame["cash_balance"],
+            trading_profit=net.clip(lower=0.0),
+            timestamp=timestamp,
+        )
+        columns = ["student_id", "student_full_name", "student_email", "starting_capital", "current_balance", "trading_profit", "timestamp"]
+        return [
+            {**row, "student_id": int(row["student_id"]), "school_id": school_id}
+            for row in frame[columns].to_dict("records")
+        ]
+
+    @staticmethod
+    def _load(db: Session, school_id: int, snapshot_date: date) -> Tuple[List[Any], List[Any]]:
+        accounts = crud_trading_leaderboard.get_account_totals_for_school(db, school_id, snapshot_date)
+        positions = crud_trading_leaderboard.get_positions_for_school(db, school_id) if accounts else []
+        return accounts, positions
+
+    @staticmethod
+    def _load_students(db: Session, student_ids: List[int], snapshot_date: date) -> Tuple[List[Any], List[Any], List[Tuple[int, int]]]:
+        memberships = crud_trading_leaderboard.get_student_schools(db, student_ids)
+        if not memberships:
+            return [], [], []
+        students = select(User.id).where(User.id.in_({student_id for student_id, _ in memberships}))
+        accounts = crud_trading_leaderboard.get_account_totals(db, students, snapshot_date)
+        positions = crud_trading_leaderboard.get_positions(db, students)
+        return accounts, positions, memberships
+
+    @staticmethod
+    def _store_students(db: Session, student_ids: List[int], rows: List[dict]) -> None:
+        crud_trading_leaderboard.replace_for_students(db, student_ids, rows)
+        db.commit()
+
+    @staticmethod
+    def _store(db: Session, school_id: int, rows: List[dict]) -> None:
+        crud_trading_leaderboard.replace_for_school(db, school_id, rows)
+        db.commit()
+
+
+trading_leaderboard_service = TradingLeaderboardService()
+
+
+class TradingLeaderboardRefreshQueue:
+    """Coalesces trade_executed events into batched leaderboard refreshes.
+
+    A trade only marks its student as pending. The first mark after a quiet
+    period schedules a drain TRADING_LEADERBOARD_DEBOUNCE_SECONDS later; any
+    further trades the student places before then are absorbed, and every
+    student marked in the window is refreshed together, at most
+    TRADING_LEADERBOARD_REFRESH_BATCH_SIZE per recompute. Refreshes are best
+    effort: a failed batch is logged and left for the next precompute.
+    """
+
+    def __init__(self, refresh: Callable[[Session, List[int]], Awaitable[int]],
+                 session_factory: Callable[[], Session] = SessionLocal,
+                 window: float = settings.TRADING_LEADERBOARD_DEBOUNCE_SECONDS,
+                 batch_size: int = settings.TRADING_LEADERBOARD_REFRESH_BATCH_SIZE,
+                 sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep):
+        self._refresh = refresh
+        self._sleep = sleep
+        self._session_factory = session_factory
+        self.window = window
+        self.batch_size = batch_size
+        self._pending: Dict[int, None] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._received = 0
+        self._coalesced = 0
+        self._refreshed = 0
+        self._failed = 0
+        self._flushes = 0
+
+    def submit(self, student_id: int) -> None:
+        self._received += 1
+        if student_id in self._pending:
+            self._coalesced += 1
+            return
+        self._pending[student_id] = None
+        if self._task is None:
+            self._task = asyncio.create_task(self._drain_later())
+
+    async def flush(self) -> int:
+        batch, self._pending = list(self._pending), {}
+        if not batch:
+            return 0
+
+        db = self._session_factory()
+        try:
+            for start in range(0, len(batch), self.batch_size):
+                chunk = batch[start:start + self.batch_size]
+                try:
+                    await self._refresh(db, chunk)
+                    self._refreshed += len(chunk)
+                except Exception:
+                    await run_in_db_thread(db.rollback)
+                    self._failed += len(chunk)
+                    logger.exception("Error refreshing trading leaderboard for %s students", len(chunk))
+        finally:
+            db.close()
+        self._flushes += 1
+        return len(batch)
+
+    async def stop(self) -> None:
+        """Cancel the scheduled drain and refresh whatever is pending now."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _drain_later(self) -> None:
+        await self._sleep(self.window)
+        # Trades arriving while this drain runs schedule the next one.
+        self._task = None
+        await self.flush()
+
+    def snapshot(self) -> dict:
+        return {
+            "received": self._received,
+            "coalesced": self._coalesced,
+            "students_refreshed": self._refreshed,
+            "students_failed": self._failed,
+            "flushes": self._flushes,
+            "pending_students": len(self._pending),
+        }
+
+
+trading_leaderboard_refresh_queue = TradingLeaderboardRefreshQueue(trading_leaderboard_service.refresh_students)
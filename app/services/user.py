@@ -3,22 +3,22 @@ import re
 import secrets
 import string
 import uuid
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
 import pandas as pd
 from sqlalchemy import exc
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
-from app.core.constants import ADMIN_SCHOOL_NAME, RoleEnum
-from app.core.security import get_password_hash, verify_password
+from app.core.constants import ADMIN_SCHOOL_NAME, ExportFormatEnum, RoleEnum
+from app.core.security import get_password_hash_async, verify_password_async
 from app.crud.user import user as crud_user
-from app.crud.role import role as crud_role
+from app.crud.role import role_registry
 from app.crud.school import school as crud_school
 from app.crud.course_enrollment import course_enrollment as crud_course_enrollment
 from app.crud.curriculum import curriculum as crud_curriculum
 from app.crud.course import course as crud_course
-from app.crud.base import PaginatedResponse
+from app.crud.base import PaginatedResponse, approximate_count
 from app.schemas.user import (
     TeacherProfile, TeacherUpdate, UserContext, UserInvite, User as UserSchema,
     StudentProfile, BulkInviteRequest, BulkInviteResult, BulkInviteStatus,
@@ -27,6 +27,7 @@ from app.schemas.user import (
 from app.models.user import User
 from app.models.school import School
 from app.services.email import EmailService
+from app.services.export import export_service
 from app.services.notification import notification_service
 from app.services.course import course_service
 from app.services.trading import trading_service
@@ -38,10 +39,10 @@ logger = setup_logger("user_service", "user_service.log")
 class UserService:
 
     async def change_password(self, db: Session, user: User, old_password: str, new_password: str):
-        if not verify_password(old_password, user.hashed_password):
+        if not await verify_password_async(old_password, user.hashed_password):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect old password.")
 
-        hashed_password = get_password_hash(new_password)
+        hashed_password = await get_password_hash_async(new_password)
         updated_user = crud_user.update_user_password(db, user=user, hashed_password=hashed_password)
 
         await EmailService.send_email(
@@ -56,7 +57,7 @@ class UserService:
     def get_students_for_school(self, db: Session, school_id: int, current_user_context: UserContext, skip: int = 0, limit: int = 100) -> List[UserSchema]:
         permission_helper.require_school_view_permission(current_user_context, school_id)
 
-        student_role = crud_role.get_by_name(db, name=RoleEnum.STUDENT)
+        student_role = role_registry.get_by_name(db, RoleEnum.STUDENT)
         if not student_role:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Student role not found.")
 
@@ -65,7 +66,7 @@ class UserService:
     def get_teachers_for_school(self, db: Session, school_id: int, current_user_context: UserContext, skip: int = 0, limit: int = 100) -> List[UserSchema]:
         permission_helper.require_school_view_permission(current_user_context, school_id)
 
-        teacher_role = crud_role.get_by_name(db, name=RoleEnum.TEACHER)
+        teacher_role = role_registry.get_by_name(db, RoleEnum.TEACHER)
         if not teacher_role:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Teacher role not found.")
 
@@ -115,7 +116,7 @@ class UserService:
                     detail="Your role does not have permission to invite users."
                 )
 
-        role_to_assign = crud_role.get_by_name(db, name=invite_in.role_name)
+        role_to_assign = role_registry.get_by_name(db, invite_in.role_name)
         if not role_to_assign:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -181,7 +182,7 @@ class UserService:
             return existing_user
         else:
             temp_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for i in range(12))
-            hashed_password = get_password_hash(temp_password)
+            hashed_password = await get_password_hash_async(temp_password)
 
             user_in = {
                 "full_name": invite_in.full_name,
@@ -238,7 +239,7 @@ class UserService:
                 detail=f"Invited user already exists.",
             )
 
-        school_admin_role = crud_role.get_by_name(db, name=RoleEnum.SCHOOL_ADMIN)
+        school_admin_role = role_registry.get_by_name(db, RoleEnum.SCHOOL_ADMIN)
         if not school_admin_role:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -246,7 +247,7 @@ class UserService:
             )
 
         temp_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for i in range(12))
-        hashed_password = get_password_hash(temp_password)
+        hashed_password = await get_password_hash_async(temp_password)
 
         user_in = {
             "full_name": invite_in.full_name,
@@ -285,7 +286,7 @@ class UserService:
     async def update_teacher_details(self, db: Session, school_id: int, teacher_id: int, update_data: TeacherUpdate, current_user_context: UserContext) -> UserSchema:
         permission_helper.require_school_management_permission(current_user_context, school_id)
 
-        teacher_role = crud_role.get_by_name(db, name=RoleEnum.TEACHER)
+        teacher_role = role_registry.get_by_name(db, RoleEnum.TEACHER)
         if not teacher_role:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Teacher role not found.")
 
@@ -319,7 +320,7 @@ class UserService:
         role = association_result[0]
         association = association_result[1]
 
-        school_admin_role = crud_role.get_by_name(db, name=RoleEnum.SCHOOL_ADMIN)
+        school_admin_role = role_registry.get_by_name(db, RoleEnum.SCHOOL_ADMIN)
         if role.id == school_admin_role.id:
             admin_count = crud_user.get_school_admin_count(db, school_id=school_id)
             if admin_count <= 1:
@@ -334,7 +335,7 @@ class UserService:
 
         logger.info(f"User {user_id} ({user.email}) removed from school {school_id} by admin {current_user_context.user.id} ({current_user_context.user.email})")
 
-        courses = crud_course.get_courses_by_school(db, school_id=school_id)
+        courses = crud_course.get_courses_by_school(db, school_id=school_id, profile="minimal")
         for course in courses:
             try:
                 course_service.unenroll_student(db, course_id=course.id, user_id=user_id, current_user_context=current_user_context)
@@ -365,7 +366,7 @@ class UserService:
         association = association_result[1]
         old_role = role.name
 
-        new_role = crud_role.get_by_name(db, name=update_data.role_name)
+        new_role = role_registry.get_by_name(db, update_data.role_name)
         if not new_role:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -521,7 +522,7 @@ class UserService:
         user = self.get_user_profile_for_school(db, school_id, student_id, current_user_context)
 
         if not permission_helper.is_student(current_user_context):
-            student_role = crud_role.get_by_name(db, name=RoleEnum.STUDENT)
+            student_role = role_registry.get_by_name(db, RoleEnum.STUDENT)
             if not student_role:
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Student role not found.")
 
@@ -531,7 +532,7 @@ class UserService:
             if not association:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User is not a student in this school.")
 
-        enrollments = crud_course_enrollment.get_by_user(db, user_id=student_id)
+        enrollments = crud_course_enrollment.get_by_user(db, user_id=student_id, profile="minimal")
         assigned_lessons_count = len(enrollments)
 
         trading_summary = await trading_service.get_trading_account_summary(db, user_id=student_id)
@@ -552,7 +553,7 @@ class UserService:
         user = self.get_user_profile_for_school(db, school_id, teacher_id, current_user_context)
 
         if not permission_helper.is_teacher(current_user_context):
-            teacher_role = crud_role.get_by_name(db, name=RoleEnum.TEACHER)
+            teacher_role = role_registry.get_by_name(db, RoleEnum.TEACHER)
             if not teacher_role:
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Teacher role not found.")
 
@@ -562,7 +563,7 @@ class UserService:
             if not association:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User is not a teacher in this school.")
 
-        teacher_courses = crud_course.get_teacher_courses(db, user_id=teacher_id)
+        teacher_courses = crud_course.get_teacher_courses(db, user_id=teacher_id, profile="minimal")
         total_students_taught = sum(
             crud_course_enrollment.get_student_count_for_course(db, course_id=course.id)
             for course in teacher_courses
@@ -780,8 +781,7 @@ class UserService:
 
         return UserSchema.model_validate(deleted_user)
 
-    def get_all_users_for_super_admin(self, db: Session, skip: int = 0, limit: int = 50) -> List[SuperAdminUserSummary]:
-        users = crud_user.get_multi(db, skip=skip, limit=limit)
+    def _super_admin_summaries(self, users) -> List[SuperAdminUserSummary]:
         result = []
         for user in users:
             roles = [assoc.role.name for assoc in user.school_associations if assoc.role]
@@ -797,7 +797,14 @@ class UserService:
             ))
         return result
 
-    def get_all_users_for_super_admin_paginated(self, db: Session, skip: int = 0, limit: int = 50):
+    def get_all_users_for_super_admin(self, db: Session, skip: int = 0, limit: int = 50) -> List[SuperAdminUserSummary]:
+        users = crud_user.get_multi(db, skip=skip, limit=limit)
+        return self._super_admin_summaries(users)
+
+    def get_all_users_for_super_admin_paginated(self, db: Session, skip: int = 0, limit: int = 50, cursor: Optional[str] = None):
+        if cursor is not None:
+            return self._get_users_for_super_admin_by_cursor(db, cursor=cursor, limit=limit)
+
         users = self.get_all_users_for_super_admin(db, skip=skip, limit=limit)
         total_count = db.query(crud_user.model).count()
 
@@ -816,6 +823,31 @@ class UserService:
             has_previous=has_previous
         )
 
+    def export_users_for_super_admin(self, export_format: ExportFormatEnum) -> AsyncIterator[bytes]:
+        return export_service.stream(
+            crud_user.select_export_for_super_admin(),
+            ["id", "full_name", "email", "is_active", "roles", "schools", "created_at"],
+            export_format=export_format,
+            sheet_title="users",
+        )
+
+    def _get_users_for_super_admin_by_cursor(self, db: Session, cursor: str, limit: int):
+        # An empty cursor starts from the first page. The total is the planner's
+        # estimate, so deep pages never pay for OFFSET or a full COUNT(*).
+        users, next_cursor = crud_user.get_multi_keyset(db, cursor=cursor or None, limit=limit)
+        total_count = approximate_count(db, crud_user.model)
+
+        return PaginatedResponse(
+            items=self._super_admin_summaries(users),
+            total=total_count,
+            page=0,
+            size=limit,
+            pages=(total_count + limit - 1) // limit if limit > 0 else 1,
+            has_next=next_cursor is not None,
+            has_previous=bool(cursor),
+            next_cursor=next_cursor
+        )
+
     def get_user_for_super_admin(self, db: Session, user_id: int) -> UserSchema:
         user = crud_user.get(db, id=user_id)
         if not user:
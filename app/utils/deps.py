@@ -4,12 +4,12 @@ from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from app.core.config import settings
-from app.core.database import SessionLocal, get_db
+from app.core.database import SessionLocal, get_db, read_session_router
 from app.crud.user import user as user_crud
 from app.crud.school import school as crud_school
-from app.crud.role import role as crud_role
+from app.crud.role import role_registry
 from app.models.user import User
-from app.crud.token_denylist import token_denylist as token_denylist_crud
+from app.services.token_denylist import token_denylist_service
 from app.schemas.token import TokenPayload
 from app.schemas.user import UserContext
 
@@ -18,7 +18,6 @@ from app.schemas.user import UserContext
 from app.core.constants import PermissionEnum, RoleEnum
 from app.utils.permission import permission_helper
 
-from app.crud.token_denylist import token_denylist as token_denylist_crud
 from app.schemas.token import TokenPayload
 from app.schemas.user import UserContext
 
@@ -31,6 +30,14 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    """Session for read-only report/leaderboard/list queries; may be served by the replica."""
+    db = read_session_router()
+    try:
+        yield db
+    finally:
+        db.close()
+
 def get_transactional_db():
     db = SessionLocal()
     try:
@@ -44,7 +51,7 @@ def get_transactional_db():
 
 def require_permission(permission_name: PermissionEnum):
     """Dependency that checks if the current user has the required permission."""
-    def _verify_permission(context: UserContext = Depends(get_current_user_with_context)):
+    def _verify_permission(context: UserContext = Depends(get_current_user_with_context), db: Session = Depends(get_db)):
         # Super Admin bypasses all checks
         if context.role and context.role.name == RoleEnum.SUPER_ADMIN:
             return
@@ -52,8 +59,7 @@ def require_permission(permission_name: PermissionEnum):
         if not context.role:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User has no assigned role.")
 
-        user_permissions = {p.name for p in context.role.permissions}
-        if permission_name.value not in user_permissions:
+        if permission_name.value not in role_registry.get_permissions(db, context.role.id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to perform this action."
@@ -88,7 +94,7 @@ async def get_current_user(
         )
 
         jti = payload.get("jti")
-        if jti and token_denylist_crud.get_by_jti(db, jti=jti):
+        if jti and token_denylist_service.is_revoked(db, jti):
             raise HTTPException(status_code=401, detail="Token has been revoked")
 
         email: str = payload.get("sub")
@@ -148,7 +154,7 @@ def get_current_user_with_context(
             )
 
     if token_data.role_id:
-        role = crud_role.get(db, id=token_data.role_id)
+        role = role_registry.get(db, token_data.role_id)
         if not role:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1,13 +1,14 @@
 from typing import Optional
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, object_session
 
 from app.models.user import User
 from app.models.course import Course
 from app.schemas.user import UserContext
 from app.core.constants import RoleEnum
-from app.crud.role import role as crud_role
+from app.crud.role import role_registry
 from app.crud.user import user as crud_user
+from app.crud.course import course as crud_course
 
 
 class PermissionHelper:
@@ -29,11 +30,17 @@ class PermissionHelper:
 
     @staticmethod
     def is_teacher_of_course(user_id: int, course: Course) -> bool:
-        return user_id in [teacher.id for teacher in course.teachers]
+        db = object_session(course)
+        if db is None or "teachers" in course.__dict__:
+            return any(teacher.id == user_id for teacher in course.teachers)
+        return crud_course.has_teacher(db, course_id=course.id, user_id=user_id)
 
     @staticmethod
     def is_student_of_course(user_id: int, course: Course) -> bool:
-        return user_id in [student.id for student in course.students]
+        db = object_session(course)
+        if db is None or "students" in course.__dict__:
+            return any(student.id == user_id for student in course.students)
+        return crud_course.has_student(db, course_id=course.id, user_id=user_id)
 
     @staticmethod
     def belongs_to_school(context: UserContext, school_id: int) -> bool:
@@ -120,7 +127,7 @@ class PermissionHelper:
 
     @staticmethod
     def validate_user_role_in_school(db: Session, user_id: int, school_id: int, role_name: RoleEnum):
-        role = crud_role.get_by_name(db, name=role_name)
+        role = role_registry.get_by_name(db, role_name)
         if not role:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -9,6 +9,8 @@ from fastapi.exceptions import RequestValidationError
 from app.middleware.exceptions import global_exception_handler, validation_exception_handler
 from app.middleware.logging import RequestLoggingMiddleware
 from app.core.scheduler import start_scheduler, stop_scheduler
+from app.core.metrics import loop_lag_monitor
+from app.services.trading_leaderboard import trading_leaderboard_refresh_queue
 import socketio
 import asyncio
 
@@ -66,11 +68,14 @@ app.include_router(stock_options.router, prefix="/stock-options", tags=["Stock O
 async def startup_event():
     websocket_events.register_websocket_events(sio)
     asyncio.create_task(websocket_events.stream_prices_socketio(sio))
+    loop_lag_monitor.start()
     start_scheduler()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    loop_lag_monitor.stop()
     stop_scheduler()
+    await trading_leaderboard_refresh_queue.stop()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,26 @@
+"""exam content version
+
+Revision ID: 0d6b8f2e7a41
+Revises: e4a7c1d93b25
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d6b8f2e7a41'
+down_revision: Union[str, None] = 'e4a7c1d93b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('exams', sa.Column('content_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('exams', 'content_version')
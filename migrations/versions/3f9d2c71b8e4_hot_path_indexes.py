@@ -0,0 +1,54 @@
+"""hot path indexes
+
+Revision ID: 3f9d2c71b8e4
+Revises: a96c89bda0b2
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9d2c71b8e4'
+down_revision: Union[str, None] = 'a96c89bda0b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial-index predicate)
+INDEXES = [
+    ('ix_lesson_progress_enrollment_lesson', 'lesson_progress', ['enrollment_id', 'lesson_id'], None),
+    ('ix_course_enrollments_user_course_active', 'course_enrollments', ['user_id', 'course_id'], 'deleted_at IS NULL'),
+    ('ix_exam_attempts_user_exam', 'exam_attempts', ['user_id', 'exam_id'], None),
+    ('ix_trade_orders_user_executed', 'trade_orders', ['user_id', 'executed_at'], None),
+    ('ix_portfolio_snapshots_user_date', 'portfolio_snapshots', ['user_id', 'snapshot_date'], None),
+    ('ix_notifications_user_read', 'notifications', ['user_id', 'is_read'], None),
+    ('ix_token_denylist_jti', 'token_denylist', ['jti'], None),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the tables writable while the indexes build; it can't
+    # run inside a transaction, hence the autocommit block.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            if name == 'ix_token_denylist_jti':
+                # Declared on the model from the start; leave it in place.
+                continue
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,60 @@
+"""incremental leaderboard
+
+Revision ID: 5f3b8d1c6e92
+Revises: 0d6b8f2e7a41
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f3b8d1c6e92'
+down_revision: Union[str, None] = '0d6b8f2e7a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INVALID_INDEX = sa.text("""
+    SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+    WHERE pg_class.relname = :name AND NOT pg_index.indisvalid
+""")
+
+
+def upgrade() -> None:
+    # An interrupted concurrent build leaves an INVALID index behind, which
+    # if_not_exists would otherwise take for the finished one.
+    if op.get_bind().execute(INVALID_INDEX, {"name": 'uq_leaderboard_snapshots_school_student'}).scalar():
+        op.drop_index('uq_leaderboard_snapshots_school_student', table_name='leaderboard_snapshots')
+    # Rebuilds used to insert fresh rows per run; keep the newest row per
+    # student and school. Writers wait on the lock until the indexes are in,
+    # so no duplicate can slip in between the DELETE and the build.
+    op.execute("LOCK TABLE leaderboard_snapshots IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("""
+        DELETE FROM leaderboard_snapshots older
+        USING leaderboard_snapshots newer
+        WHERE older.school_id = newer.school_id
+          AND older.student_id = newer.student_id
+          AND older.id < newer.id
+    """)
+    op.create_index(
+        'uq_leaderboard_snapshots_school_student',
+        'leaderboard_snapshots',
+        ['school_id', 'student_id'],
+        unique=True,
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_leaderboard_snapshots_school_score',
+        'leaderboard_snapshots',
+        ['school_id', sa.text('total_rewards DESC'), sa.text('student_id DESC')],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_leaderboard_snapshots_school_score', table_name='leaderboard_snapshots', if_exists=True, postgresql_concurrently=True)
+        op.drop_index('uq_leaderboard_snapshots_school_student', table_name='leaderboard_snapshots', if_exists=True, postgresql_concurrently=True)
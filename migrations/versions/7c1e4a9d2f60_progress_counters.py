@@ -0,0 +1,53 @@
+"""progress counters
+
+Revision ID: 7c1e4a9d2f60
+Revises: 3f9d2c71b8e4
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4a9d2f60'
+down_revision: Union[str, None] = '3f9d2c71b8e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('courses', sa.Column('total_lessons', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('course_enrollments', sa.Column('completed_lessons', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE courses SET total_lessons = (
+            SELECT count(lessons.id)
+            FROM lessons JOIN curriculums ON lessons.curriculum_id = curriculums.id
+            WHERE curriculums.course_id = courses.id
+              AND curriculums.deleted_at IS NULL
+              AND lessons.deleted_at IS NULL
+        )
+    """)
+    op.execute("""
+        UPDATE course_enrollments SET completed_lessons = (
+            SELECT count(lesson_progress.id)
+            FROM lesson_progress
+            WHERE lesson_progress.enrollment_id = course_enrollments.id
+              AND lesson_progress.is_completed
+              AND lesson_progress.deleted_at IS NULL
+        )
+    """)
+    # Progress used to be measured against started lessons; restate it against the course.
+    op.execute("""
+        UPDATE course_enrollments SET progress_percentage = LEAST(100, course_enrollments.completed_lessons * 100 / courses.total_lessons)
+        FROM courses
+        WHERE courses.id = course_enrollments.course_id AND courses.total_lessons > 0
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('course_enrollments', 'completed_lessons')
+    op.drop_column('courses', 'total_lessons')
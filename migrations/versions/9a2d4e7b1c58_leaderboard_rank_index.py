@@ -0,0 +1,35 @@
+"""leaderboard rank index
+
+Revision ID: 9a2d4e7b1c58
+Revises: 5f3b8d1c6e92
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a2d4e7b1c58'
+down_revision: Union[str, None] = '5f3b8d1c6e92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # uq_leaderboard_snapshots_school_student and ix_leaderboard_snapshots_school_score
+    # both lead with school_id, so the single-column index only steals plans from them.
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_leaderboard_snapshots_school_id', table_name='leaderboard_snapshots', if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_leaderboard_snapshots_school_id',
+            'leaderboard_snapshots',
+            ['school_id'],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
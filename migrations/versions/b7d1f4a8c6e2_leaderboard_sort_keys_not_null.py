@@ -0,0 +1,33 @@
+"""leaderboard sort keys not null
+
+Revision ID: b7d1f4a8c6e2
+Revises: f2b6d8e1a3c4
+Create Date: 2026-10-20 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d1f4a8c6e2'
+down_revision: Union[str, None] = 'f2b6d8e1a3c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Leaderboard pages sort on (total_rewards, student_id), ties going to the
+    # higher student id as in the rank index. Keyset pages compare those as
+    # row values, which skip rows holding a NULL, so neither may be NULL.
+    op.execute("DELETE FROM leaderboard_snapshots WHERE student_id IS NULL")
+    op.execute("UPDATE leaderboard_snapshots SET total_rewards = 0 WHERE total_rewards IS NULL")
+    op.alter_column('leaderboard_snapshots', 'student_id', existing_type=sa.Integer(), nullable=False)
+    op.alter_column('leaderboard_snapshots', 'total_rewards', existing_type=sa.Integer(), nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('leaderboard_snapshots', 'total_rewards', existing_type=sa.Integer(), nullable=True)
+    op.alter_column('leaderboard_snapshots', 'student_id', existing_type=sa.Integer(), nullable=True)
@@ -0,0 +1,53 @@
+"""trading leaderboard unique student
+
+Revision ID: c2e8a6d4f9b3
+Revises: b7d1f4a8c6e2
+Create Date: 2026-10-20 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8a6d4f9b3'
+down_revision: Union[str, None] = 'b7d1f4a8c6e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INVALID_INDEX = sa.text("""
+    SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+    WHERE pg_class.relname = :name AND NOT pg_index.indisvalid
+""")
+
+
+def upgrade() -> None:
+    # An interrupted concurrent build leaves an INVALID index behind, which
+    # if_not_exists would otherwise take for the finished one.
+    if op.get_bind().execute(INVALID_INDEX, {"name": 'uq_trading_leaderboard_snapshots_school_student'}).scalar():
+        op.drop_index('uq_trading_leaderboard_snapshots_school_student', table_name='trading_leaderboard_snapshots')
+    # Interleaved school and student refreshes could insert the same student
+    # twice; keep the newest row of each pair before adding the key. Writers
+    # wait on the lock until the index is in, so no duplicate can slip in
+    # between the DELETE and the build.
+    op.execute("LOCK TABLE trading_leaderboard_snapshots IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("""
+        DELETE FROM trading_leaderboard_snapshots
+        WHERE id NOT IN (
+            SELECT max(id) FROM trading_leaderboard_snapshots GROUP BY school_id, student_id
+        )
+    """)
+    op.create_index(
+        'uq_trading_leaderboard_snapshots_school_student',
+        'trading_leaderboard_snapshots',
+        ['school_id', 'student_id'],
+        unique=True,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_trading_leaderboard_snapshots_school_student', table_name='trading_leaderboard_snapshots', if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,53 @@
+"""daily report rollups
+
+Revision ID: c3e8f1a4d927
+Revises: 9a2d4e7b1c58
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8f1a4d927'
+down_revision: Union[str, None] = '9a2d4e7b1c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'school_daily_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('school_id', sa.Integer(), sa.ForeignKey('schools.id'), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('courses', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('students', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('teachers', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('staff', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('lessons_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('exam_score', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Float(), nullable=False, server_default='0'),
+        if_not_exists=True,
+    )
+    op.create_index('ix_school_daily_rollups_id', 'school_daily_rollups', ['id'], if_not_exists=True)
+    op.create_index('uq_school_daily_rollups_school_day', 'school_daily_rollups', ['school_id', 'day'], unique=True, if_not_exists=True)
+    op.create_index('ix_school_daily_rollups_day', 'school_daily_rollups', ['day'], if_not_exists=True)
+    op.create_table(
+        'platform_daily_rollups',
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('computed_at', sa.DateTime(), nullable=True),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('platform_daily_rollups', if_exists=True)
+    op.drop_index('ix_school_daily_rollups_day', table_name='school_daily_rollups', if_exists=True)
+    op.drop_index('uq_school_daily_rollups_school_day', table_name='school_daily_rollups', if_exists=True)
+    op.drop_index('ix_school_daily_rollups_id', table_name='school_daily_rollups', if_exists=True)
+    op.drop_table('school_daily_rollups', if_exists=True)
@@ -0,0 +1,31 @@
+"""token denylist created_at
+
+Revision ID: d81f5a2c6b03
+Revises: c3e8f1a4d927
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f5a2c6b03'
+down_revision: Union[str, None] = 'c3e8f1a4d927'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'token_denylist',
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_token_denylist_created_at', 'token_denylist', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_token_denylist_created_at', table_name='token_denylist')
+    op.drop_column('token_denylist', 'created_at')
@@ -0,0 +1,53 @@
+"""user answer upsert key
+
+Revision ID: e4a7c1d93b25
+Revises: b52e0f3c9a17
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c1d93b25'
+down_revision: Union[str, None] = 'b52e0f3c9a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INVALID_INDEX = sa.text("""
+    SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+    WHERE pg_class.relname = :name AND NOT pg_index.indisvalid
+""")
+
+
+def upgrade() -> None:
+    # An interrupted concurrent build leaves an INVALID index behind, which
+    # if_not_exists would otherwise take for the finished one.
+    if op.get_bind().execute(INVALID_INDEX, {"name": 'uq_user_answers_attempt_question'}).scalar():
+        op.drop_index('uq_user_answers_attempt_question', table_name='user_answers')
+    # Earlier racing submits could leave duplicates; keep the newest answer.
+    # Writers wait on the lock until the index is in, so none can slip in
+    # between the DELETE and the build.
+    op.execute("LOCK TABLE user_answers IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("""
+        DELETE FROM user_answers older
+        USING user_answers newer
+        WHERE older.exam_attempt_id = newer.exam_attempt_id
+          AND older.question_id = newer.question_id
+          AND older.id < newer.id
+    """)
+    op.create_index(
+        'uq_user_answers_attempt_question',
+        'user_answers',
+        ['exam_attempt_id', 'question_id'],
+        unique=True,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_user_answers_attempt_question', table_name='user_answers', if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,34 @@
+"""trade orders user id index
+
+Revision ID: e4a7c2d9f815
+Revises: d81f5a2c6b03
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2d9f815'
+down_revision: Union[str, None] = 'd81f5a2c6b03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Trade history cursor pages walk a user's orders by id.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_trade_orders_user_id_id',
+            'trade_orders',
+            ['user_id', 'id'],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_trade_orders_user_id_id', table_name='trade_orders', if_exists=True, postgresql_concurrently=True)
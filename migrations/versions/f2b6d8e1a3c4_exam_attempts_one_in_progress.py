@@ -0,0 +1,73 @@
+"""one in-progress exam attempt per user and exam
+
+Revision ID: f2b6d8e1a3c4
+Revises: e4a7c2d9f815
+Create Date: 2026-10-20 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6d8e1a3c4'
+down_revision: Union[str, None] = 'e4a7c2d9f815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INVALID_INDEX = sa.text("""
+    SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+    WHERE pg_class.relname = :name AND NOT pg_index.indisvalid
+""")
+
+
+def upgrade() -> None:
+    # An interrupted concurrent build leaves an INVALID index behind, which
+    # if_not_exists would otherwise take for the finished one.
+    if op.get_bind().execute(INVALID_INDEX, {"name": 'uq_exam_attempts_user_exam_in_progress'}).scalar():
+        op.drop_index('uq_exam_attempts_user_exam_in_progress', table_name='exam_attempts')
+    # Concurrent starts could open more than one attempt. Nobody submitted
+    # the extras, so fold them into the newest open attempt instead of
+    # closing them: their answers move over (the newest answer per question
+    # wins) and the empty attempts go. Writers wait on the locks until the
+    # index is in, so no new duplicate can slip in before the build.
+    op.execute("LOCK TABLE exam_attempts, user_answers IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("""
+        CREATE TEMPORARY TABLE open_attempt_keepers ON COMMIT DROP AS
+        SELECT id, max(id) OVER (PARTITION BY user_id, exam_id) AS keeper_id
+        FROM exam_attempts WHERE status = 'IN_PROGRESS'
+    """)
+    op.execute("""
+        DELETE FROM user_answers older
+        USING open_attempt_keepers older_attempt, user_answers newer, open_attempt_keepers newer_attempt
+        WHERE older.exam_attempt_id = older_attempt.id
+          AND newer.exam_attempt_id = newer_attempt.id
+          AND newer_attempt.keeper_id = older_attempt.keeper_id
+          AND newer.question_id = older.question_id
+          AND newer.id > older.id
+    """)
+    op.execute("""
+        UPDATE user_answers SET exam_attempt_id = keepers.keeper_id
+        FROM open_attempt_keepers keepers
+        WHERE user_answers.exam_attempt_id = keepers.id AND keepers.id <> keepers.keeper_id
+    """)
+    op.execute("""
+        DELETE FROM exam_attempts
+        USING open_attempt_keepers keepers
+        WHERE exam_attempts.id = keepers.id AND keepers.id <> keepers.keeper_id
+    """)
+    op.create_index(
+        'uq_exam_attempts_user_exam_in_progress',
+        'exam_attempts',
+        ['user_id', 'exam_id'],
+        unique=True,
+        if_not_exists=True,
+        postgresql_where=sa.text("status = 'IN_PROGRESS'"),
+    )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_exam_attempts_user_exam_in_progress', table_name='exam_attempts', if_exists=True, postgresql_concurrently=True)
@@ -6,8 +6,8 @@ os.environ["TESTING"] = "true"
 
 import pytest
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.database import Base, get_db
 from app.utils import deps as deps_utils
 import main
@@ -16,14 +16,24 @@ from app.crud.user import user as crud_user
 from app.core.security import get_password_hash
 from app.models.user import User
 from app.models.school import School
-from app.models.user_school_association import UserSchoolAssociation
+from app.models.user_school_association import UserSchoolAssociation, user_school_association
+from app.models.course import Course, course_students_association
+from app.models.course_enrollment import CourseEnrollment
+from app.models.curriculum import Curriculum
+from app.models.exam import Exam
+from app.models.lesson import Lesson
+from app.models.report import LeaderboardSnapshot
 from app.core.constants import ADMIN_SCHOOL_NAME, RoleEnum
 from app.crud.school import school as crud_school
 from app.crud.role import role as crud_role
 import uuid
 from app.core.config import settings
+from datetime import datetime
+from typing import Iterable, List, Sequence
 from unittest.mock import AsyncMock, patch
 
+pytest_plugins = ["tests.helpers.query_budget"]
+
 test_db_url = settings.TEST_DATABASE_URL or "sqlite:///./test.db"
 
 @pytest.fixture(scope="session")
@@ -33,6 +43,11 @@ def database_engine():
     else:
         engine = create_engine(test_db_url)
     Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so indexes added to models later would
+    # never reach a reused test database without this.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     yield engine
     if test_db_url.startswith("sqlite"):
         os.remove("./test.db")
@@ -47,6 +62,101 @@ def db_session(database_engine):
         db.rollback()
         db.close()
 
+@pytest.fixture
+def savepoint_session(database_engine):
+    """A session whose commits only release a savepoint, so nothing is persisted."""
+    with database_engine.connect() as connection:
+        outer = connection.begin()
+        db = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            yield db
+        finally:
+            db.close()
+            outer.rollback()
+
+@pytest.fixture
+def make_school():
+    """Insert a school with a unique name through the given session and return its id."""
+    def make(db: Session, name: str = "Test School") -> int:
+        return db.execute(insert(School).values(name=f"{name} {uuid.uuid4().hex[:8]}").returning(School.id)).scalar_one()
+    return make
+
+# Row builders for tests that set up data directly. Each inserts through the
+# given session, so savepoint_session and db_session tests share them, and
+# returns the new ids.
+
+@pytest.fixture
+def make_user():
+    def make(db: Session, full_name: str = "Test User", **values) -> int:
+        email = f"user-{uuid.uuid4().hex[:8]}@test.com"
+        return db.execute(insert(User).values(full_name=full_name, email=email, **values).returning(User.id)).scalar_one()
+    return make
+
+@pytest.fixture
+def make_users():
+    def make(db: Session, count: int, full_name: str = "Test User") -> List[int]:
+        tag = uuid.uuid4().hex[:8]
+        rows = [{"full_name": f"{full_name} {i}", "email": f"user-{tag}-{i}@test.com"} for i in range(count)]
+        return db.execute(insert(User).returning(User.id, sort_by_parameter_order=True), rows).scalars().all()
+    return make
+
+@pytest.fixture
+def add_to_school():
+    """Give the users a role in the school."""
+    def add(db: Session, school_id: int, user_ids: Sequence[int], role_id: int) -> None:
+        db.execute(insert(user_school_association), [{"user_id": uid, "school_id": school_id, "role_id": role_id} for uid in user_ids])
+    return add
+
+@pytest.fixture
+def make_course():
+    def make(db: Session, school_id: int, title: str = "Test Course", **values) -> int:
+        return db.execute(insert(Course).values(title=title, school_id=school_id, **values).returning(Course.id)).scalar_one()
+    return make
+
+@pytest.fixture
+def add_course_students():
+    def add(db: Session, course_id: int, user_ids: Sequence[int]) -> None:
+        db.execute(insert(course_students_association), [{"course_id": course_id, "user_id": uid} for uid in user_ids])
+    return add
+
+@pytest.fixture
+def make_enrollment():
+    def make(db: Session, user_id: int, course_id: int, **values) -> int:
+        return db.execute(insert(CourseEnrollment).values(user_id=user_id, course_id=course_id, **values).returning(CourseEnrollment.id)).scalar_one()
+    return make
+
+@pytest.fixture
+def make_curriculum():
+    def make(db: Session, course_id: int, title: str = "Unit") -> int:
+        return db.execute(insert(Curriculum).values(title=title, course_id=course_id).returning(Curriculum.id)).scalar_one()
+    return make
+
+@pytest.fixture
+def make_lessons():
+    """Insert ``count`` lessons into the curriculum, ordered as created."""
+    def make(db: Session, curriculum_id: int, count: int, title: str = "Lesson") -> List[int]:
+        rows = [{"title": f"{title} {i}", "curriculum_id": curriculum_id, "order": i} for i in range(count)]
+        return db.execute(insert(Lesson).returning(Lesson.id, sort_by_parameter_order=True), rows).scalars().all()
+    return make
+
+@pytest.fixture
+def make_leaderboard_rows():
+    """Insert leaderboard rows for the school; each dict needs a student_id and overrides the zeroed defaults."""
+    def make(db: Session, school_id: int, rows: Iterable[dict]) -> None:
+        now = datetime.utcnow()
+        db.execute(insert(LeaderboardSnapshot), [
+            {"school_id": school_id, "student_full_name": f"S{row['student_id']}", "student_email": f"s{row['student_id']}@test.com",
+             "lessons_completed": 0, "accumulated_exam_score": 0.0, "total_rewards": 0, "timestamp": now, **row}
+            for row in rows
+        ])
+    return make
+
+@pytest.fixture
+def make_exam():
+    def make(db: Session, course_id: int, title: str = "Exam", **values) -> int:
+        return db.execute(insert(Exam).values(title=title, course_id=course_id, **values).returning(Exam.id)).scalar_one()
+    return make
+
 @pytest.fixture(scope="function")
 def client(db_session):
     # Re-initialize the app for each test function to ensure a clean state
@@ -56,6 +166,7 @@ def client(db_session):
 
     main.app.dependency_overrides[get_db] = lambda: db_session
     main.app.dependency_overrides[deps_utils.get_db] = lambda: db_session
+    main.app.dependency_overrides[deps_utils.get_read_db] = lambda: db_session
 
     def get_transactional_db_override():
         try:
@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+import pytest
+
+from app.core.metrics import RequestQueryStats, query_metrics, query_stats
+
+
+@contextmanager
+def count_queries() -> Iterator[RequestQueryStats]:
+    """Count the SQL statements run inside the block, as the request middleware does."""
+    stats = RequestQueryStats()
+    token = query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        query_stats.reset(token)
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(default, routes=None): fail the test if any request issues more SQL statements "
+        "than its budget; routes maps 'METHOD /route/{template}' to a per-endpoint budget",
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+
+    default = marker.args[0] if marker.args else marker.kwargs.get("default")
+    routes: Dict[str, int] = marker.kwargs.get("routes") or {}
+    seen: List[Tuple[str, RequestQueryStats]] = []
+
+    def listener(route: str, stats: RequestQueryStats):
+        seen.append((route, stats))
+
+    query_metrics.add_listener(listener)
+    try:
+        result = yield
+    finally:
+        query_metrics.remove_listener(listener)
+
+    over = []
+    for route, stats in seen:
+        budget = routes.get(route, default)
+        if budget is not None and stats.count > budget:
+            worst, times = stats.statements.most_common(1)[0]
+            over.append(f"{route}: {stats.count} queries (budget {budget}); most repeated {times}x: {' '.join(worst.split())[:200]}")
+    if over:
+        pytest.fail("Query budget exceeded:\n" + "\n".join(over), pytrace=False)
+    return result
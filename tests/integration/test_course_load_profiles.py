@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.crud.course import course as crud_course
+from app.models.course_enrollment import CourseEnrollment
+from app.models.user import User
+from tests.helpers.query_budget import count_queries
+
+ENROLLED_STUDENTS = 5000
+
+
+@pytest.fixture
+def large_course(db_session: Session, make_school, make_course, make_users, add_course_students):
+    course_id = make_course(db_session, make_school(db_session, "Load Profile School"), "Large Course")
+    user_ids = make_users(db_session, ENROLLED_STUDENTS, "Student")
+    add_course_students(db_session, course_id, user_ids)
+    db_session.execute(insert(CourseEnrollment), [{"course_id": course_id, "user_id": uid, "progress_percentage": 0} for uid in user_ids])
+    db_session.expunge_all()
+    return course_id
+
+
+def _load(db: Session, course_id: int, profile: str):
+    db.expunge_all()
+    with count_queries() as stats:
+        course = crud_course.get(db, id=course_id, profile=profile)
+    loaded = {
+        "users": sum(1 for obj in db.identity_map.values() if isinstance(obj, User)),
+        "enrollments": sum(1 for obj in db.identity_map.values() if isinstance(obj, CourseEnrollment)),
+    }
+    return course, stats.count, loaded
+
+
+def test_profiles_only_load_what_they_name(db_session: Session, large_course):
+    course, _, loaded = _load(db_session, large_course, "minimal")
+    assert course.id == large_course
+    assert loaded == {"users": 0, "enrollments": 0}
+
+    course, _, loaded = _load(db_session, large_course, "detail")
+    assert loaded["enrollments"] == 0
+    assert course.total_enrolled_students == ENROLLED_STUDENTS
+
+    _, _, loaded = _load(db_session, large_course, "progress")
+    assert loaded["enrollments"] == ENROLLED_STUDENTS
+
+
+def test_minimal_profile_is_a_single_statement_on_large_course(db_session: Session, large_course):
+    queries = {profile: _load(db_session, large_course, profile)[1] for profile in ("minimal", "detail", "progress")}
+
+    assert queries["minimal"] == 1
+    # The progress profile pulls every enrollment and its lesson progress, in
+    # IN-batches that grow with the roster.
+    assert queries["progress"] > queries["detail"] > queries["minimal"]
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.crud.course import course as crud_course
+from app.models.course import course_teachers_association
+from app.models.user import User
+from app.utils.permission import PermissionHelper
+from tests.helpers.query_budget import count_queries
+
+ROSTER_SIZE = 2000
+
+
+@pytest.fixture
+def roster(db_session: Session, make_school, make_course, make_users, add_course_students):
+    course_id = make_course(db_session, make_school(db_session, "Membership School"), "Membership Course")
+    teacher_id, *student_ids = make_users(db_session, ROSTER_SIZE + 1, "Member")
+    db_session.execute(insert(course_teachers_association).values(course_id=course_id, user_id=teacher_id))
+    add_course_students(db_session, course_id, student_ids)
+    db_session.expunge_all()
+    return course_id, teacher_id, student_ids
+
+
+def _count_queries(fn):
+    with count_queries() as stats:
+        result = fn()
+    return result, stats.count
+
+
+def test_membership_is_one_exists_query_without_loading_roster(db_session: Session, roster):
+    course_id, teacher_id, student_ids = roster
+    course = crud_course.get(db_session, id=course_id, profile="minimal")
+
+    is_student, queries = _count_queries(lambda: PermissionHelper.is_student_of_course(student_ids[-1], course))
+    assert is_student
+    assert queries == 1
+    assert "students" not in course.__dict__
+    assert not any(isinstance(obj, User) for obj in db_session.identity_map.values())
+
+    is_teacher, queries = _count_queries(lambda: PermissionHelper.is_teacher_of_course(teacher_id, course))
+    assert is_teacher
+    assert queries == 1
+    assert not PermissionHelper.is_teacher_of_course(student_ids[0], course)
+
+
+def test_membership_is_memoized_and_forgotten_on_change(db_session: Session, roster):
+    course_id, _, student_ids = roster
+    course = crud_course.get(db_session, id=course_id, profile="minimal")
+    student = db_session.get(User, student_ids[0])
+
+    assert PermissionHelper.is_student_of_course(student.id, course)
+    _, queries = _count_queries(lambda: PermissionHelper.is_student_of_course(student.id, course))
+    assert queries == 0
+
+    crud_course.unenroll_student_from_course(db_session, course=course, user=student)
+    db_session.flush()
+    db_session.expire(course, ["students"])
+
+    assert not PermissionHelper.is_student_of_course(student.id, course)
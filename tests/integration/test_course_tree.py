@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.crud.course import course as crud_course
+from app.models.course import Course
+from app.models.curriculum import Curriculum
+from app.models.lesson import Lesson
+from app.models.lesson_progress import LessonProgress
+from app.services.course_tree import CourseTreeService
+from tests.helpers.query_budget import count_queries
+
+
+@pytest.fixture
+def course_factory(db_session: Session, make_school, make_course, make_curriculum, make_lessons):
+    school_id = make_school(db_session, "Tree School")
+
+    def make(lessons: int = 3) -> int:
+        course_id = make_course(db_session, school_id, "Tree Course")
+        make_lessons(db_session, make_curriculum(db_session, course_id), lessons)
+        return course_id
+
+    return make
+
+
+def _load(db: Session, course_ids):
+    db.expire_all()
+    return crud_course.get_batch_with_relationships(db, course_ids, profile="minimal")
+
+
+def _count_queries(fn):
+    with count_queries() as stats:
+        result = fn()
+    return result, stats.count
+
+
+def test_tree_is_cached_per_content_version(db_session: Session, course_factory, make_user):
+    course_id = course_factory()
+    user_id = make_user(db_session)
+    service = CourseTreeService()
+
+    first = service.build(db_session, _load(db_session, [course_id]), user_id)[0]
+    assert [lesson.title for lesson in first.curriculums[0].lessons] == ["Lesson 0", "Lesson 1", "Lesson 2"]
+
+    courses = _load(db_session, [course_id])
+    _, cached_queries = _count_queries(lambda: service.build(db_session, courses, user_id))
+    courses = _load(db_session, [course_id])
+    service._trees.clear()
+    _, cold_queries = _count_queries(lambda: service.build(db_session, courses, user_id))
+    assert cached_queries == cold_queries - 1
+
+    lesson = db_session.query(Lesson).filter(Lesson.title == "Lesson 1").join(Curriculum).filter(Curriculum.course_id == course_id).one()
+    lesson.title = "Renamed"
+    db_session.flush()
+
+    refreshed = service.build(db_session, _load(db_session, [course_id]), user_id)[0]
+    assert [lesson.title for lesson in refreshed.curriculums[0].lessons] == ["Lesson 0", "Renamed", "Lesson 2"]
+    assert service.snapshot()["misses"] == 3
+
+
+def test_progress_overlay_is_per_user(db_session: Session, course_factory, make_user, make_enrollment):
+    course_id = course_factory()
+    learner, visitor = make_user(db_session), make_user(db_session)
+    first_lesson = db_session.query(Lesson).join(Curriculum).filter(Curriculum.course_id == course_id).order_by(Lesson.order).first()
+    enrollment_id = make_enrollment(db_session, learner, course_id, progress_percentage=33)
+    db_session.execute(insert(LessonProgress).values(enrollment_id=enrollment_id, lesson_id=first_lesson.id, is_completed=True, time_spent_seconds=90))
+    service = CourseTreeService()
+
+    mine = service.build(db_session, _load(db_session, [course_id]), learner)[0]
+    theirs = service.build(db_session, _load(db_session, [course_id]), visitor)[0]
+
+    assert mine.user_progress_percentage == 33
+    assert [lesson.is_completed for lesson in mine.curriculums[0].lessons] == [True, False, False]
+    assert mine.curriculums[0].lessons[0].time_spent_seconds == 90
+    assert theirs.user_progress_percentage == 0
+    assert [lesson.is_completed for lesson in theirs.curriculums[0].lessons] == [False, False, False]
+
+
+def test_query_count_does_not_grow_with_courses(db_session: Session, course_factory, make_user):
+    user_id = make_user(db_session)
+    few = [course_factory() for _ in range(2)]
+    many = [course_factory() for _ in range(8)]
+
+    _, few_queries = _count_queries(lambda: CourseTreeService().build(db_session, _load(db_session, few), user_id))
+    _, many_queries = _count_queries(lambda: CourseTreeService().build(db_session, _load(db_session, many), user_id))
+
+    assert few_queries == many_queries
+
+
+def test_moving_a_curriculum_bumps_both_course_versions(db_session: Session, course_factory):
+    source_id, target_id = course_factory(), course_factory()
+
+    def versions():
+        return [db_session.get(Course, course_id).content_version for course_id in (source_id, target_id)]
+
+    db_session.expire_all()
+    before = versions()
+
+    curriculum = db_session.query(Curriculum).filter(Curriculum.course_id == source_id).one()
+    db_session.expire(curriculum)
+    curriculum.course_id = target_id
+    db_session.flush()
+    db_session.expire_all()
+
+    assert versions() == [before[0] + 1, before[1] + 1]
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.constants import QuestionTypeEnum
+from app.crud.exam import exam as crud_exam
+from app.models.question import Question
+from app.services.exam_content import ExamContentService
+from tests.helpers.query_budget import count_queries
+
+
+@pytest.fixture
+def exam_id(db_session: Session, make_school, make_course, make_exam):
+    course_id = make_course(db_session, make_school(db_session, "Exam Cache School"), "Exam Cache Course")
+    exam_id = make_exam(db_session, course_id, "Midterm")
+    db_session.add_all([
+        Question(exam_id=exam_id, question_text=f"Q{i}", question_type=QuestionTypeEnum.MULTIPLE_CHOICE, correct_answer=i % 4)
+        for i in range(5)
+    ])
+    db_session.flush()
+    return exam_id
+
+
+def _load(db: Session, exam_id: int):
+    db.expire_all()
+    return crud_exam.get_minimal(db, id=exam_id)
+
+
+def _questions(service: ExamContentService, db: Session, exam):
+    with count_queries() as stats:
+        questions = service.get_questions(db, exam)
+    return questions, stats.count
+
+
+def test_batch_of_question_writes_bumps_the_version_once(db_session: Session, exam_id):
+    assert _load(db_session, exam_id).content_version == 1
+
+
+def test_question_set_is_served_from_cache_until_a_question_changes(db_session: Session, exam_id):
+    service = ExamContentService()
+
+    cold, cold_queries = _questions(service, db_session, _load(db_session, exam_id))
+    warm, warm_queries = _questions(service, db_session, _load(db_session, exam_id))
+    assert cold_queries == 1
+    assert warm_queries == 0
+    assert warm is cold
+    assert [q.question_text for q in warm] == [f"Q{i}" for i in range(5)]
+
+    question = db_session.query(Question).filter(Question.exam_id == exam_id, Question.question_text == "Q2").one()
+    question.points = 7
+    db_session.flush()
+
+    refreshed, refreshed_queries = _questions(service, db_session, _load(db_session, exam_id))
+    assert refreshed_queries == 1
+    assert [q.points for q in refreshed] == [1, 1, 7, 1, 1]
+    assert [q.points for q in cold] == [1] * 5
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.constants import QuestionTypeEnum
+from app.crud.exam import exam as crud_exam
+from app.crud.exam_attempt import exam_attempt as crud_exam_attempt
+from app.models.exam_attempt import ExamAttempt
+from app.models.question import Question
+from app.models.user_answer import UserAnswer
+from app.services.exam_content import ExamContentService
+from app.services.exam_grading import ExamGrader
+from tests.helpers.query_budget import count_queries
+
+QUESTIONS = 250
+
+
+@pytest.fixture
+def answered_attempt(db_session: Session, make_school, make_course, make_exam, make_user):
+    course_id = make_course(db_session, make_school(db_session, "Grading School"), "Grading Course")
+    exam_id = make_exam(db_session, course_id, "Final", pass_percentage=50)
+    question_ids = db_session.execute(insert(Question).returning(Question.id, sort_by_parameter_order=True), [
+        {"exam_id": exam_id, "question_text": f"Q{i}", "question_type": QuestionTypeEnum.MULTIPLE_CHOICE, "correct_answer": i % 4, "points": 2}
+        for i in range(QUESTIONS)
+    ]).scalars().all()
+    user_id = make_user(db_session, "Examinee")
+    attempt_id = db_session.execute(insert(ExamAttempt).values(user_id=user_id, exam_id=exam_id).returning(ExamAttempt.id)).scalar_one()
+    # Every third question is answered correctly, the last ten are left blank.
+    db_session.execute(insert(UserAnswer), [
+        {"exam_attempt_id": attempt_id, "question_id": qid, "user_id": user_id, "answer_text": i % 4 if i % 3 == 0 else (i + 1) % 4}
+        for i, qid in enumerate(question_ids[:-10])
+    ])
+    return exam_id, attempt_id
+
+
+@pytest.mark.parametrize("vectorize_from", [1, 10**6])
+def test_attempt_is_graded_with_a_single_write(db_session: Session, answered_attempt, monkeypatch, vectorize_from):
+    monkeypatch.setattr(settings, "EXAM_GRADING_VECTORIZE_MIN_QUESTIONS", vectorize_from)
+    exam_id, attempt_id = answered_attempt
+    exam = crud_exam.get_minimal(db_session, id=exam_id)
+    attempt = crud_exam_attempt.get(db_session, id=attempt_id)
+    questions = ExamContentService().get_questions(db_session, exam)
+
+    with count_queries() as stats:
+        score, passed = ExamGrader().grade(db_session, exam, attempt, questions)
+
+    correct = len(range(0, QUESTIONS - 10, 3))
+    assert stats.count == 1
+    assert len(questions) == QUESTIONS
+    assert score == correct * 2.0
+    assert passed is False
+    assert sorted(a.score for a in attempt.user_answers if a.is_correct) == [2.0] * correct
+
+    db_session.expire_all()
+    stored = db_session.query(UserAnswer).filter(UserAnswer.exam_attempt_id == attempt_id).all()
+    assert sum(a.is_correct for a in stored) == correct
+    assert sum(a.score for a in stored) == score
+
+
+def test_vectorized_scoring_matches_scalar_scoring():
+    points = [1, 2, 3, 4, 5]
+    correct = [0, 1, None, 3, 2]
+    chosen = [0, 2, 1, None, 2]
+
+    assert ExamGrader._score_vectorized(points, correct, chosen) == ExamGrader._score(points, correct, chosen)
+    assert ExamGrader._score(points, correct, chosen) == ([True, False, False, False, True], [1.0, 0.0, 0.0, 0.0, 5.0])
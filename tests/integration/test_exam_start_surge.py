@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.constants import ADMIN_SCHOOL_NAME, ExamAttemptStatusEnum
+from app.crud.course import course as crud_course
+from app.crud.exam import exam as crud_exam
+from app.crud.exam_attempt import exam_attempt as crud_exam_attempt
+from app.crud.school import school as crud_school
+from app.models.exam_attempt import ExamAttempt
+from app.models.school import School
+from app.models.user import User
+from app.schemas.role import Role
+from app.schemas.user import UserContext
+from app.services.exam_attempt import exam_attempt_service
+from app.services.exam_eligibility import exam_eligibility_service
+
+CLASS_SIZE = 500
+
+
+@pytest.fixture
+def crowded_exam(savepoint_session: Session, make_school, make_course, make_exam, make_users, add_course_students):
+    """A course with CLASS_SIZE students and an exam, rolled back after the test."""
+    school_id = make_school(savepoint_session, "Surge School")
+    course_id = make_course(savepoint_session, school_id, "Surge Course")
+    exam_id = make_exam(savepoint_session, course_id, "Timed Exam")
+    user_ids = make_users(savepoint_session, CLASS_SIZE, "Student")
+    add_course_students(savepoint_session, course_id, user_ids)
+    exam_eligibility_service.invalidate_course(course_id)
+    return school_id, course_id, exam_id, user_ids
+
+
+def _student(db: Session, school_id: int, user: User) -> UserContext:
+    return UserContext(school=db.get(School, school_id), role=Role(id=0, name="student"), user=user)
+
+
+def test_class_wide_start_loads_the_roster_once(savepoint_session: Session, crowded_exam, monkeypatch):
+    db = savepoint_session
+    school_id, course_id, exam_id, user_ids = crowded_exam
+    roster_loads = []
+    load_roster = crud_course.get_school_and_student_ids
+    monkeypatch.setattr(crud_course, "get_school_and_student_ids", lambda db, course_id: roster_loads.append(course_id) or load_roster(db, course_id))
+
+    # Only the one loader touches the session; the other starters wait for
+    # its snapshot, so the surge can share the test's connection.
+    exam = crud_exam.get_minimal(db, id=exam_id)
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        rosters = list(pool.map(lambda _: exam_eligibility_service.get_roster(db, exam), range(CLASS_SIZE)))
+    assert {roster[2] for roster in rosters} == {frozenset(user_ids)}
+
+    started = [
+        exam_attempt_service.start_exam_attempt(db, exam_id=exam_id, current_user_context=_student(db, school_id, user)).user_id
+        for user in db.query(User).filter(User.id.in_(user_ids))
+    ]
+
+    assert sorted(started) == sorted(user_ids)
+    assert roster_loads == [course_id]
+    assert db.query(ExamAttempt).filter(ExamAttempt.exam_id == exam_id).count() == CLASS_SIZE
+
+
+def test_opened_exam_is_resumed_by_students(client: TestClient, token_for_role, db_session: Session):
+    teacher = {"Authorization": f"Bearer {token_for_role('teacher')}"}
+    student = {"Authorization": f"Bearer {token_for_role('student')}"}
+    school = crud_school.get_by_name(db_session, name=ADMIN_SCHOOL_NAME)
+    course_id = client.post("/courses/", headers=teacher, json={"title": "Open Exam Course", "school_id": school.id}).json()["data"]["id"]
+    exam_id = client.post("/exams/", headers=teacher, json={"title": "Open Exam", "course_id": course_id}).json()["data"]["id"]
+    student_id = client.get("/account/me", headers=student).json()["data"]["id"]
+    client.post(f"/courses/{course_id}/students/{student_id}", headers=teacher)
+
+    opened = client.post(f"/exams/{exam_id}/attempts/open", headers=teacher)
+    assert opened.status_code == 200, opened.text
+    assert opened.json()["data"]["attempts_created"] == 1
+    assert client.post(f"/exams/{exam_id}/attempts/open", headers=teacher).json()["data"]["attempts_created"] == 0
+    assert client.post(f"/exams/{exam_id}/attempts/open", headers=student).status_code == 403
+
+    first = client.post(f"/exams/{exam_id}/attempts", headers=student).json()["data"]
+    again = client.post(f"/exams/{exam_id}/attempts", headers=student).json()["data"]
+    assert first["id"] == again["id"]
+    assert first["status"] == ExamAttemptStatusEnum.IN_PROGRESS.value
+
+    assert client.post(f"/exams/attempts/{first['id']}/submit", headers=student).status_code == 200
+    assert client.post(f"/exams/{exam_id}/attempts", headers=student).status_code == 409
+
+
+def test_concurrent_starts_by_one_student_share_an_attempt(savepoint_session: Session, crowded_exam, monkeypatch):
+    db = savepoint_session
+    school_id, _, exam_id, user_ids = crowded_exam
+    context = _student(db, school_id, db.get(User, user_ids[0]))
+    # A concurrent start opens the attempt after this one has read the start state.
+    opened = crud_exam_attempt.start_for_user(db, user_id=user_ids[0], exam_id=exam_id, start_time=datetime.now())
+    read_start_state = crud_exam_attempt.get_start_state
+    stale = [None]
+    monkeypatch.setattr(crud_exam_attempt, "get_start_state", lambda db, **kw: stale.pop() if stale else read_start_state(db, **kw))
+
+    attempt = exam_attempt_service.start_exam_attempt(db, exam_id=exam_id, current_user_context=context)
+
+    assert attempt.id == opened
+    assert db.query(ExamAttempt).filter(ExamAttempt.exam_id == exam_id).count() == 1
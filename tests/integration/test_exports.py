@@ -0,0 +1,133 @@
+import asyncio
+import csv
+import io
+import logging
+import os
+import time
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+from openpyxl import load_workbook
+from sqlalchemy import func, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.constants import ExportFormatEnum
+from app.crud.report import leaderboard_snapshot
+from app.services.export import ExportService, export_service
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["rank", "student_id", "student_full_name", "student_email", "lessons_completed", "accumulated_exam_score", "total_rewards"]
+
+
+@pytest.fixture
+def ranked_school(savepoint_session: Session, make_school, make_leaderboard_rows):
+    db = savepoint_session
+    school_id = make_school(db, "Export School")
+    make_leaderboard_rows(db, school_id, [
+        {"student_id": i, "lessons_completed": i, "accumulated_exam_score": 1.5 * i, "total_rewards": i // 2} for i in range(120)
+    ])
+    return db, school_id
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+def test_csv_export_streams_the_leaderboard_in_batches(ranked_school):
+    db, school_id = ranked_school
+    service = ExportService(session_factory=lambda: db, batch_size=50)
+
+    chunks = asyncio.run(collect(service.stream_csv(leaderboard_snapshot.select_export_for_school(school_id), COLUMNS)))
+
+    assert len(chunks) == 1 + 3  # the header, then one chunk per batch
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == COLUMNS
+    assert len(rows) == 121
+    # Ties share a competition rank, as on the leaderboard pages.
+    assert [row[:2] for row in rows[1:4]] == [["1", "119"], ["1", "118"], ["3", "117"]]
+    assert rows[-1][0] == "119" and rows[-1][6] == "0"
+
+
+def test_xlsx_export_writes_the_same_rows(ranked_school):
+    db, school_id = ranked_school
+    service = ExportService(session_factory=lambda: db, batch_size=50)
+
+    chunks = asyncio.run(collect(service.stream_xlsx(leaderboard_snapshot.select_export_for_school(school_id), COLUMNS, sheet_title="leaderboard")))
+
+    sheet = load_workbook(io.BytesIO(b"".join(chunks)), read_only=True)["leaderboard"]
+    rows = list(sheet.iter_rows(values_only=True))
+    assert list(rows[0]) == COLUMNS
+    assert len(rows) == 121
+    assert rows[1][0] == 1 and rows[1][6] == 59 and rows[1][5] == pytest.approx(rows[1][4] * 1.5)
+
+
+def export_series(service: ExportService, count: int):
+    """CSV-export ``count`` generated rows; returns (lines, bytes, peak traced bytes, seconds)."""
+    series = func.generate_series(1, count).table_valued("n").render_derived(name="series")
+    query = select(series.c.n, literal("student@test.com"), (series.c.n * 1.5).label("score")).order_by(series.c.n)
+
+    async def consume():
+        rows = size = 0
+        async for chunk in service.stream_csv(query, ["n", "email", "score"]):
+            rows += chunk.count(b"\n")
+            size += len(chunk)
+        return rows, size
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        rows, size = asyncio.run(consume())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        elapsed = time.perf_counter() - started
+        tracemalloc.stop()
+    return rows, size, peak, elapsed
+
+
+def test_csv_export_memory_does_not_grow_with_the_row_count(database_engine):
+    """Five times the rows, about the same peak: never more than a couple of batches held at once."""
+    service = ExportService(session_factory=lambda: Session(bind=database_engine), batch_size=1000)
+
+    rows, _, small_peak, _ = export_series(service, 20_000)
+    assert rows == 20_001
+    rows, size, peak, _ = export_series(service, 100_000)
+    assert rows == 100_001
+    assert peak < small_peak + size / 20
+
+
+@pytest.mark.skipif(not os.environ.get("EXPORT_BENCHMARK"), reason="benchmark; set EXPORT_BENCHMARK=1 to run")
+def test_million_row_csv_export_runs_in_constant_memory(database_engine, record_property):
+    """Benchmark: 1M generated rows at the production batch size.
+
+    Run with ``EXPORT_BENCHMARK=1 pytest tests/integration/test_exports.py -k million -o log_cli=true``
+    to see the figures; they are also recorded as junit properties.
+    """
+    service = ExportService(session_factory=lambda: Session(bind=database_engine))
+
+    rows, size, peak, elapsed = export_series(service, 1_000_000)
+
+    assert rows == 1_000_001
+    for name, value in (("bytes", size), ("peak_traced_bytes", peak), ("seconds", round(elapsed, 2))):
+        record_property(name, value)
+    logger.info("Exported 1M rows (%.1f MiB) in %.1fs, peak %.1f MiB traced", size / 2**20, elapsed, peak / 2**20)
+    assert peak < size / 10
+
+
+def test_admin_can_download_the_user_list(client: TestClient, super_admin_token, database_engine, monkeypatch):
+    monkeypatch.setattr(export_service, "session_factory", lambda: Session(bind=database_engine))
+    headers = {"Authorization": f"Bearer {super_admin_token}"}
+
+    response = client.get("/admin/users/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="users.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    admin = next(row for row in rows if row["full_name"] == "Test Super Admin" and "super_admin" in row["roles"])
+    assert admin["is_active"] == "True"
+
+    response = client.get("/admin/users/export", params={"format": ExportFormatEnum.XLSX.value}, headers=headers)
+    assert response.status_code == 200
+    sheet = load_workbook(io.BytesIO(response.content), read_only=True).active
+    assert next(sheet.iter_rows(values_only=True)) == ("id", "full_name", "email", "is_active", "roles", "schools", "created_at")
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.crud.base import decode_cursor, encode_cursor
+from app.crud.notification import notification as crud_notification
+from app.crud.report import leaderboard_snapshot
+from app.models.notification import Notification
+from app.models.report import LeaderboardSnapshot
+
+
+def _drain(fetch, limit):
+    pages, cursor = [], None
+    while True:
+        items, cursor = fetch(cursor, limit)
+        pages.append(items)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trips_typed_values_and_rejects_garbage():
+    keys = [LeaderboardSnapshot.total_rewards, LeaderboardSnapshot.timestamp, LeaderboardSnapshot.id]
+    values = [40, datetime(2024, 5, 1, 12, 30), 7]
+
+    assert decode_cursor(encode_cursor(values), keys) == values
+    for garbage in ("not-a-cursor", encode_cursor([1, 2]), encode_cursor(["x", "y", "z"])):
+        with pytest.raises(HTTPException) as excinfo:
+            decode_cursor(garbage, keys)
+        assert excinfo.value.status_code == 400
+
+
+def test_notification_pages_are_newest_first_without_gaps(db_session: Session, make_user):
+    user_id = make_user(db_session, "Keyset User")
+    db_session.execute(insert(Notification), [{"user_id": user_id, "message": f"n{i}"} for i in range(25)])
+
+    pages = _drain(lambda cursor, limit: crud_notification.get_page_for_user(db_session, user_id=user_id, cursor=cursor, limit=limit), 10)
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    ids = [n.id for page in pages for n in page]
+    assert ids == sorted(ids, reverse=True)
+    assert len(set(ids)) == 25
+
+
+def test_leaderboard_keyset_matches_offset_order_with_ties(db_session: Session, make_school, make_leaderboard_rows):
+    school_id = make_school(db_session, "Keyset School")
+    make_leaderboard_rows(db_session, school_id, [{"student_id": i, "total_rewards": i % 4} for i in range(30)])
+
+    pages = _drain(lambda cursor, limit: leaderboard_snapshot.get_page_for_school(db_session, school_id=school_id, cursor=cursor, limit=limit), 7)
+    keyset_order = [s.id for page in pages for s in page]
+    offset_order = (
+        db_session.query(LeaderboardSnapshot.id)
+        .filter(LeaderboardSnapshot.school_id == school_id)
+        .order_by(LeaderboardSnapshot.total_rewards.desc(), LeaderboardSnapshot.student_id.desc())
+        .all()
+    )
+
+    assert keyset_order == [row.id for row in offset_order]
+
+
+def test_admin_users_cursor_mode(client: TestClient, super_admin_token):
+    headers = {"Authorization": f"Bearer {super_admin_token}"}
+
+    first = client.get("/admin/users", params={"cursor": "", "limit": 1}, headers=headers).json()["data"]
+    assert len(first["items"]) == 1
+    assert first["has_previous"] is False
+
+    if first["next_cursor"]:
+        second = client.get("/admin/users", params={"cursor": first["next_cursor"], "limit": 1}, headers=headers).json()["data"]
+        assert second["items"][0]["id"] > first["items"][0]["id"]
+        assert second["has_previous"] is True
+
+    response = client.get("/admin/users", params={"cursor": "bogus"}, headers=headers)
+    assert response.status_code == 400
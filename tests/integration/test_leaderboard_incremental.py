@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.constants import RoleEnum
+from app.crud.report import leaderboard_snapshot
+from app.crud.role import role as crud_role
+from app.models.course_enrollment import CourseEnrollment
+from app.models.course_reward import CourseReward
+from app.models.lesson_progress import LessonProgress
+from app.models.report import LeaderboardSnapshot
+from app.services.leaderboard import LeaderboardService
+from tests.helpers.query_budget import count_queries
+
+
+@pytest.fixture
+def school_with_student(db_session: Session, make_school, make_user, add_to_school, make_course, make_curriculum, make_lessons, make_enrollment):
+    student_role = crud_role.get_by_name(db_session, name=RoleEnum.STUDENT)
+    school_id = make_school(db_session, "Leaderboard School")
+    student_id = make_user(db_session, "Top Student")
+    add_to_school(db_session, school_id, [student_id], student_role.id)
+    course_id = make_course(db_session, school_id, "Ranked Course")
+    lesson_id, = make_lessons(db_session, make_curriculum(db_session, course_id), 1)
+    enrollment_id = make_enrollment(db_session, student_id, course_id)
+    db_session.execute(insert(LessonProgress).values(enrollment_id=enrollment_id, lesson_id=lesson_id, is_completed=True))
+    return school_id, student_id
+
+
+def _row(db: Session, school_id: int, student_id: int) -> LeaderboardSnapshot:
+    db.expire_all()
+    return leaderboard_snapshot.get_snapshot_for_student_and_school(db, student_id, school_id)
+
+
+def test_first_event_seeds_the_row_and_later_events_are_single_updates(db_session: Session, school_with_student):
+    school_id, student_id = school_with_student
+    service = LeaderboardService()
+
+    # The completed lesson is already written, so the seed counts it once.
+    service.record(db_session, student_id, lessons_completed=1)
+    seeded = _row(db_session, school_id, student_id)
+    assert (seeded.lessons_completed, seeded.accumulated_exam_score, seeded.total_rewards) == (1, 0.0, 0)
+
+    with count_queries() as stats:
+        service.record(db_session, student_id, exam_score=7.5)
+        service.record(db_session, student_id, rewards=100)
+
+    assert stats.count == 2
+    row = _row(db_session, school_id, student_id)
+    assert (row.lessons_completed, row.accumulated_exam_score, row.total_rewards) == (1, 7.5, 100)
+
+
+def test_reconcile_repairs_drift_without_rebuilding(db_session: Session, school_with_student):
+    school_id, student_id = school_with_student
+    service = LeaderboardService()
+    service.record(db_session, student_id, lessons_completed=1)
+    row_id = _row(db_session, school_id, student_id).id
+    # Deltas with no source rows behind them, and a row for someone who is no longer a student here.
+    service.record(db_session, student_id, rewards=40)
+    db_session.execute(insert(LeaderboardSnapshot).values(
+        school_id=school_id, student_id=0, student_full_name="Gone", student_email="gone@test.com",
+        lessons_completed=3, accumulated_exam_score=0.0, total_rewards=500
+    ))
+
+    assert service.reconcile_school(db_session, school_id) == 1
+
+    row = _row(db_session, school_id, student_id)
+    assert row.id == row_id
+    assert (row.lessons_completed, row.total_rewards) == (1, 0)
+    assert [s.student_id for s in leaderboard_snapshot.get_all_snapshots_for_school(db_session, school_id=school_id)] == [student_id]
+
+
+def test_joining_another_school_seeds_the_missing_row(db_session: Session, school_with_student, make_school, add_to_school):
+    school_id, student_id = school_with_student
+    service = LeaderboardService()
+    service.record(db_session, student_id, lessons_completed=1)
+    student_role = crud_role.get_by_name(db_session, name=RoleEnum.STUDENT)
+    second_school_id = make_school(db_session, "Second Leaderboard School")
+    add_to_school(db_session, second_school_id, [student_id], student_role.id)
+
+    enrollment_id = db_session.query(CourseEnrollment.id).filter(CourseEnrollment.user_id == student_id).scalar()
+    db_session.execute(insert(CourseReward).values(
+        enrollment_id=enrollment_id, reward_type="points", reward_title="Bonus", points=25, awarded_at=datetime.utcnow()
+    ))
+    service.record(db_session, student_id, rewards=25)
+
+    for school in (school_id, second_school_id):
+        row = _row(db_session, school, student_id)
+        assert (row.lessons_completed, row.total_rewards) == (1, 25), school
@@ -0,0 +1,111 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.rank_index import MemoryRankIndex
+from app.crud.report import leaderboard_snapshot
+from app.services.leaderboard_rank import LeaderboardRankService
+
+SCORES = [50, 40, 40, 30, 20, 10, 10, 10, 0, 0]
+
+
+def test_memory_index_ranks_ties_together():
+    index = MemoryRankIndex(ttl_seconds=60)
+    assert not index.is_loaded(1)
+    index.set_scores(1, {1: 5})
+    assert index.size(1) == 0
+
+    index.replace(1, {member: score for member, score in enumerate(SCORES)})
+    assert index.page(1, 0, 4) == [(0, 50), (2, 40), (1, 40), (3, 30)]  # ties: higher member id first
+    assert [index.rank_of_score(1, score) for _, score in index.page(1, 0, 10)] == [1, 2, 2, 4, 5, 6, 6, 6, 9, 9]
+    assert index.position(1, 7) == 5
+
+    index.set_scores(1, {7: 45, 99: 45})
+    index.remove(1, [0])
+    assert index.page(1, 0, 3) == [(99, 45), (7, 45), (2, 40)]
+    assert index.rank_of_score(1, 40) == 3
+    assert index.size(1) == 10
+    assert index.position(1, 0) is None
+
+    index.drop(1)
+    assert not index.is_loaded(1)
+
+
+@pytest.fixture
+def ranked_session(savepoint_session: Session, make_school, make_leaderboard_rows):
+    """Savepoint commits still fire after_commit, without persisting anything."""
+    db = savepoint_session
+    school_id = make_school(db, "Rank School")
+    student_ids = list(range(1000, 1000 + len(SCORES)))
+    make_leaderboard_rows(db, school_id, [{"student_id": student_id, "total_rewards": score} for student_id, score in zip(student_ids, SCORES)])
+    return db, school_id, student_ids
+
+
+def test_pages_and_positions_come_from_the_index(ranked_session):
+    db, school_id, student_ids = ranked_session
+    service = LeaderboardRankService(MemoryRankIndex(ttl_seconds=60))
+
+    page, total = service.get_page(db, school_id, skip=2, limit=3)
+    assert total == len(SCORES)
+    assert [(rank, row.student_id) for rank, row in page] == [(2, student_ids[1]), (4, student_ids[3]), (5, student_ids[4])]
+
+    rank, window, total = service.get_position(db, school_id, student_ids[6], window=1)
+    assert rank == 6
+    assert [row.student_id for _, row in window] == student_ids[7:4:-1]
+    assert service.get_position(db, school_id, 1, window=1) == (None, [], len(SCORES))
+
+
+def test_score_changes_reach_the_index_only_on_commit(ranked_session):
+    db, school_id, student_ids = ranked_session
+    service = LeaderboardRankService(MemoryRankIndex(ttl_seconds=60))
+    last = student_ids[-1]
+    assert service.get_position(db, school_id, last, window=0)[0] == 9
+
+    service.stage(db, leaderboard_snapshot.increment_for_student(db, last, total_rewards=100)[0])
+    assert service.get_position(db, school_id, last, window=0)[0] == 9
+    db.commit()
+    assert service.get_position(db, school_id, last, window=0)[0] == 1
+
+    service.stage(db, leaderboard_snapshot.increment_for_student(db, student_ids[-2], total_rewards=500)[0])
+    db.rollback()
+    assert service.get_position(db, school_id, student_ids[-2], window=0)[0] == 10
+
+    service.stage_reload(db, school_id)
+    db.commit()
+    page, _ = service.get_page(db, school_id, skip=0, limit=1)
+    assert [(rank, row.student_id, row.total_rewards) for rank, row in page] == [(1, last, 100)]
+
+
+def test_removed_students_leave_the_index_on_commit(ranked_session):
+    db, school_id, student_ids = ranked_session
+    service = LeaderboardRankService(MemoryRankIndex(ttl_seconds=60))
+    assert service.get_position(db, school_id, student_ids[0], window=0)[0] == 1
+
+    service.stage_removed(db, school_id, [student_ids[0]])
+    db.commit()
+
+    assert service.get_position(db, school_id, student_ids[0], window=0) == (None, [], len(SCORES) - 1)
+    page, _ = service.get_page(db, school_id, skip=0, limit=1)
+    assert [(rank, row.student_id) for rank, row in page] == [(1, student_ids[2])]
+
+
+def test_leaderboard_endpoints_report_ranks(client, super_admin_token, db_session: Session, make_school, make_leaderboard_rows):
+    headers = {"Authorization": f"Bearer {super_admin_token}"}
+    school_id = make_school(db_session, "Rank API School")
+    make_leaderboard_rows(db_session, school_id, [{"student_id": student_id, "total_rewards": score} for student_id, score in enumerate(SCORES, start=1)])
+
+    board = client.get(f"/schools/{school_id}/leaderboard?skip=0&limit=3", headers=headers)
+    assert board.status_code == 200, board.text
+    assert board.json()["data"]["total"] == len(SCORES)
+    assert [(item["student_id"], item["rank"]) for item in board.json()["data"]["items"]] == [(1, 1), (3, 2), (2, 2)]
+
+    # Cursor pages skip the COUNT unless the caller asks for it.
+    page = client.get(f"/schools/{school_id}/leaderboard", params={"cursor": "", "limit": 3}, headers=headers).json()["data"]
+    assert page["total"] is None and page["next_cursor"]
+    assert [(item["student_id"], item["rank"]) for item in page["items"]] == [(1, 1), (3, 2), (2, 2)]
+    page = client.get(f"/schools/{school_id}/leaderboard", params={"cursor": page["next_cursor"], "include_total": True}, headers=headers).json()["data"]
+    assert page["total"] == len(SCORES)
+    assert [item["student_id"] for item in page["items"]] == [4, 5, 8, 7, 6, 10, 9]
+
+    position = client.get(f"/schools/{school_id}/leaderboard/students/4?window=1", headers=headers).json()["data"]
+    assert position["rank"] == 4
+    assert [item["student_id"] for item in position["items"]] == [2, 4, 5]
@@ -0,0 +1,83 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.crud.lesson_progress import lesson_progress as crud_lesson_progress
+from app.models.lesson_progress import LessonProgress
+from app.services.lesson_heartbeat import LessonHeartbeatService
+from tests.helpers.query_budget import count_queries
+
+
+@pytest.fixture
+def started_lessons(savepoint_session: Session, make_school, make_course, make_curriculum, make_lessons, make_user, make_enrollment):
+    db = savepoint_session
+    course_id = make_course(db, make_school(db, "Heartbeat School"), "Heartbeat Course")
+    lesson_ids = make_lessons(db, make_curriculum(db, course_id, "Heartbeat Curriculum"), 3, "Video")
+    user_id = make_user(db, "Viewer")
+    enrollment_id = make_enrollment(db, user_id, course_id)
+    progress_ids = db.execute(
+        insert(LessonProgress).returning(LessonProgress.id, sort_by_parameter_order=True),
+        [{"enrollment_id": enrollment_id, "lesson_id": lesson_id, "time_spent_seconds": 0} for lesson_id in lesson_ids[:2]],
+    ).scalars().all()
+    return user_id, lesson_ids, progress_ids
+
+
+def _time_spent(db: Session, progress_ids):
+    db.expire_all()
+    return [db.get(LessonProgress, pid).time_spent_seconds for pid in progress_ids]
+
+
+@pytest.mark.asyncio
+async def test_heartbeats_are_coalesced_into_one_bulk_update(savepoint_session: Session, started_lessons):
+    user_id, lesson_ids, progress_ids = started_lessons
+    service = LessonHeartbeatService()
+
+    for _ in range(100):
+        for lesson_id in lesson_ids[:2]:
+            await service.record(savepoint_session, user_id=user_id, lesson_id=lesson_id, seconds=5)
+
+    with count_queries() as stats:
+        assert service.flush(savepoint_session) == 2
+
+    # One bulk UPDATE, then the commit's RELEASE SAVEPOINT.
+    assert stats.count == 2
+    assert _time_spent(savepoint_session, progress_ids) == [500, 500]
+    assert service.snapshot() == {"received": 200, "rows_written": 2, "flushes": 1, "pending_rows": 0}
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_deltas_for_the_next_one(savepoint_session: Session, started_lessons, monkeypatch):
+    user_id, lesson_ids, progress_ids = started_lessons
+    savepoint_session.commit()  # the failed flush rolls back to here
+    service = LessonHeartbeatService()
+    await service.record(savepoint_session, user_id=user_id, lesson_id=lesson_ids[0], seconds=30)
+
+    def fail(db, increments):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(crud_lesson_progress, "add_time_spent", fail)
+    with pytest.raises(RuntimeError):
+        service.flush(savepoint_session)
+    monkeypatch.undo()
+
+    await service.record(savepoint_session, user_id=user_id, lesson_id=lesson_ids[0], seconds=10)
+    assert service.flush(savepoint_session) == 1
+    assert _time_spent(savepoint_session, progress_ids[:1]) == [40]
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_requires_a_started_lesson(savepoint_session: Session, started_lessons):
+    user_id, lesson_ids, _ = started_lessons
+
+    with pytest.raises(HTTPException) as excinfo:
+        await LessonHeartbeatService().record(savepoint_session, user_id=user_id, lesson_id=lesson_ids[2], seconds=5)
+    assert excinfo.value.status_code == 404
+
+
+def test_duplicate_progress_rows_resolve_to_the_oldest(savepoint_session: Session, started_lessons):
+    user_id, lesson_ids, progress_ids = started_lessons
+    enrollment_id = savepoint_session.get(LessonProgress, progress_ids[0]).enrollment_id
+    savepoint_session.execute(insert(LessonProgress).values(enrollment_id=enrollment_id, lesson_id=lesson_ids[0], time_spent_seconds=0))
+
+    assert crud_lesson_progress.get_id_for_user_and_lesson(savepoint_session, user_id, lesson_ids[0]) == progress_ids[0]
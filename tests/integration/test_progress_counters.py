@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.crud.course_enrollment import course_enrollment as crud_enrollment
+from app.crud.curriculum import curriculum as crud_curriculum
+from app.crud.lesson import lesson as crud_lesson
+from app.models.course import Course
+from app.models.course_enrollment import CourseEnrollment
+from app.models.lesson_progress import LessonProgress
+from app.schemas.curriculum import CurriculumCreate
+from app.schemas.lesson import LessonCreate
+
+
+@pytest.fixture
+def course_with_enrollment(savepoint_session: Session, make_school, make_course, make_user, make_enrollment):
+    """crud deletes commit, so the counters are checked on a session that only releases savepoints."""
+    db = savepoint_session
+    course_id = make_course(db, make_school(db, "Counter School"), "Counter Course")
+    enrollment_id = make_enrollment(db, make_user(db, "Counter Student"), course_id)
+    return db.get(Course, course_id), db.get(CourseEnrollment, enrollment_id)
+
+
+def _add_lessons(db: Session, curriculum_id: int, count: int):
+    return [crud_lesson.create(db, obj_in=LessonCreate(title=f"Lesson {i}", curriculum_id=curriculum_id), commit=False) for i in range(count)]
+
+
+def test_total_lessons_tracks_lesson_and_curriculum_changes(savepoint_session: Session, course_with_enrollment):
+    course, _ = course_with_enrollment
+    first = crud_curriculum.create(savepoint_session, obj_in=CurriculumCreate(title="One", course_id=course.id), commit=False)
+    second = crud_curriculum.create(savepoint_session, obj_in=CurriculumCreate(title="Two", course_id=course.id), commit=False)
+
+    lessons = _add_lessons(savepoint_session, first.id, 3)
+    _add_lessons(savepoint_session, second.id, 2)
+    assert course.total_lessons == 5
+
+    crud_lesson.delete(savepoint_session, id=lessons[0].id)
+    assert course.total_lessons == 4
+
+    crud_curriculum.delete(savepoint_session, id=second.id)
+    assert course.total_lessons == 2
+
+
+def test_progress_is_measured_against_all_course_lessons(savepoint_session: Session, course_with_enrollment):
+    course, enrollment = course_with_enrollment
+    curriculum = crud_curriculum.create(savepoint_session, obj_in=CurriculumCreate(title="Only", course_id=course.id), commit=False)
+    _add_lessons(savepoint_session, curriculum.id, 4)
+
+    crud_enrollment.increment_completed_lessons(savepoint_session, enrollment)
+    savepoint_session.flush()
+
+    assert enrollment.completed_lessons == 1
+    assert enrollment.calculate_progress() == 25
+    assert crud_enrollment.get_progress_counters_for_user(savepoint_session, user_id=enrollment.user_id) == [(course.level, 4, 1)]
+
+
+def test_removing_or_moving_completed_lessons_restates_the_counters(savepoint_session: Session, course_with_enrollment, make_course):
+    course, enrollment = course_with_enrollment
+    other_id = make_course(savepoint_session, course.school_id, "Other Course")
+    other = savepoint_session.get(Course, other_id)
+    first = crud_curriculum.create(savepoint_session, obj_in=CurriculumCreate(title="One", course_id=course.id), commit=False)
+    second = crud_curriculum.create(savepoint_session, obj_in=CurriculumCreate(title="Two", course_id=course.id), commit=False)
+    lessons = _add_lessons(savepoint_session, first.id, 2) + _add_lessons(savepoint_session, second.id, 2)
+    savepoint_session.execute(insert(LessonProgress), [
+        {"enrollment_id": enrollment.id, "lesson_id": lesson.id, "is_completed": True} for lesson in lessons[:3]
+    ])
+    savepoint_session.execute(
+        CourseEnrollment.__table__.update().where(CourseEnrollment.id == enrollment.id).values(completed_lessons=3, progress_percentage=75)
+    )
+
+    crud_lesson.delete(savepoint_session, id=lessons[0].id)
+    savepoint_session.refresh(enrollment)
+    assert (course.total_lessons, enrollment.completed_lessons, enrollment.progress_percentage) == (3, 2, 66)
+
+    # Parent changes are picked up on flush, whichever path makes them.
+    lessons[2].curriculum_id = first.id
+    second.course_id = other.id
+    savepoint_session.commit()
+    savepoint_session.refresh(enrollment)
+    assert (course.total_lessons, other.total_lessons) == (2, 1)
+    assert (enrollment.completed_lessons, enrollment.progress_percentage) == (2, 100)
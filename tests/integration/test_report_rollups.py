@@ -0,0 +1,142 @@
+import uuid
+from datetime import datetime, time, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.course import course as crud_course
+from app.crud.report_rollup import school_daily_rollup as crud_school_rollup
+from app.crud.user import user as crud_user
+from app.models.billing import Invoice
+from app.models.course import Course
+from app.services.report_rollup import ReportRollupService
+from app.services.stripe import stripe_service
+from tests.helpers.query_budget import count_queries
+
+TODAY = datetime.utcnow().date()
+YESTERDAY = TODAY - timedelta(days=1)
+
+
+def at(days_ago: int, hour: int) -> datetime:
+    return datetime.combine(TODAY - timedelta(days=days_ago), time(hour))
+
+
+RANGES = [
+    (None, None),
+    (at(3, 0), None),
+    (at(3, 10), at(1, 12)),
+    (at(2, 0), at(1, 0)),
+    (None, at(2, 6)),
+    (at(0, 0), None),
+]
+
+
+@pytest.fixture
+def school_history(savepoint_session: Session, _ensure_student_role_exists, _ensure_teacher_role_exists, make_school, make_user, add_to_school, make_course):
+    db = savepoint_session
+    school_id = make_school(db, "Rollup School")
+    role_ids = {"student": _ensure_student_role_exists.id, "teacher": _ensure_teacher_role_exists.id}
+    joined = [(3, 8, "student"), (3, 23, "student"), (2, 12, "teacher"), (1, 1, "student"), (1, 23, "teacher"), (0, 0, "student")]
+    for i, (days_ago, hour, role) in enumerate(joined):
+        add_to_school(db, school_id, [make_user(db, f"Member {i}", created_at=at(days_ago, hour))], role_ids[role])
+    for i, (days_ago, hour) in enumerate([(3, 12), (2, 0), (1, 18), (0, 1)]):
+        make_course(db, school_id, f"Course {i}", created_at=at(days_ago, hour))
+    tag = uuid.uuid4().hex[:8]
+    db.execute(insert(Invoice), [
+        {"school_id": school_id, "stripe_invoice_id": f"in_{tag}_{i}", "amount": amount, "status": status, "created_at": at(2, 10)}
+        for i, (amount, status) in enumerate([(120.0, "paid"), (80.0, "open")])
+    ])
+    return db, school_id
+
+
+def direct_school_counts(db, school_id, start, end, student_role_id):
+    return {
+        "courses": crud_course.get_courses_by_school_count(db, school_id=school_id, start_date=start, end_date=end),
+        "students": crud_user.get_users_by_school_and_role_count(db, school_id=school_id, role_id=student_role_id, start_date=start, end_date=end),
+        "staff": crud_user.get_non_student_users_by_school_count(db, school_id=school_id, start_date=start, end_date=end),
+    }
+
+
+def direct_platform_counts(db, start, end):
+    return {
+        "courses": crud_course.get_all_courses_count(db, start_date=start, end_date=end),
+        "students": crud_user.get_all_students_count(db, start_date=start, end_date=end),
+        "teachers": crud_user.get_all_teachers_count(db, start_date=start, end_date=end),
+    }
+
+
+@pytest.mark.asyncio
+async def test_rollup_totals_match_direct_counts_for_any_range(school_history, _ensure_student_role_exists, monkeypatch):
+    db, school_id = school_history
+    service = ReportRollupService()
+    monkeypatch.setattr(stripe_service, "get_daily_revenue", AsyncMock(return_value={YESTERDAY: 50.0, TODAY - timedelta(days=3): 20.0, TODAY: 5.0}))
+    monkeypatch.setattr(stripe_service, "get_total_revenue", AsyncMock(return_value=7.0))
+
+    def assert_matches_direct_counts():
+        for start, end in RANGES:
+            expected = direct_school_counts(db, school_id, start, end, _ensure_student_role_exists.id)
+            assert service.school_totals(db, school_id, start, end, metrics=tuple(expected)) == expected, (start, end)
+            expected = direct_platform_counts(db, start, end)
+            assert service.platform_totals(db, start, end, metrics=tuple(expected)) == expected, (start, end)
+
+    assert_matches_direct_counts()
+
+    assert await service.rollup(db, through=YESTERDAY) > 0
+    stripe_service.get_daily_revenue.assert_awaited_once()
+    assert_matches_direct_counts()
+    assert service.school_totals(db, school_id, metrics=("revenue",)) == {"revenue": 120.0}
+
+    # Stripe revenue: rolled-up days (today's charge is not one of them) plus the live slice since.
+    assert await service.platform_revenue(db) == 77.0
+    assert stripe_service.get_total_revenue.await_args.kwargs == {"start_date": datetime.combine(TODAY, time.min), "end_date": None}
+
+    with count_queries() as stats:
+        service.school_totals(db, school_id, at(3, 0), None, metrics=("students", "courses", "staff"))
+    assert stats.count == 3
+
+
+@pytest.mark.asyncio
+async def test_rerunning_a_rollup_picks_up_deletions(school_history, monkeypatch):
+    db, school_id = school_history
+    service = ReportRollupService()
+    monkeypatch.setattr(stripe_service, "get_daily_revenue", AsyncMock(return_value={}))
+    await service.rollup(db, through=YESTERDAY)
+    assert service.school_totals(db, school_id, None, at(0, 0), metrics=("courses",)) == {"courses": 3}
+
+    db.query(Course).filter(Course.school_id == school_id, Course.title == "Course 0").update({"deleted_at": datetime.utcnow()})
+    await service.rollup(db, through=YESTERDAY)
+    stripe_service.get_daily_revenue.assert_awaited_once()
+    assert service.school_totals(db, school_id, None, at(0, 0), metrics=("courses",)) == {"courses": 2}
+
+
+@pytest.mark.asyncio
+async def test_nightly_rollups_rewrite_only_the_recompute_window(school_history, monkeypatch):
+    db, school_id = school_history
+    service = ReportRollupService()
+    monkeypatch.setattr(stripe_service, "get_daily_revenue", AsyncMock(return_value={}))
+    monkeypatch.setattr(settings, "REPORT_ROLLUP_RECOMPUTE_DAYS", 2)
+    await service.rollup(db, through=YESTERDAY)
+
+    db.query(Course).filter(Course.school_id == school_id, Course.title.in_(["Course 0", "Course 2"])).update(
+        {"deleted_at": datetime.utcnow()}, synchronize_session=False
+    )
+    await service.rollup(db, through=YESTERDAY)
+    # Course 2 (yesterday) is inside the window; Course 0 (three days ago) waits for a full rebuild.
+    assert service.school_totals(db, school_id, None, at(0, 0), metrics=("courses",)) == {"courses": 2}
+
+    await service.rollup(db, through=YESTERDAY, full=True)
+    assert service.school_totals(db, school_id, None, at(0, 0), metrics=("courses",)) == {"courses": 1}
+
+
+def test_days_are_bucketed_in_utc_whatever_the_session_time_zone(school_history):
+    db, school_id = school_history
+    expected = crud_school_rollup.aggregate(db, school_id=school_id, metrics=("students",))
+
+    db.execute(text("SET LOCAL TIME ZONE 'Pacific/Auckland'"))
+    assert crud_school_rollup.aggregate(db, school_id=school_id, metrics=("students",)) == expected
+    assert crud_school_rollup.aggregate(db, since=at(1, 0), until=at(1, 23), school_id=school_id, metrics=("students",)) == {
+        (school_id, YESTERDAY): {**dict.fromkeys(expected[(school_id, YESTERDAY)], 0), "students": 1}
+    }
@@ -0,0 +1,104 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.constants import PermissionEnum, RoleEnum
+from app.crud import role as role_module
+from app.crud.role import RoleRegistry, role_registry
+from app.models.permission import Permission
+from app.models.role import Role
+from app.utils.deps import require_permission
+from tests.helpers.query_budget import count_queries
+
+
+@pytest.fixture
+def registry_session(savepoint_session):
+    """The registry may have loaded roles that the savepoint rolls back, so drop them afterwards."""
+    try:
+        yield savepoint_session
+    finally:
+        role_registry.invalidate()
+
+
+def _count_queries(func):
+    with count_queries() as stats:
+        result = func()
+    return result, stats.count
+
+
+def test_lookups_are_served_from_memory_after_the_first_load(db_session: Session, _ensure_student_role_exists, monkeypatch):
+    registry = RoleRegistry()
+    student_id = _ensure_student_role_exists.id
+
+    assert _count_queries(lambda: registry.get_by_name(db_session, RoleEnum.STUDENT))[1] == 2  # roles, then their permissions
+
+    def lookups():
+        return (
+            registry.get_by_name(db_session, RoleEnum.STUDENT).id,
+            registry.get_by_name(db_session, "student").name,
+            registry.get(db_session, student_id).id,
+            registry.get_permissions(db_session, student_id),
+        )
+
+    result, queries = _count_queries(lookups)
+    assert result[:3] == (student_id, "student", student_id)
+    assert isinstance(result[3], frozenset)
+    assert queries == 0
+    assert registry.snapshot()["loads"] == 1
+
+    # Unknown roles reload at most once per MISS_RELOAD_SECONDS.
+    clock = iter([100.0, 100.5, 102.0, 102.0])
+    monkeypatch.setattr(role_module.time, "monotonic", lambda: next(clock))
+    registry.load(db_session)
+    assert _count_queries(lambda: registry.get_by_name(db_session, "no-such-role")) == (None, 0)
+    assert registry.snapshot()["loads"] == 2
+    _, queries = _count_queries(lambda: registry.get_by_name(db_session, "no-such-role"))
+    assert queries == 2 and registry.snapshot()["loads"] == 3
+
+
+def test_committing_role_or_permission_changes_invalidates_the_registry(registry_session: Session):
+    db = registry_session
+    tag = uuid.uuid4().hex[:8]
+    role_registry.load(db)
+
+    db.add(Role(name=f"auditor-{tag}"))
+    db.flush()
+    assert role_registry.snapshot()["loaded"]  # not until the commit
+    db.commit()
+    assert not role_registry.snapshot()["loaded"]
+    auditor = role_registry.get_by_name(db, f"auditor-{tag}")
+    assert auditor is not None and auditor.permissions == []
+
+    stored = db.get(Role, auditor.id)
+    stored.permissions.append(Permission(name=f"audit_reports_{tag}"))
+    db.commit()
+    assert role_registry.get_permissions(db, auditor.id) == {f"audit_reports_{tag}"}
+
+    stored.description = "changed, then rolled back"
+    db.flush()
+    db.rollback()
+    assert role_registry.snapshot()["loaded"]
+
+
+def test_permission_checks_read_the_registry(registry_session: Session):
+    db = registry_session
+    tag = uuid.uuid4().hex[:8]
+    stored = Role(name=f"role-admin-{tag}")
+    db.add(stored)
+    db.commit()
+    context = SimpleNamespace(role=role_registry.get(db, stored.id))
+    verify = require_permission(PermissionEnum.ROLE_CREATE)
+
+    with pytest.raises(HTTPException) as denied:
+        verify(context=context, db=db)
+    assert denied.value.status_code == 403
+
+    permission = db.query(Permission).filter(Permission.name == PermissionEnum.ROLE_CREATE.value).first()
+    stored.permissions.append(permission or Permission(name=PermissionEnum.ROLE_CREATE.value))
+    db.commit()
+    # The context still holds the role as it was; the registry has the new grant.
+    assert context.role.permissions == []
+    verify(context=context, db=db)
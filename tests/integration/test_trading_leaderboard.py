@@ -0,0 +1,206 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.crud.report import trading_leaderboard_snapshot as crud_trading_leaderboard
+from app.models.report import TradingLeaderboardSnapshot
+from app.models.school import School
+from app.models.trading import AccountBalance, PortfolioPosition
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.polygon import polygon_service
+from app.services.trading import trading_service
+from app.services.trading_leaderboard import TradingLeaderboardRefreshQueue, TradingLeaderboardService
+from tests.helpers.query_budget import count_queries
+
+STUDENTS = 2000
+SYMBOLS = [f"SYM{i}" for i in range(25)]
+PRICES = {symbol: 10.0 + i for i, symbol in enumerate(SYMBOLS[:-1])}  # the last symbol has no price
+
+
+@pytest.fixture
+def trading_school(db_session: Session, _ensure_student_role_exists, make_school, make_users, add_to_school):
+    school_id = make_school(db_session, "Trading School")
+    student_ids = make_users(db_session, STUDENTS, "Trader")
+    add_to_school(db_session, school_id, student_ids, _ensure_student_role_exists.id)
+    db_session.execute(insert(AccountBalance), [
+        {"user_id": student_id, "balance": 5000.0 + i % 7 * 100} for i, student_id in enumerate(student_ids)
+    ])
+    start = datetime.utcnow() - timedelta(days=30)
+    db_session.execute(insert(Transaction), [
+        {"user_id": student_id, "amount": amount, "transaction_type": "fund_addition", "created_at": start + timedelta(days=day)}
+        for student_id in student_ids
+        for day, amount in ((0, 10000.0), (5, 500.0))
+    ])
+    db_session.execute(insert(PortfolioPosition), [
+        {"user_id": student_id, "symbol": SYMBOLS[(i + k * 8) % len(SYMBOLS)], "quantity": 10 * (k + 1) + i % 50, "average_price": 12.5}
+        for i, student_id in enumerate(student_ids)
+        for k in range(3)
+    ])
+    return school_id, student_ids
+
+
+@pytest.mark.asyncio
+async def test_school_leaderboard_is_computed_in_bulk(db_session: Session, trading_school, monkeypatch):
+    school_id, student_ids = trading_school
+    requested = []
+
+    async def snapshot_request(path, params=None, allow_404=False):
+        tickers = params["tickers"].split(",")
+        requested.append(tickers)
+        return {"tickers": [{"ticker": t, "prevDay": {"c": PRICES[t]}} for t in tickers if t in PRICES]}
+
+    monkeypatch.setattr(polygon_service, "price_cache", {})
+    monkeypatch.setattr(polygon_service, "_make_request", snapshot_request)
+    monkeypatch.setattr(polygon_service, "get_latest_quote", AsyncMock(return_value=None))
+
+    with count_queries() as stats:
+        rows = await TradingLeaderboardService().compute_school(db_session, school_id)
+
+    assert len(rows) == STUDENTS
+    assert stats.count == 2
+    assert len(requested) == 1 and sorted(requested[0]) == sorted(SYMBOLS)
+
+    # Same numbers as the per-student summary.
+    monkeypatch.setattr(polygon_service, "get_latest_quote", AsyncMock(side_effect=lambda symbol: {"price": PRICES[symbol]} if symbol in PRICES else None))
+    by_student = {row["student_id"]: row for row in rows}
+    for student_id in (student_ids[0], student_ids[7], student_ids[-1]):
+        summary = await trading_service.get_trading_account_summary(db_session, user_id=student_id)
+        row = by_student[student_id]
+        assert row["starting_capital"] == pytest.approx(summary.starting_capital)
+        assert row["current_balance"] == pytest.approx(summary.current_balance)
+        assert row["trading_profit"] == pytest.approx(summary.trading_profit)
+
+
+def test_unpriced_positions_use_average_cost_and_losses_floor_at_zero():
+    accounts = [(1, "A", "a@test.com", 1000.0, 1000.0, 100.0), (2, "B", "b@test.com", 1000.0, 1500.0, 2000.0)]
+    positions = [(1, "KNOWN", 10, 50.0), (1, "UNKNOWN", 4, 25.0)]
+
+    rows = TradingLeaderboardService.build_rows(9, accounts, positions, {"KNOWN": 200.0}, timestamp=datetime.utcnow())
+
+    assert [(row["student_id"], row["trading_profit"]) for row in rows] == [(1, 1200.0), (2, 500.0)]
+    assert {row["school_id"] for row in rows} == {9}
+
+
+@pytest.mark.asyncio
+async def test_refresh_queue_coalesces_trades_per_student_and_batches_students():
+    batches, waits = [], []
+    window_over = asyncio.Event()
+
+    async def refresh(db, student_ids):
+        batches.append(student_ids)
+        return len(student_ids)
+
+    async def sleep(seconds):
+        waits.append(seconds)
+        await window_over.wait()
+
+    async def drained():
+        while queue.snapshot()["flushes"] == 0:
+            await asyncio.sleep(0)
+
+    queue = TradingLeaderboardRefreshQueue(refresh, session_factory=MagicMock, window=2.0, batch_size=2, sleep=sleep)
+    for _ in range(10):
+        queue.submit(1)
+    queue.submit(2)
+    await asyncio.sleep(0)  # the drain starts waiting out the window
+    queue.submit(3)
+    assert waits == [2.0] and batches == []
+
+    window_over.set()
+    await asyncio.wait_for(drained(), timeout=5)
+    assert batches == [[1, 2], [3]]
+    assert queue.snapshot() == {"received": 12, "coalesced": 9, "students_refreshed": 3, "students_failed": 0, "flushes": 1, "pending_students": 0}
+
+    queue.submit(4)
+    await queue.stop()
+    assert batches[-1] == [4]
+
+
+@pytest.mark.asyncio
+async def test_refresh_rewrites_the_students_rows_in_each_school(savepoint_session: Session, _ensure_student_role_exists, make_school, make_user, add_to_school, monkeypatch):
+    db = savepoint_session
+    role_id = _ensure_student_role_exists.id
+    school_ids = [make_school(db, "Desk") for _ in range(2)]
+    trader, other = make_user(db, "trader"), make_user(db, "other")
+    add_to_school(db, school_ids[0], [trader, other], role_id)
+    add_to_school(db, school_ids[1], [trader], role_id)
+    db.execute(insert(AccountBalance), [{"user_id": trader, "balance": 400.0}, {"user_id": other, "balance": 1000.0}])
+    db.execute(insert(Transaction), [{"user_id": user_id, "amount": 1000.0, "transaction_type": "fund_addition"} for user_id in (trader, other)])
+    db.execute(insert(PortfolioPosition).values(user_id=trader, symbol="SYM1", quantity=10, average_price=60.0))
+    db.execute(insert(TradingLeaderboardSnapshot), [
+        {"student_id": user_id, "school_id": school_id, "student_full_name": "stale", "student_email": "stale", "starting_capital": 0.0,
+         "current_balance": 0.0, "trading_profit": 0.0, "timestamp": datetime.utcnow()}
+        for user_id, school_id in ((trader, school_ids[0]), (trader, school_ids[1]), (other, school_ids[0]))
+    ])
+    monkeypatch.setattr(polygon_service, "price_cache", {})
+    monkeypatch.setattr(polygon_service, "_make_request", AsyncMock(return_value={"tickers": [{"ticker": "SYM1", "prevDay": {"c": PRICES["SYM1"] * 10}}]}))
+
+    queue = TradingLeaderboardRefreshQueue(TradingLeaderboardService().refresh_students, session_factory=lambda: db, window=60)
+    for _ in range(5):
+        queue.submit(trader)
+    assert await queue.flush() == 1
+
+    rows = db.execute(
+        select(TradingLeaderboardSnapshot.student_id, TradingLeaderboardSnapshot.school_id, TradingLeaderboardSnapshot.trading_profit)
+        .where(TradingLeaderboardSnapshot.school_id.in_(school_ids))
+        .order_by(TradingLeaderboardSnapshot.school_id, TradingLeaderboardSnapshot.student_id)
+    ).all()
+    assert rows == [(trader, school_ids[0], 500.0), (other, school_ids[0], 0.0), (trader, school_ids[1], 500.0)]
+
+
+def wait_until_blocked_on_a_lock(engine, pid, pending):
+    """Return once backend ``pid`` waits on a lock; fail if ``pending`` finishes first."""
+    deadline = time.monotonic() + 30
+    with engine.connect() as watcher:
+        while time.monotonic() < deadline:
+            assert not pending.done(), "expected the refresh to wait for the other transaction"
+            wait = watcher.execute(text("SELECT wait_event_type FROM pg_stat_activity WHERE pid = :pid"), {"pid": pid}).scalar()
+            if wait == "Lock":
+                return
+            watcher.rollback()  # a fresh pg_stat_activity snapshot on the next read
+            time.sleep(0.01)
+    pytest.fail(f"backend {pid} never waited on a lock")
+
+
+def test_interleaved_refreshes_keep_one_row_per_student(database_engine, make_school, make_user):
+    with Session(database_engine) as db:
+        school_id = make_school(db, "Race Desk")
+        student_id = make_user(db, "Racer")
+        db.commit()
+
+    def row(profit):
+        return {"student_id": student_id, "school_id": school_id, "student_full_name": "Racer", "student_email": "racer@test.com",
+                "starting_capital": 1000.0, "current_balance": 1000.0 + profit, "trading_profit": profit, "timestamp": datetime.utcnow()}
+
+    def refresh_school(db):
+        crud_trading_leaderboard.replace_for_school(db, school_id, [row(2.0)])
+        db.commit()
+
+    try:
+        with Session(database_engine) as first, Session(database_engine) as second, ThreadPoolExecutor(max_workers=1) as pool:
+            crud_trading_leaderboard.replace_for_students(first, [student_id], [row(1.0)])
+            second_pid = second.execute(text("SELECT pg_backend_pid()")).scalar_one()
+            pending = pool.submit(refresh_school, second)
+            wait_until_blocked_on_a_lock(database_engine, second_pid, pending)  # on the student's uncommitted row
+            first.commit()
+            pending.result(timeout=10)
+
+        with Session(database_engine) as db:
+            rows = db.execute(
+                select(TradingLeaderboardSnapshot.student_id, TradingLeaderboardSnapshot.trading_profit)
+                .where(TradingLeaderboardSnapshot.school_id == school_id)
+            ).all()
+        assert rows == [(student_id, 2.0)]
+    finally:
+        with Session(database_engine) as db:
+            db.execute(delete(TradingLeaderboardSnapshot).where(TradingLeaderboardSnapshot.school_id == school_id))
+            db.execute(delete(User).where(User.id == student_id))
+            db.execute(delete(School).where(School.id == school_id))
+            db.commit()
@@ -0,0 +1,75 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.constants import ADMIN_SCHOOL_NAME
+from app.crud.school import school as crud_school
+from app.models.user_answer import UserAnswer
+
+QUESTIONS = 30
+
+
+@pytest.fixture
+def open_attempt(client: TestClient, token_for_role, db_session: Session):
+    teacher = {"Authorization": f"Bearer {token_for_role('teacher')}"}
+    student = {"Authorization": f"Bearer {token_for_role('student')}"}
+    school = crud_school.get_by_name(db_session, name=ADMIN_SCHOOL_NAME)
+
+    course_id = client.post("/courses/", headers=teacher, json={"title": "Upsert Course", "school_id": school.id}).json()["data"]["id"]
+    exam_id = client.post("/exams/", headers=teacher, json={"title": "Upsert Exam", "course_id": course_id}).json()["data"]["id"]
+    questions = client.post(f"/exams/{exam_id}/questions", headers=teacher, json=[
+        {"exam_id": exam_id, "question_text": f"Q{i}?", "question_type": "multiple_choice", "options": ["A", "B", "C", "D"], "correct_answer": 0}
+        for i in range(QUESTIONS)
+    ]).json()["data"]
+    student_id = client.get("/account/me", headers=student).json()["data"]["id"]
+    client.post(f"/courses/{course_id}/students/{student_id}", headers=teacher)
+    attempt_id = client.post(f"/exams/{exam_id}/attempts", headers=student).json()["data"]["id"]
+    return attempt_id, [q["id"] for q in questions], student
+
+
+def _stored(db: Session, attempt_id: int):
+    db.expire_all()
+    return {a.question_id: a.answer_text for a in db.query(UserAnswer).filter(UserAnswer.exam_attempt_id == attempt_id)}
+
+
+@pytest.mark.query_budget(None, routes={"POST /exams/attempts/{attempt_id}/answers/bulk": 7})
+def test_bulk_answers_are_upserted_in_one_statement(client: TestClient, open_attempt, db_session: Session):
+    attempt_id, question_ids, student = open_attempt
+
+    first = client.post(f"/exams/attempts/{attempt_id}/answers/bulk", headers=student, json=[
+        {"exam_attempt_id": attempt_id, "question_id": qid, "answer_text": 1} for qid in question_ids[:20]
+    ])
+    assert first.status_code == 200, first.text
+    assert [a["question_id"] for a in first.json()["data"]] == question_ids[:20]
+
+    second = client.post(f"/exams/attempts/{attempt_id}/answers/bulk", headers=student, json=[
+        {"exam_attempt_id": attempt_id, "question_id": qid, "answer_text": 2} for qid in question_ids[10:]
+    ])
+    assert second.status_code == 200, second.text
+
+    stored = _stored(db_session, attempt_id)
+    assert len(stored) == QUESTIONS
+    assert [stored[qid] for qid in question_ids] == [1] * 10 + [2] * 20
+
+
+@pytest.mark.query_budget(None, routes={"PUT /exams/attempts/{attempt_id}/answers": 7})
+def test_autosave_accepts_partial_streams_and_keeps_the_latest_draft(client: TestClient, open_attempt, db_session: Session):
+    attempt_id, question_ids, student = open_attempt
+
+    for draft in range(3):
+        response = client.put(f"/exams/attempts/{attempt_id}/answers", headers=student, json={"answers": [
+            {"question_id": question_ids[0], "answer_text": draft},
+            {"question_id": question_ids[draft + 1], "answer_text": 3},
+            {"question_id": question_ids[0], "answer_text": draft + 1},
+        ]})
+        assert response.status_code == 200, response.text
+        assert response.json()["data"]["saved"] == 2
+
+    assert _stored(db_session, attempt_id) == {question_ids[0]: 3, question_ids[1]: 3, question_ids[2]: 3, question_ids[3]: 3}
+
+    rejected = client.put(f"/exams/attempts/{attempt_id}/answers", headers=student, json={"answers": [
+        {"question_id": question_ids[4], "answer_text": 1},
+        {"question_id": 10**9, "answer_text": 1},
+    ]})
+    assert rejected.status_code == 400
+    assert question_ids[4] not in _stored(db_session, attempt_id)
@@ -0,0 +1,53 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import run_in_db_thread
+from app.core.metrics import EventLoopLagMonitor
+
+request_marker = contextvars.ContextVar("request_marker", default=None)
+
+
+def _blocking_query(delay: float):
+    time.sleep(delay)
+    return threading.current_thread().name, request_marker.get()
+
+
+@pytest.mark.asyncio
+async def test_db_calls_run_off_the_loop_with_request_context():
+    request_marker.set("req-1")
+    thread_name, marker = await run_in_db_thread(_blocking_query, 0)
+
+    assert thread_name.startswith("db")
+    assert marker == "req-1"
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_stays_flat_while_db_work_is_bridged():
+    monitor = EventLoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.gather(*[run_in_db_thread(_blocking_query, 0.2) for _ in range(5)])
+    bridged = monitor.snapshot()
+    monitor.stop()
+
+    monitor = EventLoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    _blocking_query(0.2)
+    await asyncio.sleep(0.02)
+    blocked = monitor.snapshot()
+    monitor.stop()
+
+    assert bridged["max_ms"] < 100
+    assert blocked["max_ms"] >= 150
+
+
+def test_admin_metrics_exposes_event_loop_lag(client: TestClient, super_admin_token):
+    response = client.get("/admin/metrics", headers={"Authorization": f"Bearer {super_admin_token}"})
+
+    assert response.status_code == 200
+    assert {"samples", "current_ms", "avg_ms", "p99_ms", "max_ms"} <= set(response.json()["data"]["event_loop"])
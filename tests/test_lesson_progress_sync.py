@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.constants import ADMIN_SCHOOL_NAME
+from app.crud.school import school as crud_school
+
+LESSONS = 5
+
+
+@pytest.fixture
+def enrolled_course(client: TestClient, token_for_role, db_session: Session):
+    teacher = {"Authorization": f"Bearer {token_for_role('teacher')}"}
+    student = {"Authorization": f"Bearer {token_for_role('student')}"}
+    school = crud_school.get_by_name(db_session, name=ADMIN_SCHOOL_NAME)
+
+    course_id = client.post("/courses/", headers=teacher, json={"title": "Sync Course", "school_id": school.id}).json()["data"]["id"]
+    curriculum_id = client.post("/curriculums/", headers=teacher, json={"title": "Sync Curriculum", "course_id": course_id}).json()["data"]["id"]
+    lesson_ids = [
+        client.post("/lessons/", headers=teacher, json={"title": f"Sync Lesson {i}", "curriculum_id": curriculum_id}).json()["data"]["id"]
+        for i in range(LESSONS)
+    ]
+    student_id = client.get("/account/me", headers=student).json()["data"]["id"]
+    assert client.post(f"/courses/{course_id}/students/{student_id}", headers=teacher).status_code < 300
+    return course_id, lesson_ids, student
+
+
+@pytest.mark.query_budget(None, routes={"POST /lessons/progress/sync": 16})
+def test_sync_applies_a_batch_of_events_in_one_request(client: TestClient, enrolled_course):
+    course_id, lesson_ids, student = enrolled_course
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    events = []
+    for i, lesson_id in enumerate(lesson_ids):
+        events.append({"lesson_id": lesson_id, "started_at": (start + timedelta(minutes=i)).isoformat(), "time_spent_seconds": 30})
+        events.append({"lesson_id": lesson_id, "time_spent_seconds": 15})
+    events += [{"lesson_id": lesson_id, "completed_at": start.isoformat()} for lesson_id in lesson_ids[:2]] * 2
+
+    response = client.post("/lessons/progress/sync", headers=student, json={"events": events})
+
+    assert response.status_code == 200, response.text
+    data = response.json()["data"]
+    enrollment = data["enrollments"][0]
+    assert enrollment["course_id"] == course_id
+    assert enrollment["completed_lessons"] == 2
+    assert enrollment["progress_percentage"] == 40
+    assert enrollment["status"] == "in_progress"
+    assert sorted(p["lesson_id"] for p in data["lesson_progress"]) == sorted(lesson_ids)
+    assert all(p["time_spent_seconds"] == 45 for p in data["lesson_progress"])
+
+    again = client.post("/lessons/progress/sync", headers=student, json={"events": [{"lesson_id": lesson_ids[0], "completed_at": start.isoformat()}]})
+    assert again.json()["data"]["enrollments"][0]["completed_lessons"] == 2
+
+    progress = client.get(f"/courses/{course_id}/progress", headers=student).json()["data"]
+    assert progress["completed_lessons"] == 2
+
+
+def test_sync_rejects_unknown_lessons_without_writing(client: TestClient, enrolled_course):
+    course_id, lesson_ids, student = enrolled_course
+
+    response = client.post("/lessons/progress/sync", headers=student, json={"events": [
+        {"lesson_id": lesson_ids[0], "completed_at": datetime.now().isoformat()},
+        {"lesson_id": 10**9},
+    ]})
+
+    assert response.status_code == 404
+    assert client.get(f"/courses/{course_id}/completed-lessons", headers=student).json()["data"] == []
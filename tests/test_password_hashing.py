@@ -0,0 +1,35 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.security import get_password_hash, verify_password_async
+
+
+async def _measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    max_lag = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - start - interval)
+    return max_lag
+
+
+@pytest.mark.asyncio
+async def test_event_loop_lag_stays_flat_under_login_burst():
+    hashed = get_password_hash("testpass123")
+
+    start = time.perf_counter()
+    get_password_hash("testpass123")
+    single_hash_seconds = time.perf_counter() - start
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_measure_loop_lag(stop))
+
+    results = await asyncio.gather(*[verify_password_async("testpass123", hashed) for _ in range(20)])
+
+    stop.set()
+    max_lag = await lag_task
+
+    assert all(results)
+    assert max_lag < single_hash_seconds / 2, f"loop lag {max_lag:.3f}s vs single hash {single_hash_seconds:.3f}s"
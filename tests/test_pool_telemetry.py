@@ -0,0 +1,79 @@
+import logging
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.core.metrics import PoolMonitor, TimedQueuePool, request_scope
+from tests.conftest import test_db_url
+
+
+@pytest.fixture
+def small_engine():
+    if test_db_url.startswith("sqlite"):
+        pytest.skip("pool telemetry test needs Postgres")
+    engine = create_engine(test_db_url, poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.2)
+    yield engine
+    engine.dispose()
+
+
+def test_hold_time_is_attributed_to_the_route(small_engine):
+    monitor = PoolMonitor(small_engine, leak_seconds=60)
+    token = request_scope.set({"method": "GET", "path": "/schools/7/report", "route": SimpleNamespace(path="/schools/{school_id}/report")})
+    try:
+        with small_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    finally:
+        request_scope.reset(token)
+
+    snapshot = monitor.snapshot()
+    assert snapshot["checkouts"] == 1
+    assert snapshot["checked_out"] == 0
+    assert snapshot["routes"]["GET /schools/{school_id}/report"]["count"] == 1
+
+
+def test_pool_timeout_is_counted(small_engine):
+    monitor = PoolMonitor(small_engine, leak_seconds=60)
+
+    with small_engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            small_engine.connect()
+
+    snapshot = monitor.snapshot()
+    assert snapshot["timeouts"] == 1
+    assert snapshot["max_wait_ms"] >= 150
+
+
+def test_long_held_connection_is_logged_with_its_stack(small_engine, caplog):
+    monitor = PoolMonitor(small_engine, leak_seconds=0.05, trace_stacks=True)
+    metrics_logger = logging.getLogger("app.core.metrics")
+    metrics_logger.addHandler(caplog.handler)
+
+    try:
+        with small_engine.connect():
+            time.sleep(0.1)
+            assert monitor.find_leaks() == 1
+            assert monitor.find_leaks() == 0
+    finally:
+        metrics_logger.removeHandler(caplog.handler)
+
+    assert monitor.snapshot()["leaks"] == 1
+    assert "test_long_held_connection_is_logged_with_its_stack" in caplog.text
+
+
+def test_checkout_stacks_are_only_captured_when_tracing(small_engine, caplog):
+    monitor = PoolMonitor(small_engine, leak_seconds=0.05)
+    metrics_logger = logging.getLogger("app.core.metrics")
+    metrics_logger.addHandler(caplog.handler)
+
+    try:
+        with small_engine.connect():
+            assert [entry["stack"] for entry in monitor._held.values()] == [None]
+            time.sleep(0.1)
+            assert monitor.find_leaks() == 1
+    finally:
+        metrics_logger.removeHandler(caplog.handler)
+
+    assert "connection held for" in caplog.text
+    assert "checked out at" not in caplog.text
@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import QueryMetrics, query_metrics
+from tests.helpers.query_budget import count_queries
+
+
+def test_repeated_statement_is_flagged_as_n_plus_one(db_session: Session):
+    with count_queries() as stats:
+        for user_id in range(12):
+            db_session.execute(text("SELECT :id AS user_id"), {"id": user_id})
+        db_session.execute(text("SELECT 1"))
+
+    metrics = QueryMetrics(n_plus_one_threshold=10)
+    metrics.record("GET /loop", stats)
+
+    assert stats.count == 13
+    assert stats.repeated(10) == [("SELECT %(id)s AS user_id", 12)]
+    assert metrics.snapshot()["GET /loop"]["n_plus_one_requests"] == 1
+
+
+def test_query_count_headers_and_route_metrics(client: TestClient, super_admin_token, monkeypatch):
+    monkeypatch.setattr(settings, "DB_QUERY_HEADERS", True)
+
+    response = client.get("/account/me", headers={"Authorization": f"Bearer {super_admin_token}"})
+
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Query-Count"]) > 0
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
+    assert query_metrics.snapshot()["GET /account/me"]["max_queries"] >= int(response.headers["X-DB-Query-Count"])
+
+
+@pytest.mark.query_budget(20, routes={"GET /account/me": 10})
+def test_account_me_stays_within_query_budget(client: TestClient, super_admin_token):
+    response = client.get("/account/me", headers={"Authorization": f"Bearer {super_admin_token}"})
+    assert response.status_code == 200
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import ReadSessionRouter
+from tests.conftest import test_db_url
+
+
+@pytest.fixture
+def primary_factory(database_engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=database_engine)
+
+
+@pytest.fixture
+def replica_factory(database_engine):
+    if test_db_url.startswith("sqlite"):
+        pytest.skip("replica stand-in needs Postgres")
+    replica_engine = create_engine(test_db_url, execution_options={"postgresql_readonly": True})
+    yield sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    replica_engine.dispose()
+
+
+def test_reads_go_to_replica_and_replica_rejects_writes(primary_factory, replica_factory):
+    router = ReadSessionRouter(primary_factory, replica_factory, max_lag_seconds=5)
+
+    db = router()
+    try:
+        assert db.get_bind() is replica_factory.kw["bind"]
+        assert db.execute(text("SELECT 1")).scalar() == 1
+        with pytest.raises(DBAPIError):
+            db.execute(text("CREATE TEMP TABLE replica_write_probe (id int)"))
+    finally:
+        db.rollback()
+        db.close()
+
+
+def test_lagging_replica_falls_back_to_primary(primary_factory, replica_factory, monkeypatch):
+    router = ReadSessionRouter(primary_factory, replica_factory, max_lag_seconds=5)
+    monkeypatch.setattr(router, "replica_lag", lambda: 30.0)
+
+    db = router()
+    try:
+        assert db.get_bind() is primary_factory.kw["bind"]
+    finally:
+        db.close()
+
+
+def test_unreachable_replica_falls_back_to_primary(primary_factory):
+    dead_engine = create_engine("postgresql://postgres:@127.0.0.1:1/none", pool_pre_ping=False)
+    router = ReadSessionRouter(primary_factory, sessionmaker(bind=dead_engine))
+
+    db = router()
+    try:
+        assert db.get_bind() is primary_factory.kw["bind"]
+    finally:
+        db.close()
+
+
+def test_lag_is_probed_once_per_interval(primary_factory, replica_factory, monkeypatch):
+    router = ReadSessionRouter(primary_factory, replica_factory, check_interval=60)
+    probes = []
+    monkeypatch.setattr(router, "replica_lag", lambda: probes.append(1) or 0.0)
+
+    for _ in range(5):
+        router().close()
+
+    assert len(probes) == 1
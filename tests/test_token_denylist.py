@@ -0,0 +1,75 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import query_metrics
+from app.crud.token_denylist import token_denylist as crud_token_denylist
+from app.services.token_denylist import TokenDenylistService, token_denylist_service
+
+
+def test_logout_revokes_token_without_denylist_query(client: TestClient, super_admin_token, monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_DENYLIST_SYNC_SECONDS", 3600)
+    headers = {"Authorization": f"Bearer {super_admin_token}"}
+    seen = []
+
+    def listener(route, stats):
+        seen.append((route, stats))
+
+    assert client.get("/account/me", headers=headers).status_code == 200
+
+    response = client.post("/auth/logout", headers=headers)
+    assert response.status_code == 200
+
+    query_metrics.add_listener(listener)
+    try:
+        response = client.get("/account/me", headers=headers)
+    finally:
+        query_metrics.remove_listener(listener)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+    [(route, stats)] = seen
+    assert route == "GET /account/me"
+    assert not [statement for statement in stats.statements if "token_denylist" in statement]
+
+
+def test_revocations_committed_out_of_order_are_still_picked_up(db_session: Session):
+    service = TokenDenylistService()
+    late = str(uuid.uuid4())
+    # Written before the row the service sees first, but committed after it.
+    crud_token_denylist.create(db_session, obj_in={"jti": str(uuid.uuid4()), "exp": datetime.now(timezone.utc) + timedelta(hours=1)})
+    service.load(db_session)
+
+    row = crud_token_denylist.create(db_session, obj_in={"jti": late, "exp": datetime.now(timezone.utc) + timedelta(hours=1)})
+    row.created_at = service._seen_through - timedelta(seconds=5)
+    db_session.commit()
+
+    service.sync(db_session)
+    assert service.is_revoked(db_session, late)
+
+
+def test_revocations_from_other_processes_are_picked_up_by_sync(db_session: Session):
+    service = TokenDenylistService()
+    service.load(db_session)
+
+    jti = str(uuid.uuid4())
+    crud_token_denylist.create(db_session, obj_in={"jti": jti, "exp": datetime.now(timezone.utc) + timedelta(hours=1)})
+
+    assert jti not in service._revoked
+    service.sync(db_session)
+    assert service.is_revoked(db_session, jti)
+
+
+def test_purge_removes_expired_rows_and_entries(db_session: Session):
+    jti = str(uuid.uuid4())
+    crud_token_denylist.create(db_session, obj_in={"jti": jti, "exp": datetime.now(timezone.utc) - timedelta(minutes=1)})
+    token_denylist_service._revoked[jti] = time.time() - 60
+
+    token_denylist_service.purge_expired(db_session)
+
+    assert crud_token_denylist.get_by_jti(db_session, jti=jti) is None
+    assert jti not in token_denylist_service._revoked
+    assert not token_denylist_service.is_revoked(db_session, jti)